@@ -38,6 +38,9 @@ from utils.validators import PlanCastValidator, ValidationError, SecurityError
 from services.websocket_manager import websocket_manager
 from services.coordinate_scaler import CoordinateScaler
 from services.test_pipeline import SimpleTestPipeline
+from services.model_warmup import get_model_warmup
+from services.cubicasa_service import get_loaded_cubicasa_service
+from config.settings import CUBICASA_PROFILE_POSTPROCESSING, CUBICASA_READY_TIMEOUT, GENERATED_MODELS_DIR
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -144,7 +147,7 @@ async def log_requests(request: Request, call_next):
 validator = PlanCastValidator()
 
 # Mount static files for generated models so the frontend can load GLB/OBJ directly
-MODELS_ROOT = Path("output/generated_models")
+MODELS_ROOT = Path(GENERATED_MODELS_DIR)
 MODELS_ROOT.mkdir(parents=True, exist_ok=True)
 app.mount("/models", StaticFiles(directory=str(MODELS_ROOT)), name="models")
 
@@ -156,6 +159,9 @@ class HealthResponse(BaseModel):
     status: str = "healthy"
     version: str = "1.0.0"
     database_status: str = "unknown"
+    # Readiness, separate from liveness: see ModelWarmup.status
+    model_ready: bool = False
+    model_status: Optional[Dict[str, Any]] = None
     timestamp: float = Field(default_factory=time.time)
 
 class ConvertResponse(BaseModel):
@@ -179,33 +185,36 @@ class JobStatusResponse(BaseModel):
     started_at: Optional[float] = None
     completed_at: Optional[float] = None
     result: Optional[Dict[str, Any]] = None
+    # Only with CUBICASA_PROFILE_POSTPROCESSING; see PostprocessStageProfile
+    postprocess_profile: Optional[Dict[str, Any]] = None
 
 def get_db_session_context():
     """Context manager for getting a database session."""
     with get_db_session() as session:
         yield session
 
-async def _run_processing_in_thread(processor, file_content, filename, formats_list):
+async def _run_processing_in_thread(processor, file_content, filename, formats_list, job_id):
     """Run the synchronous processing task in a thread pool."""
     loop = asyncio.get_running_loop()
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
         return await loop.run_in_executor(
-            executor, processor.process_test_image, file_content, filename, formats_list
+            executor, processor.process_test_image, file_content, filename, formats_list, job_id
         )
 
 async def _handle_processing_success(job_id, processing_result, progress_callback):
     """Handle successful processing result."""
     if processing_result.status == ProcessingStatus.COMPLETED and processing_result.exported_files:
-        job_models_dir = Path(f"output/generated_models/{job_id}")
+        job_models_dir = MODELS_ROOT / job_id
         job_models_dir.mkdir(parents=True, exist_ok=True)
         
         exported_files = {}
         for fmt, path in (processing_result.exported_files or {}).items():
             src = Path(path)
             dst = job_models_dir / src.name
-            async with aiofiles.open(src, 'rb') as f_src:
-                async with aiofiles.open(dst, 'wb') as f_dst:
-                    await f_dst.write(await f_src.read())
+            if src.resolve() != dst.resolve():
+                async with aiofiles.open(src, 'rb') as f_src:
+                    async with aiofiles.open(dst, 'wb') as f_dst:
+                        await f_dst.write(await f_src.read())
             relative_url = f"/models/{job_id}/{dst.name}"
             exported_files[fmt] = f"{os.getenv('PUBLIC_API_URL', '')}{relative_url}"
         
@@ -216,13 +225,25 @@ async def _handle_processing_success(job_id, processing_result, progress_callbac
             "output_files": exported_files,
         }
 
+        processing_metadata = {"result": result_data}
+        cubicasa_output = processing_result.cubicasa_output
+        if cubicasa_output is not None:
+            # /scale/{job_id} reads the analysis back from here
+            processing_metadata["cubicasa_output"] = cubicasa_output.model_dump(
+                mode="json", exclude={"postprocess_profile"}
+            )
+            if cubicasa_output.postprocess_profile is not None:
+                processing_metadata["postprocess_profile"] = {
+                    stage: profile.model_dump() for stage, profile in cubicasa_output.postprocess_profile.items()
+                }
+
         with get_db_session() as session:
             ProjectRepository.update_project_status(
                 session,
                 int(job_id),
                 ProjectStatus.COMPLETED,
                 output_files=exported_files,
-                processing_metadata={"result": result_data},
+                processing_metadata=processing_metadata,
             )
         
         await progress_callback("completed", 100, "Processing completed successfully.")
@@ -255,13 +276,19 @@ async def process_floorplan_background(job_id: str, tmp_path: str, filename: str
         async with aiofiles.open(tmp_path, 'rb') as f:
             file_content = await f.read()
 
+        # Queue behind the startup warm-up without holding a worker thread
+        warmup = get_model_warmup()
+        if not warmup.ready:
+            await progress_callback("queued", 5, "Waiting for the floor plan model to finish loading...")
+            await warmup.wait_ready(CUBICASA_READY_TIMEOUT)
+
         processor = SimpleTestPipeline()
         formats_list = [fmt.strip() for fmt in export_formats.split(',') if fmt.strip()]
 
         await progress_callback("ai_analysis", 10, "Starting simplified test pipeline...")
 
         processing_result = await _run_processing_in_thread(
-            processor, file_content, filename, formats_list
+            processor, file_content, filename, formats_list, job_id
         )
         await _handle_processing_success(job_id, processing_result, progress_callback)
 
@@ -279,19 +306,25 @@ async def process_test_pipeline_background(job_id: str, tmp_path: str, filename:
         # Parse export formats
         formats_list = [fmt.strip() for fmt in export_formats.split(',') if fmt.strip()]
 
+        # Queue behind the startup warm-up without holding a worker thread
+        warmup = get_model_warmup()
+        if not warmup.ready:
+            await websocket_manager.broadcast_job_update(
+                job_id, "processing", 5, "Waiting for the floor plan model to finish loading..."
+            )
+            await warmup.wait_ready(CUBICASA_READY_TIMEOUT)
+
         # Run simplified pipeline
         pipeline = SimpleTestPipeline()
-        result_job = pipeline.process_test_image(
-            file_content=file_content,
-            filename=filename,
-            export_formats=formats_list or ["glb", "obj"]
+        result_job = await _run_processing_in_thread(
+            pipeline, file_content, filename, formats_list or ["glb", "obj"], job_id
         )
 
         if result_job.status != ProcessingStatus.COMPLETED or not result_job.exported_files:
             raise Exception(result_job.error_message or "Test pipeline failed with no output files")
 
         # Copy exported files to generated_models/{job_id} so they're served under /models
-        job_models_dir = Path(f"output/generated_models/{job_id}")
+        job_models_dir = MODELS_ROOT / job_id
         job_models_dir.mkdir(parents=True, exist_ok=True)
 
         exported_files: Dict[str, str] = {}
@@ -299,9 +332,10 @@ async def process_test_pipeline_background(job_id: str, tmp_path: str, filename:
             try:
                 src = Path(src_path)
                 dst = job_models_dir / src.name
-                async with aiofiles.open(src, 'rb') as f_src:
-                    async with aiofiles.open(dst, 'wb') as f_dst:
-                        await f_dst.write(await f_src.read())
+                if src.resolve() != dst.resolve():
+                    async with aiofiles.open(src, 'rb') as f_src:
+                        async with aiofiles.open(dst, 'wb') as f_dst:
+                            await f_dst.write(await f_src.read())
                 relative_url = f"/models/{job_id}/{dst.name}"
                 exported_files[fmt] = f"{PUBLIC_API_URL}{relative_url}" if PUBLIC_API_URL else relative_url
             except Exception as copy_err:
@@ -361,10 +395,15 @@ async def process_test_pipeline_background(job_id: str, tmp_path: str, filename:
             f"Test pipeline failed: {error_message}"
         )
 
+@app.on_event("startup")
+async def start_model_warmup():
+    """Load and warm up the CubiCasa5K model in the background."""
+    get_model_warmup().start()
+
 # API Endpoints
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint with database status."""
+    """Health check endpoint with database status and model readiness."""
     try:
         # Test database connection
         with get_db_session() as session:
@@ -373,7 +412,32 @@ async def health_check():
     except Exception:
         db_status = "unhealthy"
     
-    return HealthResponse(database_status=db_status)
+    warmup = get_model_warmup()
+    return HealthResponse(
+        database_status=db_status,
+        model_ready=warmup.ready,
+        model_status=warmup.status()
+    )
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the CubiCasa5K model is loaded and warmed up."""
+    warmup_status = get_model_warmup().status()
+    return JSONResponse(status_code=200 if warmup_status["ready"] else 503, content=warmup_status)
+
+@app.get("/health/model")
+async def model_health_check():
+    """
+    CubiCasa5K health: last inference result and rolling p50/p95 latency.
+    Runs a probe inference only when the last one is older than CUBICASA_HEALTH_TTL.
+    """
+    service = get_loaded_cubicasa_service()
+    if service is None or not service.model_loaded:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "warmup": get_model_warmup().status()})
+    
+    loop = asyncio.get_running_loop()
+    status = await loop.run_in_executor(None, service.health_check)
+    return JSONResponse(status_code=200 if status["status"] == "healthy" else 503, content=status)
 
 
 
@@ -709,6 +773,10 @@ async def get_job_status(job_id: str, request: Request):
                     }
                 }
 
+            postprocess_profile = None
+            if CUBICASA_PROFILE_POSTPROCESSING:
+                postprocess_profile = (project.processing_metadata or {}).get("postprocess_profile")
+
             # TEMPORARY: Add CORS headers to job status response
             # TODO: REMOVE THIS - Use FastAPI CORS middleware after fixing deployment
             origin = request.headers.get('origin', 'https://www.getplancast.com')
@@ -726,7 +794,8 @@ async def get_job_status(job_id: str, request: Request):
                     created_at=project.created_at.timestamp() if project.created_at else time.time(),
                     started_at=None,
                     completed_at=project.completed_at.timestamp() if project.completed_at else None,
-                    result=result_payload
+                    result=result_payload,
+                    postprocess_profile=postprocess_profile
                 ).dict()
             )
             response.headers["Access-Control-Allow-Origin"] = origin
@@ -815,6 +884,12 @@ async def get_websocket_stats():
     """Get WebSocket connection statistics."""
     return websocket_manager.get_connection_stats()
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get AI analysis result cache statistics (hits, misses, size)."""
+    from services.result_cache import get_result_cache
+    return get_result_cache().get_stats()
+
 @app.get("/analyze/{job_id}/rooms", response_model=RoomAnalysisResponse)
 async def analyze_rooms_for_highlighting(job_id: str, request: Request):
     """
@@ -915,6 +990,30 @@ async def analyze_rooms_for_highlighting(job_id: str, request: Request):
         response.headers["Access-Control-Allow-Headers"] = "*"
         return response
 
+def _rescale_existing_model(job_id: str, scale_factor: float, formats: List[str]) -> Optional[Dict[str, str]]:
+    """Re-export a job's persisted pixel-space building at a new scale factor, in the given formats."""
+    from services.building_rescaler import get_building_rescaler, PIXEL_BUILDING_FILENAME
+    
+    job_models_dir = MODELS_ROOT / job_id
+    pixel_path = job_models_dir / PIXEL_BUILDING_FILENAME
+    if not pixel_path.exists():
+        return None
+    
+    try:
+        rescaler = get_building_rescaler()
+        pixel_building = rescaler.load_pixel_building(str(pixel_path))
+        _, export_result = rescaler.rescale_and_export(
+            pixel_building, scale_factor, formats, str(job_models_dir)
+        )
+    except Exception as e:
+        print(f"⚠️ Rescale fast path failed for job {job_id}: {str(e)}")
+        return None
+    
+    return {
+        fmt: f"{PUBLIC_API_URL}/models/{job_id}/{Path(path).name}" if PUBLIC_API_URL else f"/models/{job_id}/{Path(path).name}"
+        for fmt, path in export_result.files.items()
+    }
+
 @app.post("/scale/{job_id}")
 async def submit_scale_input(job_id: str, scale_input: ScaleInputRequest, request: Request):
     """
@@ -980,10 +1079,22 @@ async def submit_scale_input(job_id: str, scale_input: ScaleInputRequest, reques
                 job_id=job_id
             )
             
+            # Fast path: re-export the persisted pixel-space building at the new scale in
+            # the formats the job produced, off the event loop since the export writes each one
+            original_files = dict(project.output_files or {})
+            loop = asyncio.get_running_loop()
+            rescaled_files = await loop.run_in_executor(
+                None, _rescale_existing_model, job_id, scaled_coords.scale_reference.scale_factor,
+                list(original_files) or ["glb", "obj"]
+            )
+            
             # Update project with scaled coordinates
             project.processing_metadata = project.processing_metadata or {}
             project.processing_metadata["scaled_coordinates"] = scaled_coords.model_dump()
             project.processing_metadata["scale_input"] = scale_input.model_dump()
+            if rescaled_files:
+                rescaled_files = {**original_files, **rescaled_files}
+                project.output_files = rescaled_files
             
             # Update project status to indicate scaling is complete
             project.current_step = "scaling_complete"
@@ -995,12 +1106,16 @@ async def submit_scale_input(job_id: str, scale_input: ScaleInputRequest, reques
             
             # Add CORS headers
             origin = request.headers.get('origin', 'https://www.getplancast.com')
-            response = JSONResponse(content={
+            response_content = {
                 "success": True,
                 "message": "Scale input processed successfully",
                 "job_id": job_id,
                 "scale_factor": scaled_coords.scale_reference.scale_factor
-            })
+            }
+            if rescaled_files:
+                response_content["output_files"] = rescaled_files
+                response_content["model_url"] = rescaled_files.get("glb", next(iter(rescaled_files.values())))
+            response = JSONResponse(content=response_content)
             response.headers["Access-Control-Allow-Origin"] = origin
             response.headers["Access-Control-Allow-Credentials"] = "true"
             response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
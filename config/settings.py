@@ -17,15 +17,118 @@ DEFAULT_EXPORT_FORMATS = ["glb", "obj", "stl"]
 DEFAULT_UNITS = "feet"
 
 # Web/Export configuration
-# Directory where generated models are written (alias for EXPORT_DIR)
+# Directory where generated models are written (alias for EXPORT_DIR). The API
+# serves it under /models, and /scale reads the pixel-space building of a job
+# from <dir>/<job_id>; point it at persistent storage to keep models on redeploy.
 GENERATED_MODELS_DIR = os.getenv("GENERATED_MODELS_DIR", "output/generated_models")
 USE_Y_UP_FOR_WEB = True
 WEB_OPTIMIZED_GLB = True
 
+# Format writers run in a thread pool once the building mesh is combined.
+# 1 restores serial export.
+MESH_EXPORT_WORKERS = int(os.getenv("MESH_EXPORT_WORKERS", "4"))
+
+# Mesh diagnostics: "off" computes no volume/topology properties during export;
+# "audit" checks the combined mesh once and returns a MeshAudit with the result
+MESH_DIAGNOSTICS = os.getenv("MESH_DIAGNOSTICS", "off").lower()
+
 # API settings
 API_VERSION = "1.0.0"
 API_TITLE = "PlanCast API"
 
+# CubiCasa5K post-processing
+# Longest side (pixels) at which get_polygons runs; polygons are rescaled to
+# image space afterwards. 0 restores full-resolution post-processing.
+CUBICASA_POSTPROCESS_MAX_SIZE = int(os.getenv("CUBICASA_POSTPROCESS_MAX_SIZE", "1024"))
+# Room outline merge: "grid" joins same-class cells of the junction grid by
+# connected-component labelling; "shapely" falls back to unary_union.
+CUBICASA_ROOM_MERGE = os.getenv("CUBICASA_ROOM_MERGE", "grid").lower()
+# Debug flag: record calls, wall time and peak tracemalloc allocation per
+# post-processing stage and return them with the job status. Tracing slows
+# post-processing down and is process-wide, so leave it off in production.
+CUBICASA_PROFILE_POSTPROCESSING = os.getenv("CUBICASA_PROFILE_POSTPROCESSING", "false").lower() == "true"
+
+# CubiCasa5K batched inference
+# Images per forward pass; concurrent jobs are micro-batched for up to
+# CUBICASA_BATCH_WAIT_MS. A batch size of 1 disables the batching queue.
+CUBICASA_MAX_BATCH_SIZE = int(os.getenv("CUBICASA_MAX_BATCH_SIZE", "4"))
+CUBICASA_BATCH_WAIT_MS = float(os.getenv("CUBICASA_BATCH_WAIT_MS", "20"))
+
+# CubiCasa5K input sizes
+# Uploads are resized with their aspect ratio kept and letterboxed into a
+# square input; the size is the smallest entry fitting the longer image side
+# (the largest one for bigger images), rounded up to the network stride of 64.
+# Sizes other than 512 run in eager mode.
+CUBICASA_INPUT_SIZES = [int(size) for size in os.getenv("CUBICASA_INPUT_SIZES", "512").split(",") if size.strip()]
+
+# CubiCasa5K tiled inference
+# Instead of fitting the whole image into one network input, resize it with its
+# aspect ratio kept (never upsampled) until at most CUBICASA_MAX_TILES tiles of
+# CUBICASA_TILE_SIZE overlapping by CUBICASA_TILE_OVERLAP pixels cover it, run
+# the tiles as a batch and blend their outputs. Max tiles bounds CPU per job.
+# The tile size is rounded up to the network stride of 64, so tile outputs come
+# back at exactly the tile size.
+CUBICASA_TILED_INFERENCE = os.getenv("CUBICASA_TILED_INFERENCE", "false").lower() == "true"
+CUBICASA_TILE_SIZE = int(os.getenv("CUBICASA_TILE_SIZE", "512"))
+CUBICASA_TILE_OVERLAP = int(os.getenv("CUBICASA_TILE_OVERLAP", "64"))
+CUBICASA_MAX_TILES = int(os.getenv("CUBICASA_MAX_TILES", "9"))
+
+# CubiCasa5K inference worker processes
+# With CUBICASA_INFERENCE_WORKERS > 0, jobs run in that many worker processes
+# (started via forkserver, never forked from the API process), each loading the
+# model from the memory-mapped weights file and using CUBICASA_WORKER_THREADS
+# torch threads. A worker whose RSS exceeds
+# CUBICASA_WORKER_MAX_RSS_MB after a job is replaced (0 disables the check).
+# 0 workers runs inference in the calling thread.
+CUBICASA_INFERENCE_WORKERS = int(os.getenv("CUBICASA_INFERENCE_WORKERS", "0"))
+CUBICASA_WORKER_THREADS = int(os.getenv("CUBICASA_WORKER_THREADS", "1"))
+CUBICASA_WORKER_MAX_RSS_MB = int(os.getenv("CUBICASA_WORKER_MAX_RSS_MB", "2048"))
+
+# CubiCasa5K startup warm-up
+# Load the model in the background at startup and run CUBICASA_WARMUP_RUNS dummy
+# inferences at each input size; /health reports readiness separately from
+# liveness. Uploads arriving earlier wait up to CUBICASA_READY_TIMEOUT seconds.
+CUBICASA_WARMUP_ON_STARTUP = os.getenv("CUBICASA_WARMUP_ON_STARTUP", "true").lower() == "true"
+CUBICASA_WARMUP_RUNS = int(os.getenv("CUBICASA_WARMUP_RUNS", "2"))
+CUBICASA_READY_TIMEOUT = float(os.getenv("CUBICASA_READY_TIMEOUT", "600"))
+
+# CubiCasa5K health check
+# Health checks report the last forward pass and p50/p95 latency over the last
+# CUBICASA_LATENCY_WINDOW passes; they only run a probe inference when no pass
+# happened within CUBICASA_HEALTH_TTL seconds.
+CUBICASA_HEALTH_TTL = float(os.getenv("CUBICASA_HEALTH_TTL", "60"))
+CUBICASA_LATENCY_WINDOW = int(os.getenv("CUBICASA_LATENCY_WINDOW", "200"))
+
+# CubiCasa5K weight cache
+# Convert the checkpoint's model_state once to a flat weights file next to it
+# and memory-map that file on later startups instead of unpickling the
+# checkpoint; processes mapping the file share its pages.
+CUBICASA_WEIGHT_CACHE = os.getenv("CUBICASA_WEIGHT_CACHE", "true").lower() == "true"
+
+# CubiCasa5K compiled inference
+# Trace and freeze the model to TorchScript at load time; freezing folds each
+# BatchNorm that directly follows a convolution into it, while the
+# pre-activation BatchNorm at the head of every Residual block stays. The
+# artifact is cached next to the checkpoint. Falls back to eager mode if
+# compilation fails. The frozen constants (the folded weights) are also
+# written to a flat weights file next to the artifact and memory-mapped, so
+# workers share one copy instead of each holding ~66 MB of private
+# constants. The eager model stays loaded for input sizes other than 512,
+# but its mapped weights are not paged in while only 512 inputs arrive, so
+# a compiled worker costs about as much private memory as an eager one and
+# runs ~5% faster (see scripts/benchmark_weight_loading.py).
+CUBICASA_COMPILE_MODEL = os.getenv("CUBICASA_COMPILE_MODEL", "true").lower() == "true"
+
+# CubiCasa5K inference precision: "fp32" or "int8" (static post-training
+# quantization calibrated on the bundled images in CUBICASA_CALIBRATION_DIR)
+CUBICASA_INFERENCE_PRECISION = os.getenv("CUBICASA_INFERENCE_PRECISION", "fp32").lower()
+CUBICASA_CALIBRATION_DIR = os.getenv("CUBICASA_CALIBRATION_DIR", "assets/calibration")
+
+# CubiCasa5K result cache (keyed by image hash + model version + thresholds)
+CUBICASA_CACHE_ENABLED = os.getenv("CUBICASA_CACHE_ENABLED", "true").lower() == "true"
+CUBICASA_CACHE_DIR = os.getenv("CUBICASA_CACHE_DIR", "temp/cubicasa_cache")
+CUBICASA_CACHE_MAX_MB = int(os.getenv("CUBICASA_CACHE_MAX_MB", "256"))
+
 # Processing settings
 DEFAULT_WALL_HEIGHT_FEET = 9.0
 DEFAULT_WALL_THICKNESS_FEET = 0.5
@@ -9,9 +9,12 @@ This is the central service that manages the complete 2D to 3D conversion proces
 
 import time
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 import logging
 import os
+from pathlib import Path
+
+import numpy as np
 
 from models.data_structures import (
     ProcessingJob,
@@ -31,6 +34,9 @@ from services.room_generator import RoomMeshGenerator, RoomGenerationError
 from services.wall_generator import WallMeshGenerator, WallGenerationError
 from services.opening_cutout_generator import OpeningCutoutGenerator, OpeningCutoutError
 from services.mesh_exporter import MeshExporter, MeshExportError
+from services.result_cache import get_result_cache
+from services.inference_pool import get_inference_pool
+from services.building_rescaler import BuildingRescaler, RescaleError, PIXEL_BUILDING_FILENAME
 from utils.logger import get_logger, log_job_start, log_job_complete, log_job_error
 
 logger = get_logger("floorplan_processor")
@@ -55,11 +61,15 @@ class FloorPlanProcessor:
         # Use global CubiCasa service to avoid reinitializing model for every job
         from services.cubicasa_service import get_cubicasa_service
         self.cubicasa_service = get_cubicasa_service()
+        # Worker processes when CUBICASA_INFERENCE_WORKERS is set, else None
+        self.inference_pool = get_inference_pool()
+        self.result_cache = get_result_cache()
         self.coordinate_scaler = CoordinateScaler()
         self.room_generator = RoomMeshGenerator()
         self.wall_generator = WallMeshGenerator()
         self.opening_cutout_generator = OpeningCutoutGenerator()
         self.mesh_exporter = MeshExporter()
+        self.building_rescaler = BuildingRescaler(self.mesh_exporter)
         
         logger.info("✅ Floor plan processor initialized with all services")
     
@@ -68,7 +78,8 @@ class FloorPlanProcessor:
                          filename: str,
                          scale_reference: Optional[Dict[str, Any]] = None,
                          export_formats: List[str] = None,
-                         output_dir: str = None) -> ProcessingJob:
+                         output_dir: str = None,
+                         on_format_exported: Optional[Callable[[str, str, int], None]] = None) -> ProcessingJob:
         """
         Process a floor plan through the complete pipeline.
         
@@ -78,6 +89,8 @@ class FloorPlanProcessor:
             scale_reference: Optional scaling reference for coordinate conversion
             export_formats: List of export formats (glb, obj, stl, fbx, skp)
             output_dir: Output directory for generated files (defaults to persistent storage)
+            on_format_exported: Called with (format, file_path, size_bytes) as each
+                format is written, e.g. to publish the GLB URL before the slower formats finish
             
         Returns:
             ProcessingJob with complete results and status
@@ -85,13 +98,8 @@ class FloorPlanProcessor:
         Raises:
             FloorPlanProcessingError: If processing fails at any step
         """
-        # Use persistent storage if available, otherwise fallback to local
         if output_dir is None:
-            railway_persistent = os.getenv("RAILWAY_PERSISTENT_DIR", "/data")
-            if os.path.exists(railway_persistent):
-                output_dir = os.path.join(railway_persistent, "output", "generated_models")
-            else:
-                output_dir = "output/generated_models"
+            output_dir = self._default_output_dir()
         
         # Initialize job
         job_id = str(uuid.uuid4())
@@ -121,7 +129,7 @@ class FloorPlanProcessor:
             job.progress_percent = 25
             logger.info(f"🤖 Step 2: Running CubiCasa5K AI analysis")
             
-            cubicasa_output = self.cubicasa_service.process_image(file_content, job.job_id)
+            cubicasa_output = self._analyze_image(file_content, job.job_id)
             job.cubicasa_output = cubicasa_output
             
             logger.info(f"✅ AI processing completed: {len(cubicasa_output.room_bounding_boxes)} rooms detected")
@@ -187,6 +195,9 @@ class FloorPlanProcessor:
             
             logger.info(f"✅ Building assembly completed: {building_3d.total_vertices} vertices, {building_3d.total_faces} faces")
             
+            # Keep a pixel-space copy so a new scale reference is a single transform
+            self._save_pixel_building(building_3d, scaled_coords, output_dir, job.job_id)
+            
             # Step 7: 3D Model Export
             job.current_step = "model_export"
             job.progress_percent = 90
@@ -195,10 +206,17 @@ class FloorPlanProcessor:
             if export_formats is None:
                 export_formats = ["glb", "obj", "stl"]  # Default formats
             
+            def format_exported(format_name: str, file_path: str, file_size: int) -> None:
+                # Finished files are visible on the job while other formats are still written
+                job.exported_files[format_name] = file_path
+                if on_format_exported is not None:
+                    on_format_exported(format_name, file_path, file_size)
+            
             export_result = self.mesh_exporter.export_building(
                 building=building_3d,
                 formats=export_formats,
-                out_dir=output_dir
+                out_dir=output_dir,
+                on_format_exported=format_exported
             )
             
             job.exported_files = export_result.files
@@ -258,6 +276,89 @@ class FloorPlanProcessor:
             logger.error(f"❌ {error_msg}")
             return self._handle_job_error(job, error_msg, "unknown")
     
+    def rescale_floorplan(self,
+                          job_id: str,
+                          cubicasa_output: CubiCasaOutput,
+                          scale_reference: Dict[str, Any],
+                          export_formats: List[str] = None,
+                          output_dir: Optional[str] = None) -> MeshExportResult:
+        """
+        Re-export a processed floor plan for a new scale reference.
+        
+        Applies the new scale to the persisted pixel-space building instead
+        of re-running room, wall and cutout generation.
+        
+        Args:
+            job_id: Job identifier of the original processing run
+            cubicasa_output: CubiCasa5K output of the original run
+            scale_reference: Dict with room_type, dimension_type and real_world_feet
+            export_formats: List of export formats
+            output_dir: Output directory used by the original run (defaults to persistent storage)
+            
+        Returns:
+            MeshExportResult for the rescaled building
+            
+        Raises:
+            RescaleError: If no pixel-space building was saved for the job
+            ScalingError: If the scale reference is invalid
+        """
+        pixel_path = self._pixel_building_path(output_dir or self._default_output_dir(), job_id)
+        if not pixel_path.exists():
+            raise RescaleError(f"No pixel-space building saved for job {job_id}")
+        
+        reference = self.coordinate_scaler.calculate_scale_factor(
+            cubicasa_output,
+            scale_reference["room_type"],
+            scale_reference["dimension_type"],
+            scale_reference["real_world_feet"]
+        )
+        
+        pixel_building = self.building_rescaler.load_pixel_building(str(pixel_path))
+        _, export_result = self.building_rescaler.rescale_and_export(
+            pixel_building,
+            reference.scale_factor,
+            export_formats or ["glb", "obj", "stl"],
+            str(pixel_path.parent)
+        )
+        return export_result
+    
+    def _default_output_dir(self) -> str:
+        # Use persistent storage if available, otherwise fallback to local
+        railway_persistent = os.getenv("RAILWAY_PERSISTENT_DIR", "/data")
+        if os.path.exists(railway_persistent):
+            return os.path.join(railway_persistent, "output", "generated_models")
+        return "output/generated_models"
+    
+    def _pixel_building_path(self, output_dir: str, job_id: str) -> Path:
+        return Path(output_dir) / job_id / PIXEL_BUILDING_FILENAME
+    
+    def _save_pixel_building(self, building_3d: Building3D, scaled_coords: ScaledCoordinates,
+                             output_dir: str, job_id: str) -> None:
+        try:
+            pixel_building = self.building_rescaler.to_pixel_space(
+                building_3d, scaled_coords.scale_reference.scale_factor
+            )
+            self.building_rescaler.save_pixel_building(pixel_building, str(self._pixel_building_path(output_dir, job_id)))
+        except Exception as e:
+            # Only the rescale fast path depends on this file
+            logger.warning(f"⚠️ Could not save pixel-space building for job {job_id}: {str(e)}")
+    
+    def _analyze_image(self, file_content: bytes, job_id: str) -> CubiCasaOutput:
+        """
+        Run CubiCasa5K analysis, reusing a cached result for identical uploads.
+        
+        Args:
+            file_content: Raw file bytes
+            job_id: Job identifier
+            
+        Returns:
+            CubiCasaOutput for the image
+        """
+        runner = self.inference_pool or self.cubicasa_service
+        return self.result_cache.get_or_process(
+            runner, self.cubicasa_service.cache_fingerprint(), file_content, job_id
+        )
+    
     def _assemble_building(self, room_meshes: List, wall_meshes: List, scaled_coords) -> Building3D:
         """
         Assemble room and wall meshes into a complete Building3D object.
@@ -271,23 +372,17 @@ class FloorPlanProcessor:
             Building3D object ready for export
         """
         # Calculate total geometry stats
-        total_vertices = sum(len(room.vertices) for room in room_meshes) + sum(len(wall.vertices) for wall in wall_meshes)
-        total_faces = sum(len(room.faces) for room in room_meshes) + sum(len(wall.faces) for wall in wall_meshes)
+        meshes = [room.mesh for room in room_meshes] + [wall.mesh for wall in wall_meshes]
+        total_vertices = sum(mesh.vertex_count for mesh in meshes)
+        total_faces = sum(mesh.face_count for mesh in meshes)
         
         # Calculate bounding box
-        all_vertices = []
-        for room in room_meshes:
-            all_vertices.extend([(v.x, v.y, v.z) for v in room.vertices])
-        for wall in wall_meshes:
-            all_vertices.extend([(v.x, v.y, v.z) for v in wall.vertices])
+        mesh_bounds = [mesh.bounds for mesh in meshes if mesh.vertex_count]
         
-        if all_vertices:
-            min_x = min(v[0] for v in all_vertices)
-            max_x = max(v[0] for v in all_vertices)
-            min_y = min(v[1] for v in all_vertices)
-            max_y = max(v[1] for v in all_vertices)
-            min_z = min(v[2] for v in all_vertices)
-            max_z = max(v[2] for v in all_vertices)
+        if mesh_bounds:
+            mesh_bounds = np.stack(mesh_bounds)
+            min_x, min_y, min_z = (float(value) for value in mesh_bounds[:, 0].min(axis=0))
+            max_x, max_y, max_z = (float(value) for value in mesh_bounds[:, 1].max(axis=0))
         else:
             # Fallback to building dimensions
             building = scaled_coords.total_building_size
@@ -6,11 +6,14 @@ the application, based on actual CubiCasa5K output format and
 our 3D pipeline requirements.
 """
 
-from typing import List, Tuple, Dict, Optional, Any
-from pydantic import BaseModel, Field
+from collections.abc import Sequence
+from typing import List, Tuple, Dict, Optional, Any, Iterable
+from pydantic import BaseModel, ConfigDict, Field, model_serializer, model_validator
 from enum import Enum
 import time
 
+import numpy as np
+
 
 class FileFormat(str, Enum):
     """Supported input file formats."""
@@ -39,6 +42,16 @@ class ExportFormat(str, Enum):
 # === CubiCasa5K Data Structures ===
 # Based on your actual breakthrough data format
 
+class PostprocessStageProfile(BaseModel):
+    """
+    Totals of one post-processing stage (CUBICASA_PROFILE_POSTPROCESSING).
+    Nested stages are included in the stage that encloses them.
+    """
+    calls: int = Field(..., description="Times the stage ran")
+    wall_time_ms: float = Field(..., description="Total wall time in milliseconds")
+    peak_alloc_bytes: int = Field(..., description="Largest traced allocation above the memory in use at stage entry")
+
+
 class CubiCasaOutput(BaseModel):
     """
     Raw output from CubiCasa5K model.
@@ -76,6 +89,10 @@ class CubiCasaOutput(BaseModel):
         ..., 
         description="CubiCasa5K processing time in seconds"
     )
+    postprocess_profile: Optional[Dict[str, PostprocessStageProfile]] = Field(
+        default=None,
+        description="Post-processing stage profile (only when CUBICASA_PROFILE_POSTPROCESSING is set)"
+    )
 
 
 # === Scaling and Coordinate Transformation ===
@@ -157,20 +174,311 @@ class Face(BaseModel):
     indices: List[int] = Field(..., description="Vertex indices forming the face")
 
 
-class Room3D(BaseModel):
+class TriangleMesh:
+    """
+    Array-backed triangle mesh.
+
+    Vertices are a C-contiguous (N, 3) float32 array in feet and faces a
+    C-contiguous (M, 3) int32 array of vertex indices. Meshes are treated
+    as immutable: transforms build a new mesh and share untouched arrays.
+    """
+
+    __slots__ = ("vertices", "faces")
+
+    def __init__(self, vertices: Any, faces: Any):
+        """
+        Initialize the mesh, converting to the canonical dtypes if needed.
+
+        Args:
+            vertices: (N, 3) array-like of vertex coordinates
+            faces: (M, 3) array-like of vertex indices
+        """
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        faces = np.ascontiguousarray(faces, dtype=np.int32)
+        if (faces.ndim == 2 and faces.shape[1] != 3) or faces.size % 3:
+            raise ValueError(f"Faces must be triangles, got array of shape {faces.shape}")
+        self.faces = faces.reshape(-1, 3)
+
+    @classmethod
+    def from_any(cls, vertices: Any, faces: Any) -> 'TriangleMesh':
+        """
+        Build a mesh from arrays or from the legacy per-vertex form.
+
+        Args:
+            vertices: Array, or sequence of Vertex3D / {"x", "y", "z"} dicts / (x, y, z)
+            faces: Array, or sequence of Face / {"indices"} dicts / index
+                lists; polygons with more than 3 indices are fan-triangulated
+
+        Returns:
+            TriangleMesh
+
+        Raises:
+            ValueError: If a face has fewer than 3 indices
+        """
+        if not isinstance(vertices, np.ndarray):
+            vertices = [
+                (v.x, v.y, v.z) if isinstance(v, Vertex3D)
+                else (v["x"], v["y"], v["z"]) if isinstance(v, dict)
+                else v
+                for v in vertices
+            ]
+        if isinstance(faces, np.ndarray):
+            faces = triangulate_faces(faces) if faces.ndim == 2 else faces
+        else:
+            faces = triangulate_faces([
+                f.indices if isinstance(f, Face)
+                else f["indices"] if isinstance(f, dict)
+                else f
+                for f in faces
+            ])
+        return cls(vertices, faces)
+
+    @classmethod
+    def concatenate(cls, meshes: Iterable['TriangleMesh']) -> 'TriangleMesh':
+        """
+        Join meshes into one, offsetting face indices.
+
+        Args:
+            meshes: Meshes to join
+
+        Returns:
+            Combined TriangleMesh
+        """
+        vertices, faces = concatenate_mesh_arrays(list(meshes), np.float32, np.int32)
+        return cls(vertices, faces)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def face_count(self) -> int:
+        return len(self.faces)
+
+    @property
+    def bounds(self) -> Optional[np.ndarray]:
+        """(2, 3) array of [min, max] corners, or None for an empty mesh."""
+        if not len(self.vertices):
+            return None
+        return np.stack([self.vertices.min(axis=0), self.vertices.max(axis=0)])
+
+    @property
+    def volume(self) -> float:
+        """Signed volume, integrated the same way as trimesh.Trimesh.volume."""
+        if not len(self.faces):
+            return 0.0
+        triangles = self.vertices.astype(np.float64)[self.faces]
+        crosses = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        return float(np.dot(crosses[:, 0], triangles[:, :, 0].sum(axis=1)) / 6.0)
+
+    def transformed(self, scale: Tuple[float, float, float]) -> 'TriangleMesh':
+        """
+        Scale each axis, sharing the face array with this mesh.
+
+        Args:
+            scale: Per-axis (sx, sy, sz) multipliers
+
+        Returns:
+            New TriangleMesh
+        """
+        vertices = self.vertices.astype(np.float64) * np.asarray(scale, dtype=np.float64)
+        mesh = TriangleMesh.__new__(TriangleMesh)
+        mesh.vertices = vertices.astype(np.float32)
+        mesh.faces = self.faces
+        return mesh
+
+    def to_trimesh(self, process: bool = False):
+        """
+        Convert to a trimesh.Trimesh.
+
+        trimesh stores float64 vertices and int64 faces, so this is the one
+        widening copy; trimesh wraps the widened arrays without copying again.
+
+        Args:
+            process: Let trimesh merge duplicate and drop unreferenced vertices
+
+        Returns:
+            trimesh.Trimesh
+        """
+        import trimesh
+        return trimesh.Trimesh(
+            vertices=self.vertices.astype(np.float64),
+            faces=self.faces.astype(np.int64),
+            process=process
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TriangleMesh):
+            return NotImplemented
+        return np.array_equal(self.vertices, other.vertices) and np.array_equal(self.faces, other.faces)
+
+    def __repr__(self) -> str:
+        return f"TriangleMesh(vertices={len(self.vertices)}, faces={len(self.faces)})"
+
+
+def triangulate_faces(polygons: Any) -> np.ndarray:
+    """
+    Fan-triangulate polygon faces, as trimesh does for quad faces.
+
+    A face (i0, i1, ..., ik) becomes (i0, i1, i2), (i0, i2, i3), ...;
+    triangles are kept as they are. Fans are only correct for convex
+    polygons, which is all the generators emit.
+
+    Args:
+        polygons: (M, K) index array, or sequence of index lists of any length
+
+    Returns:
+        (T, 3) int32 array of triangles
+
+    Raises:
+        ValueError: If a face has fewer than 3 indices
+    """
+    if isinstance(polygons, np.ndarray):
+        polygons = polygons.astype(np.int32, copy=False)
+        if polygons.shape[1] < 3:
+            raise ValueError(f"Faces need at least 3 indices, got array of shape {polygons.shape}")
+        if polygons.shape[1] == 3:
+            return polygons
+        fan = polygons.shape[1] - 2
+        return np.stack([np.repeat(polygons[:, :1], fan, axis=1), polygons[:, 1:-1], polygons[:, 2:]],
+                        axis=2).reshape(-1, 3)
+
+    polygons = [list(polygon) for polygon in polygons]
+    if all(len(polygon) == 3 for polygon in polygons):
+        return np.array(polygons, dtype=np.int32).reshape(-1, 3)
+    triangles = []
+    for polygon in polygons:
+        if len(polygon) < 3:
+            raise ValueError(f"Faces need at least 3 indices, got {polygon}")
+        triangles.extend((polygon[0], polygon[i], polygon[i + 1]) for i in range(1, len(polygon) - 1))
+    return np.array(triangles, dtype=np.int32).reshape(-1, 3)
+
+
+def concatenate_mesh_arrays(meshes: List[TriangleMesh],
+                            vertex_dtype: Any = np.float64,
+                            index_dtype: Any = np.int64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Write the vertices and offset faces of several meshes into single buffers.
+
+    Args:
+        meshes: Meshes to join
+        vertex_dtype: dtype of the vertex buffer
+        index_dtype: dtype of the face buffer
+
+    Returns:
+        Tuple of ((N, 3) vertices, (M, 3) faces)
+    """
+    vertex_counts = np.fromiter((len(m.vertices) for m in meshes), dtype=np.int64, count=len(meshes))
+    face_counts = np.fromiter((len(m.faces) for m in meshes), dtype=np.int64, count=len(meshes))
+    vertices = np.empty((int(vertex_counts.sum()), 3), dtype=vertex_dtype)
+    faces = np.empty((int(face_counts.sum()), 3), dtype=index_dtype)
+
+    vertex_offset = face_offset = 0
+    for mesh, vertex_count, face_count in zip(meshes, vertex_counts, face_counts):
+        vertices[vertex_offset:vertex_offset + vertex_count] = mesh.vertices
+        np.add(mesh.faces, vertex_offset, out=faces[face_offset:face_offset + face_count], casting="unsafe")
+        vertex_offset += vertex_count
+        face_offset += face_count
+    return vertices, faces
+
+
+class VertexView(Sequence):
+    """Read-only List[Vertex3D]-style view over a mesh vertex array."""
+
+    __slots__ = ("_array",)
+
+    def __init__(self, array: np.ndarray):
+        self._array = array
+
+    def __len__(self) -> int:
+        return len(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Vertex3D(x=x, y=y, z=z) for x, y, z in self._array[index].tolist()]
+        x, y, z = self._array[index].tolist()
+        return Vertex3D(x=x, y=y, z=z)
+
+    def __iter__(self):
+        for x, y, z in self._array.tolist():
+            yield Vertex3D(x=x, y=y, z=z)
+
+    def __repr__(self) -> str:
+        return f"VertexView({len(self._array)} vertices)"
+
+
+class FaceView(Sequence):
+    """Read-only List[Face]-style view over a mesh face array."""
+
+    __slots__ = ("_array",)
+
+    def __init__(self, array: np.ndarray):
+        self._array = array
+
+    def __len__(self) -> int:
+        return len(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Face(indices=indices) for indices in self._array[index].tolist()]
+        return Face(indices=self._array[index].tolist())
+
+    def __iter__(self):
+        for indices in self._array.tolist():
+            yield Face(indices=indices)
+
+    def __repr__(self) -> str:
+        return f"FaceView({len(self._array)} faces)"
+
+
+class MeshGeometry(BaseModel):
+    """
+    Base for models whose geometry is a TriangleMesh.
+
+    Accepts either ``mesh=`` or the legacy ``vertices=`` / ``faces=`` lists,
+    exposes ``vertices`` / ``faces`` as Vertex3D / Face views and serializes
+    them as plain [x, y, z] / [i, j, k] lists.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    mesh: TriangleMesh = Field(
+        ...,
+        exclude=True,
+        description="Array-backed mesh (vertices in feet)"
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def _build_mesh(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "mesh" not in data and ("vertices" in data or "faces" in data):
+            data = dict(data)
+            data["mesh"] = TriangleMesh.from_any(data.pop("vertices", ()), data.pop("faces", ()))
+        return data
+
+    @model_serializer(mode="wrap")
+    def _serialize_mesh(self, handler) -> Dict[str, Any]:
+        data = handler(self)
+        data["vertices"] = self.mesh.vertices.tolist()
+        data["faces"] = self.mesh.faces.tolist()
+        return data
+
+    @property
+    def vertices(self) -> VertexView:
+        """Vertices as Vertex3D objects (built on access)."""
+        return VertexView(self.mesh.vertices)
+
+    @property
+    def faces(self) -> FaceView:
+        """Faces as Face objects (built on access)."""
+        return FaceView(self.mesh.faces)
+
+
+class Room3D(MeshGeometry):
     """
     3D room geometry.
     Output of Task 3: Room Mesh Generator
     """
     name: str = Field(..., description="Room name (kitchen, bedroom, etc.)")
-    vertices: List[Vertex3D] = Field(
-        ..., 
-        description="3D vertices for the room mesh"
-    )
-    faces: List[Face] = Field(
-        ..., 
-        description="Triangle faces for the room mesh"
-    )
     elevation_feet: float = Field(
         ..., 
         description="Floor elevation in feet (typically 0.0)"
@@ -181,20 +489,12 @@ class Room3D(BaseModel):
     )
 
 
-class Wall3D(BaseModel):
+class Wall3D(MeshGeometry):
     """
     3D wall geometry.
     Output of Task 4: Wall Mesh Creator
     """
     id: str = Field(..., description="Unique wall identifier")
-    vertices: List[Vertex3D] = Field(
-        ..., 
-        description="3D vertices for the wall mesh"
-    )
-    faces: List[Face] = Field(
-        ..., 
-        description="Triangle faces for the wall mesh"
-    )
     height_feet: float = Field(
         ..., 
         description="Wall height in feet"
@@ -233,6 +533,29 @@ class WebPreviewData(BaseModel):
     )
 
 
+class MeshAudit(BaseModel):
+    """
+    Structured checks of the combined building mesh (MESH_DIAGNOSTICS="audit").
+    """
+    vertex_count: int = Field(..., description="Vertices of the combined mesh")
+    face_count: int = Field(..., description="Faces of the combined mesh")
+    bounds: Dict[str, float] = Field(
+        default_factory=dict,
+        description="min_x/max_x/min_y/max_y/min_z/max_z of the combined mesh"
+    )
+    volume: float = Field(..., description="Signed volume of the combined mesh")
+    is_watertight: bool = Field(..., description="Every edge is shared by exactly two faces")
+    is_winding_consistent: bool = Field(..., description="Face windings agree across shared edges")
+    room_volumes: List[float] = Field(
+        default_factory=list,
+        description="Signed room mesh volumes, in building.rooms order"
+    )
+    oversized_rooms: List[str] = Field(
+        default_factory=list,
+        description="Rooms with more than 3x the average room volume"
+    )
+
+
 class MeshExportResult(BaseModel):
     """
     Result of 3D model export operation.
@@ -249,6 +572,10 @@ class MeshExportResult(BaseModel):
         default_factory=dict,
         description="Export summary (file sizes, processing time, etc.)"
     )
+    mesh_audit: Optional[MeshAudit] = Field(
+        default=None,
+        description="Combined mesh audit (only when MESH_DIAGNOSTICS is \"audit\")"
+    )
 
 
 # === Job Management ===
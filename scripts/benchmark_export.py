@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark MeshExporter.export_building alone (generation excluded) for
+growing synthetic buildings and for one versus all export formats.
+
+Reports wall time for serial and concurrent format writers, the time until
+the GLB file is reported, and how many times the building meshes were
+combined; with a single combine pass per job, adding formats only adds file
+writing time. GLB is requested last so serial export reports it last.
+
+Run with: python3 scripts/benchmark_export.py [room counts...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logging
+from services.mesh_exporter import MeshExporter
+from scripts.benchmark_geometry import make_scaled_coordinates, build_building
+
+FORMAT_SETS = [["glb"], ["obj", "stl", "skp", "glb"]]
+WORKER_COUNTS = [1, 4]
+
+
+class CountingExporter(MeshExporter):
+    """MeshExporter that counts combine passes."""
+
+    def __init__(self):
+        super().__init__()
+        self.combine_calls = 0
+
+    def _combine_building_meshes(self, building):
+        self.combine_calls += 1
+        return super()._combine_building_meshes(building)
+
+
+def benchmark(room_counts) -> None:
+    exporter = CountingExporter()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for num_rooms in room_counts:
+            building = build_building(make_scaled_coordinates(num_rooms))
+            for formats in FORMAT_SETS:
+                # Warm-up export so format plugins are loaded
+                exporter.export_building(building, formats, out_dir)
+
+                for workers in WORKER_COUNTS:
+                    reported = {}
+                    exporter.combine_calls = 0
+                    start_time = time.perf_counter()
+                    exporter.export_building(
+                        building, formats, out_dir, max_workers=workers,
+                        on_format_exported=lambda name, path, size: reported.setdefault(
+                            name, time.perf_counter() - start_time)
+                    )
+                    elapsed = time.perf_counter() - start_time
+
+                    print(f"🏠 {num_rooms:4d} rooms ({building.total_faces:6d} faces) "
+                          f"{'+'.join(formats):18s} workers={workers} {elapsed * 1000:8.1f}ms, "
+                          f"GLB after {reported['glb'] * 1000:6.1f}ms, "
+                          f"combine passes: {exporter.combine_calls}")
+
+
+if __name__ == "__main__":
+    setup_logging(log_level="WARNING")
+    benchmark([int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400])
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark mesh generation, cutouts, assembly and mesh combination for a
+synthetic building (200 rooms by default).
+
+Reports wall time, the tracemalloc peak and the number of memory blocks
+still held by the finished building.
+
+Run with: python3 scripts/benchmark_geometry.py [num_rooms]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logging
+from models.data_structures import ScaledCoordinates
+from services.room_generator import RoomMeshGenerator
+from services.wall_generator import WallMeshGenerator
+from services.opening_cutout_generator import OpeningCutoutGenerator
+from services.mesh_exporter import MeshExporter
+from core.floorplan_processor import FloorPlanProcessor
+
+ROOM_SIZE_FEET = 12.0
+ROOMS_PER_ROW = 20
+
+
+def make_scaled_coordinates(num_rooms: int) -> ScaledCoordinates:
+    """
+    Grid of square rooms; every other room also gets an L-shaped polygon.
+
+    Args:
+        num_rooms: Number of rooms
+
+    Returns:
+        ScaledCoordinates with rooms, wall loop, doors and windows in feet
+    """
+    rooms_feet = {}
+    room_polygons = {}
+    doors = []
+    windows = []
+
+    for index in range(num_rooms):
+        x = (index % ROOMS_PER_ROW) * ROOM_SIZE_FEET
+        y = (index // ROOMS_PER_ROW) * ROOM_SIZE_FEET
+        name = f"room_{index:03d}"
+        rooms_feet[name] = {
+            "width_feet": ROOM_SIZE_FEET,
+            "length_feet": ROOM_SIZE_FEET,
+            "area_sqft": ROOM_SIZE_FEET * ROOM_SIZE_FEET,
+            "x_offset_feet": x,
+            "y_offset_feet": y
+        }
+        if index % 2:
+            half = ROOM_SIZE_FEET / 2
+            room_polygons[name] = [
+                (x, y), (x + ROOM_SIZE_FEET, y), (x + ROOM_SIZE_FEET, y + half),
+                (x + half, y + half), (x + half, y + ROOM_SIZE_FEET), (x, y + ROOM_SIZE_FEET)
+            ]
+        doors.append((x + ROOM_SIZE_FEET / 2, y))
+        windows.append((x, y + ROOM_SIZE_FEET / 2))
+
+    # Serpentine wall polyline across the grid rows
+    rows = (num_rooms + ROOMS_PER_ROW - 1) // ROOMS_PER_ROW
+    width = ROOMS_PER_ROW * ROOM_SIZE_FEET
+    walls = []
+    for row in range(rows + 1):
+        y = row * ROOM_SIZE_FEET
+        ends = [(0.0, y), (width, y)]
+        walls.extend(ends if row % 2 == 0 else ends[::-1])
+
+    return ScaledCoordinates(
+        walls_feet=walls,
+        rooms_feet=rooms_feet,
+        door_coordinates=doors,
+        window_coordinates=windows,
+        room_polygons=room_polygons,
+        scale_reference={
+            "room_type": "room_000",
+            "dimension_type": "width",
+            "real_world_feet": ROOM_SIZE_FEET,
+            "pixel_measurement": ROOM_SIZE_FEET,
+            "scale_factor": 1.0
+        },
+        total_building_size={
+            "width_feet": width,
+            "length_feet": rows * ROOM_SIZE_FEET,
+            "area_sqft": width * rows * ROOM_SIZE_FEET,
+            "scale_factor": 1.0,
+            "original_width_pixels": int(width),
+            "original_height_pixels": int(rows * ROOM_SIZE_FEET)
+        }
+    )
+
+
+def build_building(scaled_coords: ScaledCoordinates):
+    """Rooms, walls, cutouts and assembly, as in the processing pipeline."""
+    rooms = RoomMeshGenerator().generate_room_meshes(scaled_coords)
+    walls = WallMeshGenerator().generate_wall_meshes(scaled_coords)
+    walls = OpeningCutoutGenerator().generate_cutouts(scaled_coords, walls)
+    processor = FloorPlanProcessor.__new__(FloorPlanProcessor)
+    return processor._assemble_building(rooms, walls, scaled_coords)
+
+
+def benchmark(num_rooms: int = 200) -> None:
+    scaled_coords = make_scaled_coordinates(num_rooms)
+    exporter = MeshExporter()
+
+    # Warm-up run so imports and caches do not count
+    build_building(scaled_coords)
+
+    start_time = time.perf_counter()
+    building = build_building(scaled_coords)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    combined = exporter._combine_building_meshes(building)
+    combine_time = time.perf_counter() - start_time
+    del building, combined
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    building = build_building(scaled_coords)
+    combined = exporter._combine_building_meshes(building)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    held = snapshot.compare_to(baseline, "filename")
+    held_blocks = sum(stat.count_diff for stat in held)
+    held_bytes = sum(stat.size_diff for stat in held)
+
+    print(f"🏠 {num_rooms} rooms, {len(building.walls)} walls: "
+          f"{building.total_vertices} vertices, {building.total_faces} faces")
+    print(f"⏱️  Generate + cutouts + assemble: {build_time * 1000:.1f}ms")
+    print(f"⏱️  Combine into trimesh: {combine_time * 1000:.1f}ms")
+    print(f"📦 Peak traced memory: {peak_bytes / 1024:.0f} KiB")
+    print(f"📦 Blocks held by building + combined mesh: {held_blocks} ({held_bytes / 1024:.0f} KiB)")
+    print(f"   Combined mesh: {len(combined.vertices)} vertices, {len(combined.faces)} faces")
+
+
+if __name__ == "__main__":
+    setup_logging(log_level="WARNING")
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
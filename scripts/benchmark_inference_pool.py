@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark CubiCasa5K inference under concurrent uploads.
+
+Submits the same burst of uploads (8 concurrent by default) from a thread
+pool, once to CubiCasaService.process_image in the benchmark process and
+once to an InferencePool of worker processes, and reports the throughput and
+the p50/p99 latency of each. When the model checkpoint cannot be loaded, a
+randomly initialised CubiCasa5K network with a zeroed output layer stands
+in: the forward pass costs the same, and post-processing does not trace
+the noise a random head would predict.
+
+Run with: python3 scripts/benchmark_inference_pool.py
+          [--uploads 8] [--rounds 3] [--workers 4] [--threads 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image, ImageDraw
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.cubicasa_service import CubiCasaService, CubiCasaError
+from services.floortrans.models import hg_furukawa_original
+from services.inference_pool import InferencePool
+from config.settings import CUBICASA_WORKER_MAX_RSS_MB
+
+
+def load_service():
+    """CubiCasaService with the checkpoint, or around a randomly initialised network."""
+    try:
+        return CubiCasaService(), "model"
+    except CubiCasaError as e:
+        print(f"⚠️  {e}; using a randomly initialised network")
+
+    # Constructed directly: get_model also loads pretrained pose weights
+    model = hg_furukawa_original(n_classes=51)
+    model.conv4_ = torch.nn.Conv2d(256, 44, bias=True, kernel_size=1)
+    torch.nn.init.zeros_(model.conv4_.weight)
+    torch.nn.init.zeros_(model.conv4_.bias)
+    model.upsample = torch.nn.ConvTranspose2d(44, 44, kernel_size=4, stride=4)
+    model.eval()
+
+    service = CubiCasaService(load_model=False)
+    service.model = model
+    service.profile_postprocessing = False
+    service.tiled_inference = False
+    service.max_batch_size = 1
+    service.batcher = None
+    return service, "random"
+
+
+def load_worker_service():
+    """Loader each pool worker runs, so workers load the model the same way."""
+    return load_service()[0]
+
+
+def make_upload(seed: int) -> bytes:
+    """1600x1200 plan with a few rectangular rooms."""
+    rng = np.random.default_rng(seed)
+    image = Image.new('RGB', (1600, 1200), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.integers(50, 1100), rng.integers(50, 800)
+        draw.rectangle([x, y, x + rng.integers(200, 450), y + rng.integers(200, 350)], outline=(0, 0, 0), width=8)
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def run_burst(process_image, uploads):
+    """Submit all uploads at once; per-upload latencies and total wall time in seconds."""
+    def timed(args):
+        start_time = time.perf_counter()
+        process_image(*args)
+        return time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+        latencies = list(executor.map(timed, uploads))
+    return latencies, time.perf_counter() - start_time
+
+
+def report(name, latencies, elapsed, count):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"   ⏱️  {name:28s} {count / elapsed:6.2f} img/s  p50 {p50:8.1f}ms  p99 {p99:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent uploads per burst")
+    parser.add_argument("--rounds", type=int, default=3, help="Bursts per backend")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Pool worker processes")
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    args = parser.parse_args()
+
+    service, source = load_service()
+    uploads = [(make_upload(seed), f"bench_{seed}") for seed in range(args.uploads)]
+    service.process_image(*uploads[0])  # warm up the in-process backend
+
+    print(f"🖼️  {args.uploads} concurrent uploads x {args.rounds} rounds ({source} weights, "
+          f"{os.cpu_count()} CPUs, torch threads {torch.get_num_threads()})")
+
+    backends = [("in-process", service.process_image)]
+    # Imported by module name, so worker processes can unpickle the loader
+    from scripts.benchmark_inference_pool import load_worker_service as load_worker
+    pool = InferencePool(load_worker, num_workers=args.workers, threads_per_worker=args.threads,
+                         max_rss_mb=CUBICASA_WORKER_MAX_RSS_MB)
+    pool.start()
+    pool.wait_ready()
+    backends.append((f"pool {args.workers}x{args.threads} threads", pool.process_image))
+
+    try:
+        for name, process_image in backends:
+            latencies, elapsed = [], 0.0
+            for _ in range(args.rounds):
+                burst_latencies, burst_elapsed = run_burst(process_image, uploads)
+                latencies += burst_latencies
+                elapsed += burst_elapsed
+            report(name, latencies, elapsed, len(latencies))
+    finally:
+        pool.close()
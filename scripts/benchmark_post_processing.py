@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark CubiCasa5K post-processing (get_polygons) on synthetic
+predictions: a grid of rooms with wall junction heatmaps, a door on every
+room's lower wall and one icon per room, plus noise.
+
+Reports the time of the individual post-processing stages and of the whole
+get_polygons call per prediction size, then times junction pairing
+(calc_point_info and find_icons) on random junction clouds of 100 to 2,000
+points and the room classification and merge of the junction grid cells on
+a high-junction plan.
+
+Run with: python3 scripts/benchmark_post_processing.py [sizes...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.floortrans.post_prosessing import (
+    split_prediction,
+    get_polygons,
+    get_wall_polygon,
+    get_rectangle_polygons,
+    get_polygon_class,
+    get_rectangle_class,
+    merge_rectangles,
+    extract_local_max,
+    calc_point_info,
+    find_icons
+)
+
+SPLIT = [21, 12, 11]
+THRESHOLD = 0.2
+ROOMS_PER_SIDE = 5
+
+# Wall junction heatmap channel by (is top, is bottom, is left, is right) of a grid node
+L_JUNCTIONS = {(True, False, True, False): 6, (True, False, False, True): 7,
+               (False, True, True, False): 5, (False, True, False, True): 4}
+T_JUNCTIONS = {(True, False): 8, (False, True): 10}
+
+POINT_ORIENTATIONS = [[(2, ), (3, ), (0, ), (1, )],
+                      [(0, 3), (0, 1), (1, 2), (2, 3)],
+                      [(1, 2, 3), (0, 2, 3), (0, 1, 3), (0, 1, 2)],
+                      [(0, 1, 2, 3)]]
+POINT_COUNTS = [100, 250, 500, 1000, 2000]
+JUNCTION_COUNTS = [50, 100]
+
+
+def make_prediction(size: int, rooms_per_side: int = ROOMS_PER_SIDE, seed: int = 0) -> torch.Tensor:
+    """
+    Build a (1, 44, size, size) prediction tensor for a grid of rooms.
+
+    Args:
+        size: Prediction height and width in pixels
+        rooms_per_side: Rooms per grid row and column
+        seed: Seed for room classes and noise
+
+    Returns:
+        Prediction tensor as returned by the model
+    """
+    rng = np.random.default_rng(seed)
+    prediction = np.zeros((44, size, size), np.float32)
+    prediction[SPLIT[0]] = 5.0  # background room logit
+    prediction[SPLIT[0] + SPLIT[1]] = 5.0  # background icon logit
+    yy, xx = np.mgrid[0:size, 0:size]
+
+    def add_blob(channel, x, y, sigma=3.0):
+        blob = np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * sigma ** 2))
+        prediction[channel] = np.maximum(prediction[channel], blob)
+
+    margin = size // 10
+    cell = (size - 2 * margin) // rooms_per_side
+    lines = [margin + index * cell for index in range(rooms_per_side + 1)]
+    wall = max(size // 128, 2)
+
+    for row in range(rooms_per_side):
+        for col in range(rooms_per_side):
+            x0, x1 = lines[col], lines[col + 1]
+            y0, y1 = lines[row], lines[row + 1]
+            prediction[SPLIT[0] + int(rng.choice([3, 4, 5, 6, 7, 9, 10])), y0:y1, x0:x1] = 10.0
+
+            # Door on the lower wall: left and right end points, door class 2
+            door_half = cell // 6
+            center = (x0 + x1) // 2
+            add_blob(13, center - door_half, y1)
+            add_blob(14, center + door_half, y1)
+            prediction[SPLIT[0] + SPLIT[1] + 2, y1 - wall:y1 + wall, center - door_half:center + door_half] = 10.0
+
+            # Icon in the upper left quarter of the room
+            ix0, iy0 = x0 + cell // 8, y0 + cell // 8
+            ix1, iy1 = ix0 + cell // 4, iy0 + cell // 4
+            prediction[SPLIT[0] + SPLIT[1] + 4, iy0:iy1, ix0:ix1] = 10.0
+            for channel, (x, y) in zip((17, 18, 20, 19), ((ix0, iy0), (ix1, iy0), (ix1, iy1), (ix0, iy1))):
+                add_blob(channel, x, y)
+
+    for y in lines:
+        prediction[SPLIT[0] + 2, y - wall:y + wall, lines[0] - wall:lines[-1] + wall] = 20.0
+    for x in lines:
+        prediction[SPLIT[0] + 2, lines[0] - wall:lines[-1] + wall, x - wall:x + wall] = 20.0
+
+    for y in lines:
+        for x in lines:
+            top, bottom = y == lines[0], y == lines[-1]
+            left, right = x == lines[0], x == lines[-1]
+            if (top or bottom) and (left or right):
+                channel = L_JUNCTIONS[(top, bottom, left, right)]
+            elif top or bottom:
+                channel = T_JUNCTIONS[(top, bottom)]
+            elif left or right:
+                channel = 11 if left else 9
+            else:
+                channel = 12
+            add_blob(channel, x, y)
+
+    prediction += rng.normal(0, 0.05, prediction.shape).astype(np.float32)
+    return torch.from_numpy(prediction)[None]
+
+
+def split(prediction: torch.Tensor):
+    size = prediction.shape[2:]
+    return split_prediction(prediction, size, SPLIT)
+
+
+def time_call(function, *args, repeat: int = 3) -> float:
+    """Best wall time of repeat calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start_time)
+    return best * 1000
+
+
+def stage_peak_extraction(heatmaps, rooms, icons):
+    for index in range(13):
+        extract_local_max(heatmaps[index], 100, [index // 4, index % 4], THRESHOLD, close_point_suppression=True)
+    for index in range(13, 21):
+        extract_local_max(heatmaps[index], 100, [0, 0], THRESHOLD)
+
+
+def stage_wall_polygons(heatmaps, rooms, icons):
+    height, width = rooms.shape[1:]
+    orientation_ranges = [[width, 0, 0, 0],
+                          [width, height, width, 0],
+                          [width, height, 0, height],
+                          [0, height, 0, 0]]
+    get_wall_polygon(heatmaps[:13], rooms, THRESHOLD, [2, 8], POINT_ORIENTATIONS, orientation_ranges)
+
+
+def stage_get_polygons(heatmaps, rooms, icons):
+    get_polygons((heatmaps.copy(), rooms.copy(), icons.copy()), THRESHOLD, [1, 2])
+
+
+STAGES = [
+    ("peak extraction (21 heatmaps)", stage_peak_extraction),
+    ("wall polygons", stage_wall_polygons),
+    ("get_polygons", stage_get_polygons),
+]
+
+
+def make_junction_cloud(num_points: int, size: int = 2048, grid: int = 16, seed: int = 0) -> list:
+    """
+    Build random junction points snapped near a coarse grid so many line up.
+
+    Args:
+        num_points: Number of junctions
+        size: Plan height and width in pixels
+        grid: Grid spacing in pixels
+        seed: Seed for positions and junction types
+
+    Returns:
+        Points as [x, y, type, subtype, value] like extract_local_max returns
+    """
+    rng = np.random.default_rng(seed)
+    points = []
+    for _ in range(num_points):
+        x, y = rng.integers(0, size // grid, 2) * grid + rng.integers(-3, 4, 2)
+        point_type = int(rng.integers(0, 4))
+        subtype = int(rng.integers(0, len(POINT_ORIENTATIONS[point_type])))
+        points.append([int(x), int(y), point_type, subtype, float(rng.uniform(0.2, 1.0))])
+    return points
+
+
+def benchmark_point_pairing(counts, size: int = 2048) -> None:
+    orientation_ranges = [[size, 0, 0, 0],
+                          [size, size, size, 0],
+                          [size, size, 0, size],
+                          [0, size, 0, 0]]
+    for num_points in counts:
+        points = make_junction_cloud(num_points, size)
+        lines, _, _ = calc_point_info(points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size)
+        print(f"📍 {num_points} junctions: {len(lines)} lines")
+        pairing_time = time_call(calc_point_info, points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size)
+        icons_time = time_call(find_icons, points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size)
+        print(f"   ⏱️  {'calc_point_info':32s} {pairing_time:9.1f}ms")
+        print(f"   ⏱️  {'find_icons':32s} {icons_time:9.1f}ms")
+
+
+def classify_cells(classify, grid_polygons, room_seg_2D) -> None:
+    for polygon in grid_polygons:
+        classify(polygon, room_seg_2D)
+
+
+def benchmark_room_classification(counts, size: int = 1024) -> None:
+    rng = np.random.default_rng(0)
+    room_seg_2D = np.kron(rng.integers(0, 12, (size // 32, size // 32)), np.ones((32, 32), int))
+    for num_junctions in counts:
+        junction_points = rng.integers(0, size, (num_junctions, 2))
+        grid_polygons = get_rectangle_polygons(junction_points, (size, size))
+        print(f"🧩 {num_junctions} junctions: {len(grid_polygons)} grid cells at {size}x{size}")
+        for name, classify in (("get_polygon_class (rasterized)", get_polygon_class),
+                               ("get_rectangle_class (sliced)", get_rectangle_class)):
+            print(f"   ⏱️  {name:32s} {time_call(classify_cells, classify, grid_polygons, room_seg_2D, repeat=1):9.1f}ms")
+
+        room_types = [{'type': 'room', 'class': get_rectangle_class(polygon, room_seg_2D)} for polygon in grid_polygons]
+        for method in ("shapely", "grid"):
+            name = f"merge_rectangles ({method})"
+            print(f"   ⏱️  {name:32s} {time_call(merge_rectangles, list(grid_polygons), room_types, method):9.1f}ms")
+
+
+def benchmark(sizes) -> None:
+    for size in sizes:
+        heatmaps, rooms, icons = split(make_prediction(size))
+        polygons, types, room_polygons, _ = get_polygons((heatmaps.copy(), rooms.copy(), icons.copy()),
+                                                         THRESHOLD, [1, 2])
+        print(f"🖼️  {size}x{size}: {len(polygons)} polygons, {len(room_polygons)} rooms")
+        for name, stage in STAGES:
+            print(f"   ⏱️  {name:32s} {time_call(stage, heatmaps, rooms, icons):9.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark([int(arg) for arg in sys.argv[1:]] or [256, 512, 1024])
+    benchmark_point_pairing(POINT_COUNTS)
+    benchmark_room_classification(JUNCTION_COUNTS)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Post-processing regression benchmark over the bundled sample floor plans
+(assets/calibration).
+
+Runs get_polygons on the CubiCasa5K prediction of every sample image and
+records the wall time of the individual post-processing functions. The
+first run (or --update-baseline) writes the times to a baseline file; later
+runs compare against it and exit with status 1 when a function got slower
+than the baseline by more than the tolerance. Times depend on the machine,
+so the baseline is kept locally (temp/ by default) rather than in the repo.
+
+Predictions come from the CubiCasa5K model loaded by CubiCasaService. When
+the model cannot be loaded, synthetic grid predictions from
+benchmark_post_processing stand in for the images; the baseline records
+which source it was taken with and is only compared against the same one.
+
+Run with: python3 scripts/benchmark_post_processing_regression.py
+          [--update-baseline] [--baseline PATH] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.floortrans import post_prosessing
+from services.floortrans.post_prosessing import split_prediction, get_working_shape
+from services.model_quantizer import load_calibration_images
+from services.cubicasa_service import CubiCasaService, CubiCasaError
+from scripts.benchmark_post_processing import make_prediction
+
+SAMPLES_DIR = project_root / "assets" / "calibration"
+DEFAULT_BASELINE = project_root / "temp" / "post_processing_baseline.json"
+SPLIT = [21, 12, 11]
+
+# Timed post-processing functions; times include nested timed calls
+FUNCTIONS = [
+    "get_polygons",
+    "get_wall_polygon",
+    "remove_overlapping_walls",
+    "get_icon_polygon",
+    "get_opening_polygon",
+    "extract_opening_polygon",
+    "get_junction_points",
+    "get_rectangle_polygons",
+    "get_rectangle_class",
+    "merge_rectangles",
+    "remove_overlapping_openings",
+]
+
+# Slowdowns smaller than this many milliseconds are timer noise
+MIN_REGRESSION_MS = 5.0
+
+
+@contextmanager
+def timed_functions(names):
+    """Wrap post-processing module functions to accumulate their wall time."""
+    totals = {name: 0.0 for name in names}
+    originals = {name: getattr(post_prosessing, name) for name in names}
+
+    def wrap(name, function):
+        def timed(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[name] += time.perf_counter() - start_time
+        return timed
+
+    for name, function in originals.items():
+        setattr(post_prosessing, name, wrap(name, function))
+    try:
+        yield totals
+    finally:
+        for name, function in originals.items():
+            setattr(post_prosessing, name, function)
+
+
+def make_service():
+    """
+    CubiCasaService with the model loaded, or a post-processing-only
+    instance when the model is unavailable.
+
+    Returns:
+        Service and prediction source ("model" or "synthetic")
+    """
+    try:
+        return CubiCasaService(), "model"
+    except CubiCasaError as e:
+        print(f"⚠️  {e}; using synthetic predictions")
+
+    service = CubiCasaService(load_model=False)
+    service.profile_postprocessing = False
+    service.tiled_inference = False
+    return service, "synthetic"
+
+
+def load_predictions(service: CubiCasaService, source: str):
+    """
+    Predictions for the sample images at the service's working resolution.
+
+    Returns:
+        List of (image name, (heatmaps, rooms, icons))
+    """
+    images = load_calibration_images(SAMPLES_DIR)
+    predictions = []
+    for index, (name, image_bytes) in enumerate(images):
+        image_tensor, letterbox = service._preprocess_image(image_bytes)
+        width, height = letterbox.original_size
+        if source == "model":
+            outputs = letterbox.crop(service._forward(image_tensor))
+        else:
+            outputs = make_prediction(service.INPUT_SIZE, seed=index)
+        shape = get_working_shape((height, width), service.postprocess_max_size)
+        predictions.append((name, split_prediction(outputs, shape, SPLIT)))
+
+    return predictions
+
+
+def time_post_processing(service: CubiCasaService, predictions, repeat: int = 3):
+    """Best per-function time over repeat get_polygons runs, in milliseconds."""
+    results = {}
+    for name, (heatmaps, rooms, icons) in predictions:
+        best = {function: float("inf") for function in FUNCTIONS}
+        for _ in range(repeat):
+            with timed_functions(FUNCTIONS) as totals:
+                post_prosessing.get_polygons((heatmaps.copy(), rooms.copy(), icons.copy()),
+                                             service.HEATMAP_THRESHOLD, service.OPENING_TYPES,
+                                             service.room_merge)
+            for function, total in totals.items():
+                best[function] = min(best[function], total * 1000)
+        results[name] = best
+
+    return results
+
+
+def compare(results, baseline, tolerance: float):
+    """Functions slower than baseline * (1 + tolerance), as report lines."""
+    regressions = []
+    for name, times in results.items():
+        for function, elapsed in times.items():
+            reference = baseline.get(name, {}).get(function)
+            if reference is None:
+                continue
+            if elapsed > reference * (1 + tolerance) and elapsed - reference > MIN_REGRESSION_MS:
+                regressions.append(f"{name} {function}: {reference:.1f}ms -> {elapsed:.1f}ms")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown per function (default 0.25)")
+    args = parser.parse_args()
+
+    service, source = make_service()
+    predictions = load_predictions(service, source)
+    results = time_post_processing(service, predictions)
+
+    for name, times in results.items():
+        print(f"🖼️  {name} ({source})")
+        for function in FUNCTIONS:
+            print(f"   ⏱️  {function:32s} {times[function]:9.1f}ms")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if args.update_baseline or baseline is None:
+        args.baseline.write_text(json.dumps({"source": source, "images": results}, indent=2) + "\n")
+        print(f"📝 Baseline written to {args.baseline}")
+        return 0
+
+    if baseline["source"] != source:
+        print(f"⚠️  Baseline was taken with {baseline['source']} predictions, not {source}; not compared")
+        return 0
+
+    regressions = compare(results, baseline["images"], args.tolerance)
+    for line in regressions:
+        print(f"❌ {line}")
+    if regressions:
+        return 1
+    print(f"✅ No function slower than baseline by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
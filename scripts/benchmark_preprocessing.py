@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark CubiCasa5K image preprocessing on large synthetic uploads.
+
+Compares the former preprocessing (full decode to a numpy array, cv2.resize
+to a stretched 512x512 square, float division) against letterbox_image
+(reduced JPEG decode, aspect-preserving resize, letterbox padding) for JPEG
+and PNG floor plans of growing size. Reports the wall time and the peak
+traced allocation of each. tracemalloc sees numpy and torch buffers but not
+Pillow's own decode buffers, so the full-size decode of formats without
+reduced decoding (PNG) is missing from both columns.
+
+Run with: python3 scripts/benchmark_preprocessing.py [widths...]
+"""
+
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image, ImageDraw
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.image_preprocessing import letterbox_image
+
+WIDTHS = [2048, 4096, 8192]
+INPUT_SIZE = 512
+
+
+def make_upload(width: int, image_format: str) -> bytes:
+    """White 4:3 plan with a grid of thin black walls and noise, so it does not compress away."""
+    height = width * 3 // 4
+    rng = np.random.default_rng(0)
+    pixels = np.full((height, width, 3), 255, dtype=np.uint8)
+    pixels -= rng.integers(0, 24, pixels.shape, dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    draw = ImageDraw.Draw(image)
+    step = width // 16
+    for offset in range(0, width, step):
+        draw.line([(offset, 0), (offset, height)], fill=(0, 0, 0), width=max(2, width // 1000))
+        draw.line([(0, offset * 3 // 4), (width, offset * 3 // 4)], fill=(0, 0, 0), width=max(2, width // 1000))
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=95)
+    return buffer.getvalue()
+
+
+def squash_preprocess(image_bytes: bytes) -> torch.Tensor:
+    """Preprocessing before letterboxing, for comparison."""
+    image = Image.open(BytesIO(image_bytes))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image_np = np.array(image)
+    image_resized = cv2.resize(image_np, (INPUT_SIZE, INPUT_SIZE))
+    image_normalized = image_resized.astype(np.float32) / 255.0
+    return torch.from_numpy(image_normalized).permute(2, 0, 1).unsqueeze(0)
+
+
+def measure(function, *args, repeat: int = 3):
+    """Best wall time in milliseconds and peak traced allocation in MB."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / (1024 * 1024)
+
+
+if __name__ == "__main__":
+    widths = [int(arg) for arg in sys.argv[1:]] or WIDTHS
+
+    for width in widths:
+        for image_format in ["JPEG", "PNG"]:
+            upload = make_upload(width, image_format)
+            print(f"🖼️  {width}x{width * 3 // 4} {image_format}: {len(upload) / (1024 * 1024):.1f} MB")
+            for name, function, args in [("squash (before)", squash_preprocess, (upload,)),
+                                         ("letterbox", letterbox_image, (upload, [INPUT_SIZE]))]:
+                elapsed, peak = measure(function, *args)
+                print(f"   ⏱️  {name:32s} {elapsed:9.1f}ms {peak:9.1f}MB peak")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark CubiCasa5K cold start: unpickled checkpoint vs mapped weights.
+
+Writes a synthetic training checkpoint (random CubiCasa5K weights plus
+Adam optimizer state, as in the released checkpoint) to a temporary
+directory, then starts a fresh Python process per loading path and
+reports the time from import to the end of the first 512x512 inference,
+and the process's anonymous (private) and file-backed resident memory.
+
+  pickle  torch.load of the whole checkpoint, weights copied into an
+          initialised model (the loading path before the weight cache)
+  mmap    CubiCasaService._load_model with the weight cache, after the
+          one-time conversion
+  compiled  as mmap, plus the cached frozen TorchScript model with its
+          constants mapped from the file next to the artifact
+
+File-backed pages of the mapped weights are shared between processes, so
+anonymous RSS is the per-process cost; freed heap memory is returned to
+the OS (glibc malloc_trim) before it is read, so it counts live memory. The weights file is in the page
+cache on the mmap run; a cold page cache adds the read from disk.
+
+Run with: python3 scripts/benchmark_weight_loading.py [--rounds 3]
+"""
+
+import argparse
+import ctypes
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+START_TIME = time.perf_counter()
+
+import torch
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.floortrans.models import hg_furukawa_original
+from services.cubicasa_service import CubiCasaService
+from services.weight_cache import weight_cache_path
+
+
+def build_model() -> torch.nn.Module:
+    model = hg_furukawa_original(n_classes=51)
+    model.conv4_ = torch.nn.Conv2d(256, 44, bias=True, kernel_size=1)
+    model.upsample = torch.nn.ConvTranspose2d(44, 44, kernel_size=4, stride=4)
+    return model
+
+
+def write_checkpoint(checkpoint_path: Path) -> None:
+    """Checkpoint with model_state and Adam state for every parameter."""
+    model = build_model()
+    optimizer_state = {
+        index: {"step": torch.tensor(1000.0), "exp_avg": torch.randn_like(p), "exp_avg_sq": torch.rand_like(p)}
+        for index, p in enumerate(model.parameters())
+    }
+    torch.save({"epoch": 400, "model_state": model.state_dict(),
+                "optimizer_state": {"state": optimizer_state}}, checkpoint_path)
+
+
+def memory_mb() -> dict:
+    """VmHWM (peak RSS), RssAnon and RssFile of this process from /proc/self/status, in MB."""
+    memory = {}
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(("VmHWM:", "RssAnon:", "RssFile:")):
+                name, value, _ = line.split()
+                memory[name.rstrip(":")] = int(value) / 1024
+    return memory
+
+
+def load_pickle(checkpoint_path: Path) -> torch.nn.Module:
+    checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
+    model = build_model()
+    model.load_state_dict(checkpoint["model_state"])
+    return model
+
+
+def load_mapped(checkpoint_path: Path, compile_model: bool = False) -> torch.nn.Module:
+    service = CubiCasaService(models_dir=str(checkpoint_path.parent), load_model=False)
+    service.model_path = checkpoint_path
+    service.weight_cache_enabled = True
+    service.precision = "fp32"
+    service.compile_enabled = compile_model
+    service._load_model()
+    return service.compiled_model if compile_model else service.model
+
+
+def run_child(mode: str, checkpoint_path: Path) -> None:
+    load_start = time.perf_counter()
+    if mode == "pickle":
+        model = load_pickle(checkpoint_path).eval()
+    else:
+        model = load_mapped(checkpoint_path, compile_model=(mode == "compiled")).eval()
+    load_time = (time.perf_counter() - load_start) * 1000
+    with torch.no_grad():
+        model(torch.rand(1, 3, 512, 512))
+    elapsed = (time.perf_counter() - START_TIME) * 1000
+    ctypes.CDLL("libc.so.6").malloc_trim(0)
+    memory = memory_mb()
+    print(f"{load_time:.1f} {elapsed:.1f} {memory['VmHWM']:.1f} {memory['RssAnon']:.1f} {memory['RssFile']:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="Cold starts per loading path")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CHECKPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], Path(args.child[1]))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_path = Path(directory) / CubiCasaService.MODEL_FILENAME
+        write_checkpoint(checkpoint_path)
+        load_mapped(checkpoint_path, compile_model=True)  # one-time conversion and compile
+        print(f"🖼️  checkpoint {checkpoint_path.stat().st_size / (1024 * 1024):.0f} MB, "
+              f"weights file {weight_cache_path(checkpoint_path).stat().st_size / (1024 * 1024):.0f} MB")
+
+        for mode in ["pickle", "mmap", "compiled"]:
+            runs = []
+            for _ in range(args.rounds):
+                output = subprocess.run([sys.executable, __file__, "--child", mode, str(checkpoint_path)],
+                                        capture_output=True, text=True, check=True).stdout
+                runs.append([float(value) for value in output.split()[-5:]])
+            load_time, elapsed, peak, anon, file_backed = (min(column) for column in zip(*runs))
+            print(f"   ⏱️  {mode:8s} load {load_time:7.1f}ms  first inference after {elapsed:8.1f}ms  "
+                  f"peak RSS {peak:7.1f}MB  RssAnon {anon:7.1f}MB  RssFile {file_backed:7.1f}MB")
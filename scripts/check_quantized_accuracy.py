@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Compare int8 against fp32 CubiCasa5K results on the calibration set.
+Run before enabling CUBICASA_INFERENCE_PRECISION=int8 in a deployment.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+def check_quantized_accuracy():
+    """Load the model in int8 mode and run the accuracy check."""
+    os.environ["CUBICASA_INFERENCE_PRECISION"] = "int8"
+    
+    from services.cubicasa_service import CubiCasaService
+    
+    print("🔄 Loading CubiCasa5K model in int8 mode...")
+    service = CubiCasaService()
+    if service.quantized_model is None:
+        print(f"❌ Quantization failed: {service.quantize_error}")
+        return False
+    
+    report = service.check_quantized_accuracy()
+    print(json.dumps(report, indent=2))
+    
+    if report["passed"]:
+        print("✅ int8 results match fp32 within tolerance")
+    else:
+        print("❌ int8 results differ from fp32, keep CUBICASA_INFERENCE_PRECISION=fp32")
+    return report["passed"]
+
+if __name__ == "__main__":
+    success = check_quantized_accuracy()
+    sys.exit(0 if success else 1)
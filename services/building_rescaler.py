@@ -0,0 +1,225 @@
+"""
+Building Rescaler for PlanCast.
+
+Fast path for changing the scale reference of a finished job. The building
+is persisted once in pixel space (x/y in image pixels, z in feet); a new
+scale factor is then a single transform diag(1/s, 1/s, 1) applied to every
+vertex, followed by a re-export. Room, wall and cutout generation are not
+re-run.
+"""
+
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.data_structures import (
+    Building3D,
+    Room3D,
+    Wall3D,
+    MeshExportResult
+)
+from services.mesh_exporter import MeshExporter
+from utils.logger import get_logger
+
+logger = get_logger("building_rescaler")
+
+PIXEL_BUILDING_FILENAME = "building_pixels.json"
+
+
+class RescaleError(Exception):
+    """Custom exception for building rescaling errors."""
+    pass
+
+
+def transform_building(building: Building3D, xy_factor: float) -> Building3D:
+    """
+    Scale the plan (x/y) of a building by a constant factor.
+
+    Heights stay in feet. Face arrays are shared with the input, since
+    the topology does not change.
+
+    Args:
+        building: Building to transform
+        xy_factor: Multiplier for x and y coordinates
+
+    Returns:
+        New Building3D with scaled geometry
+    """
+    if xy_factor <= 0:
+        raise RescaleError(f"Scale multiplier must be positive, got {xy_factor}")
+
+    scale = (xy_factor, xy_factor, 1.0)
+    rooms = []
+    walls = []
+    bounds = []
+
+    for room in building.rooms:
+        mesh = room.mesh.transformed(scale)
+        if mesh.vertex_count:
+            bounds.append(mesh.bounds)
+        rooms.append(Room3D.model_construct(
+            name=room.name,
+            mesh=mesh,
+            elevation_feet=room.elevation_feet,
+            height_feet=room.height_feet
+        ))
+
+    for wall in building.walls:
+        mesh = wall.mesh.transformed(scale)
+        if mesh.vertex_count:
+            bounds.append(mesh.bounds)
+        walls.append(Wall3D.model_construct(
+            id=wall.id,
+            mesh=mesh,
+            height_feet=wall.height_feet,
+            thickness_feet=wall.thickness_feet * xy_factor
+        ))
+
+    if bounds:
+        bounds = np.stack(bounds)
+        mins, maxs = bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)
+        bounding_box = {
+            "min_x": float(mins[0]), "max_x": float(maxs[0]),
+            "min_y": float(mins[1]), "max_y": float(maxs[1]),
+            "min_z": float(mins[2]), "max_z": float(maxs[2])
+        }
+    else:
+        bounding_box = {
+            key: (value * xy_factor if key[-1] in "xy" else value)
+            for key, value in building.bounding_box.items()
+        }
+
+    return Building3D.model_construct(
+        rooms=rooms,
+        walls=walls,
+        total_vertices=building.total_vertices,
+        total_faces=building.total_faces,
+        bounding_box=bounding_box,
+        export_ready=building.export_ready
+    )
+
+
+class BuildingRescaler:
+    """
+    Re-scales persisted pixel-space buildings and re-exports them.
+    """
+
+    def __init__(self, mesh_exporter: Optional[MeshExporter] = None):
+        """
+        Initialize the rescaler.
+
+        Args:
+            mesh_exporter: Exporter used for re-exports (created if omitted)
+        """
+        self.mesh_exporter = mesh_exporter or MeshExporter()
+
+    def to_pixel_space(self, building: Building3D, scale_factor: float) -> Building3D:
+        """
+        Convert a building in feet to pixel space.
+
+        Args:
+            building: Building with x/y in feet
+            scale_factor: Pixels per foot the building was generated with
+
+        Returns:
+            Building with x/y in image pixels (z still in feet)
+        """
+        return transform_building(building, scale_factor)
+
+    def apply_scale(self, pixel_building: Building3D, scale_factor: float) -> Building3D:
+        """
+        Produce the building in feet for a new scale factor.
+
+        Args:
+            pixel_building: Building in pixel space
+            scale_factor: New pixels per foot
+
+        Returns:
+            Building with x/y in feet
+        """
+        if scale_factor <= 0:
+            raise RescaleError(f"Scale factor must be positive, got {scale_factor}")
+        return transform_building(pixel_building, 1.0 / scale_factor)
+
+    def save_pixel_building(self, pixel_building: Building3D, path: str) -> str:
+        """
+        Persist a pixel-space building as JSON.
+
+        Args:
+            pixel_building: Building in pixel space
+            path: Output file path
+
+        Returns:
+            Path of the written file
+        """
+        out_path = Path(path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_suffix(".tmp")
+        tmp_path.write_text(pixel_building.model_dump_json())
+        tmp_path.replace(out_path)
+        logger.info(f"Pixel-space building saved: {out_path}")
+        return str(out_path)
+
+    def load_pixel_building(self, path: str) -> Building3D:
+        """
+        Load a persisted pixel-space building.
+
+        Args:
+            path: File written by save_pixel_building
+
+        Returns:
+            Building in pixel space
+
+        Raises:
+            RescaleError: If the file is missing or invalid
+        """
+        try:
+            return Building3D.model_validate_json(Path(path).read_bytes())
+        except Exception as e:
+            raise RescaleError(f"Could not load pixel-space building from {path}: {str(e)}")
+
+    def rescale_and_export(self,
+                           pixel_building: Building3D,
+                           scale_factor: float,
+                           formats: List[str],
+                           out_dir: str) -> Tuple[Building3D, MeshExportResult]:
+        """
+        Apply a new scale factor and re-export the building.
+
+        Args:
+            pixel_building: Building in pixel space
+            scale_factor: New pixels per foot
+            formats: Export formats
+            out_dir: Output directory for exported files
+
+        Returns:
+            Tuple of (building in feet, export result)
+        """
+        start_time = time.time()
+        building = self.apply_scale(pixel_building, scale_factor)
+        transform_time = time.time() - start_time
+
+        export_result = self.mesh_exporter.export_building(building, formats, out_dir)
+
+        logger.info(f"✅ Rescaled building to {scale_factor:.2f} px/ft: transform {transform_time * 1000:.1f}ms, "
+                    f"total {time.time() - start_time:.2f}s")
+        return building, export_result
+
+
+# Global service instance
+_building_rescaler = None
+
+
+def get_building_rescaler() -> BuildingRescaler:
+    """
+    Get or create global building rescaler instance.
+
+    Returns:
+        BuildingRescaler instance
+    """
+    global _building_rescaler
+    if _building_rescaler is None:
+        _building_rescaler = BuildingRescaler()
+    return _building_rescaler
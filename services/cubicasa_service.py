@@ -9,21 +9,58 @@ TODO: Replace placeholder model with real CubiCasa5K architecture before product
 
 import os
 import time
+import queue
+import threading
 import gdown
 import torch
 import torch.nn as nn
-import cv2
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Callable
+from concurrent.futures import Future
 from io import BytesIO
 from PIL import Image
 import logging
 
 from models.data_structures import CubiCasaOutput, ProcessingJob
 from utils.logger import CubiCasaLogger, get_logger
-from services.floortrans.models import get_model
-from services.floortrans.post_prosessing import split_prediction, get_polygons
+from services.floortrans.models import get_model, hg_furukawa_original
+from services.model_compiler import load_or_compile_model
+from services.weight_cache import load_or_convert_weights
+from services.inference_stats import InferenceStats
+from services.model_quantizer import (
+    load_calibration_images,
+    quantize_model,
+    compare_outputs,
+    summarize_comparisons
+)
+from services.floortrans.post_prosessing import (
+    split_prediction,
+    get_polygons,
+    get_working_shape,
+    rescale_polygons
+)
+from services.floortrans.profiling import profile_postprocessing
+from services.tiled_inference import align_tiling, plan_tiles, make_tiles, stitch_tiles
+from services.image_preprocessing import Letterbox, letterbox_image, open_image, load_rgb
+from config.settings import (
+    CUBICASA_POSTPROCESS_MAX_SIZE,
+    CUBICASA_ROOM_MERGE,
+    CUBICASA_PROFILE_POSTPROCESSING,
+    CUBICASA_MAX_BATCH_SIZE,
+    CUBICASA_BATCH_WAIT_MS,
+    CUBICASA_INPUT_SIZES,
+    CUBICASA_TILED_INFERENCE,
+    CUBICASA_TILE_SIZE,
+    CUBICASA_TILE_OVERLAP,
+    CUBICASA_MAX_TILES,
+    CUBICASA_WEIGHT_CACHE,
+    CUBICASA_HEALTH_TTL,
+    CUBICASA_LATENCY_WINDOW,
+    CUBICASA_COMPILE_MODEL,
+    CUBICASA_INFERENCE_PRECISION,
+    CUBICASA_CALIBRATION_DIR
+)
 
 logger = get_logger("cubicasa_service")
 cubicasa_logger = CubiCasaLogger()
@@ -39,19 +76,122 @@ class DependencyError(Exception):
     pass
 
 
+class InferenceBatcher:
+    """
+    Micro-batching queue in front of the CubiCasa5K model.
+    
+    Requests submitted from concurrent jobs are collected for up to
+    ``max_wait_ms`` (or until ``max_batch_size`` are queued) and run through
+    the model as a single tensor by one background worker thread. Each caller
+    gets a Future resolving to its own (1, C, H, W) slice of the output.
+    """
+    
+    def __init__(self,
+                 forward: Callable[[torch.Tensor], torch.Tensor],
+                 max_batch_size: int = 4,
+                 max_wait_ms: float = 20.0):
+        """
+        Initialize the batcher.
+        
+        Args:
+            forward: Function running the model on a (N, 3, H, W) tensor
+            max_batch_size: Maximum number of images per forward pass
+            max_wait_ms: How long to wait for more requests after the first one
+        """
+        self.forward = forward
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[torch.Tensor, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_run = 0
+        self.images_run = 0
+    
+    def submit(self, image_tensor: torch.Tensor) -> Future:
+        """
+        Queue a single preprocessed image for inference.
+        
+        Args:
+            image_tensor: Preprocessed (1, 3, H, W) image tensor
+            
+        Returns:
+            Future resolving to the raw (1, C, H, W) model output
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((image_tensor, future))
+        return future
+    
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="cubicasa-batcher", daemon=True
+                )
+                self._worker.start()
+    
+    def _collect(self) -> List[Tuple[torch.Tensor, Future]]:
+        """Block for the first request, then gather more until full or timed out."""
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+    
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            
+            # Only tensors of the same spatial size can share a forward pass
+            groups: Dict[Tuple[int, ...], List[Tuple[torch.Tensor, Future]]] = {}
+            for image_tensor, future in pending:
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(tuple(image_tensor.shape[1:]), []).append((image_tensor, future))
+            
+            for group in groups.values():
+                try:
+                    outputs = self.forward(torch.cat([t for t, _ in group], dim=0))
+                    self.batches_run += 1
+                    self.images_run += len(group)
+                    for i, (_, future) in enumerate(group):
+                        future.set_result(outputs[i:i + 1])
+                except Exception as e:
+                    for _, future in group:
+                        future.set_exception(e)
+            
+            if len(pending) > 1:
+                logger.debug(f"Batched inference: {len(pending)} images in {len(groups)} forward pass(es)")
+
+
 # Global model instance to avoid reinitializing for every job
 _global_cubicasa_service = None
+_global_cubicasa_service_lock = threading.Lock()
 
 def get_cubicasa_service() -> 'CubiCasaService':
     """
     Get the global CubiCasa service instance.
-    This ensures the model is only loaded once and reused across jobs.
+    This ensures the model is only loaded once and reused across jobs,
+    also when a job asks for it while the startup warm-up is loading it.
     """
     global _global_cubicasa_service
-    if _global_cubicasa_service is None:
-        logger.info("Initializing global CubiCasa service...")
-        _global_cubicasa_service = CubiCasaService()
-        logger.info("Global CubiCasa service initialized successfully")
+    with _global_cubicasa_service_lock:
+        if _global_cubicasa_service is None:
+            logger.info("Initializing global CubiCasa service...")
+            _global_cubicasa_service = CubiCasaService()
+            logger.info("Global CubiCasa service initialized successfully")
+    return _global_cubicasa_service
+
+def get_loaded_cubicasa_service() -> Optional['CubiCasaService']:
+    """
+    Get the global CubiCasa service if it has been created, without loading
+    the model otherwise.
+    """
     return _global_cubicasa_service
 
 class CubiCasaService:
@@ -69,13 +209,20 @@ class CubiCasaService:
     # Model configuration (URL can be overridden via env var CUBICASA_MODEL_URL)
     MODEL_URL = "https://drive.google.com/uc?export=download&id=1uOjLlp7n0mrEcSAmAhcdazWF4ST9rzBB"
     MODEL_FILENAME = "model_best_val_loss_var.pkl"
+    INPUT_SIZE = 512
+    
+    # Post-processing thresholds (part of the result cache key)
+    HEATMAP_THRESHOLD = 0.2
+    OPENING_TYPES = [1, 2]
     
-    def __init__(self, models_dir: str = None):
+    def __init__(self, models_dir: str = None, load_model: bool = True):
         """
         Initialize CubiCasa5K service.
         
         Args:
             models_dir: Directory to store model files (defaults to persistent storage on Railway)
+            load_model: When False, only paths and settings are set up; no model is
+                downloaded or loaded (see prepare_weights)
         """
         # Use Railway's /tmp directory for model storage (persists between requests)
         if models_dir is None:
@@ -97,11 +244,57 @@ class CubiCasaService:
         self.model = None
         self.model_loaded = False
         self.device = "cpu"  # Force CPU for compatibility
+        self.postprocess_max_size = CUBICASA_POSTPROCESS_MAX_SIZE
+        self.room_merge = CUBICASA_ROOM_MERGE
+        self.profile_postprocessing = CUBICASA_PROFILE_POSTPROCESSING
+        self.max_batch_size = max(1, CUBICASA_MAX_BATCH_SIZE)
+        self.input_sizes = CUBICASA_INPUT_SIZES or [self.INPUT_SIZE]
+        
+        # Optional sliding-window inference over overlapping tiles
+        self.tiled_inference = CUBICASA_TILED_INFERENCE
+        self.tile_size, self.tile_overlap = align_tiling(CUBICASA_TILE_SIZE, CUBICASA_TILE_OVERLAP)
+        self.max_tiles = CUBICASA_MAX_TILES
+        
+        # Weights are mapped from a flat file converted from the checkpoint
+        self.weight_cache_enabled = CUBICASA_WEIGHT_CACHE
+        self.weights_source = None
+        self.weights_version = None
+        
+        # Optional TorchScript path; "eager" until a compiled model is in place
+        self.compile_enabled = CUBICASA_COMPILE_MODEL
+        self.compiled_model = None
+        self.inference_path = "eager"
+        self.compile_error = None
+        
+        # Optional int8 model; the fp32 model is kept for accuracy checks
+        self.precision = CUBICASA_INFERENCE_PRECISION
+        self.calibration_dir = Path(CUBICASA_CALIBRATION_DIR)
+        self.quantized_model = None
+        self.quantize_error = None
+        
+        # Every forward pass (warm-up or job) is recorded for health checks
+        self.inference_stats = InferenceStats(CUBICASA_LATENCY_WINDOW)
+        self.health_ttl = CUBICASA_HEALTH_TTL
+        
+        # Concurrent process_image calls share forward passes via the batcher
+        self.batcher = None
+        if self.max_batch_size > 1:
+            self.batcher = InferenceBatcher(self._forward, self.max_batch_size, CUBICASA_BATCH_WAIT_MS)
         
         # Initialize service
-        self._check_dependencies()
+        if load_model:
+            self._check_dependencies()
+            self._ensure_model_available()
+            self._load_model()
+    
+    def prepare_weights(self) -> None:
+        """
+        Download the checkpoint and convert it to the mapped weights file,
+        without building the model, so other processes can map the weights.
+        """
         self._ensure_model_available()
-        self._load_model()
+        if self.weight_cache_enabled and self.model_path.exists():
+            load_or_convert_weights(self.model_path, self._read_checkpoint_state)
     
     def _check_dependencies(self) -> None:
         """
@@ -232,44 +425,25 @@ class CubiCasaService:
             elif file_size_mb > 1000:
                 logger.warning(f"Model file seems large: {file_size_mb:.2f} MB")
             
-            # Load model checkpoint with PyTorch 2.x compatibility
-            logger.info("Attempting to load model checkpoint...")
-            
-            # Try loading with PyTorch version-specific parameters
-            if int(torch.__version__.split('.')[0]) >= 2:
-                checkpoint = torch.load(
-                    self.model_path, 
-                    map_location=torch.device(self.device),
-                    weights_only=False
+            if self.weight_cache_enabled:
+                # Map the flat weights file, converting the checkpoint on first use
+                state_dict, self.weights_version, self.weights_source = load_or_convert_weights(
+                    self.model_path, self._read_checkpoint_state
                 )
             else:
-                checkpoint = torch.load(
-                    self.model_path, 
-                    map_location=torch.device(self.device)
-                )
+                state_dict, self.weights_source = self._read_checkpoint_state(), "checkpoint"
             
-            logger.info("✅ Model checkpoint loaded successfully.")
-            logger.info(f"Checkpoint keys: {list(checkpoint.keys())}")
-            
-            # Initialize the real CubiCasa5K model architecture
-            logger.info("Initializing real CubiCasa5K model architecture...")
-            self.model = get_model('hg_furukawa_original', 51)
-            n_classes = 44
-            self.model.conv4_ = torch.nn.Conv2d(256, n_classes, bias=True, kernel_size=1)
-            self.model.upsample = torch.nn.ConvTranspose2d(n_classes, n_classes, kernel_size=4, stride=4)
-            logger.info("✅ Real model architecture initialized.")
-
-            # Load the state dict from the checkpoint
-            if 'model_state' in checkpoint:
-                logger.info("Loading 'model_state' from checkpoint into model...")
-                self.model.load_state_dict(checkpoint['model_state'])
-                logger.info("✅ Model state loaded successfully.")
-            else:
-                raise CubiCasaError("Checkpoint does not contain 'model_state' key.")
+            self.model = self._build_model(state_dict)
+            logger.info(f"✅ Model state loaded successfully ({self.weights_source}).")
 
             # Set to evaluation mode
             self.model.eval()
             logger.info("✅ Model set to eval mode")
+            
+            if self.precision == "int8":
+                self._quantize_model()
+            if self.quantized_model is None and self.compile_enabled:
+                self._compile_model()
 
             load_time = time.time() - start_time
             self.model_loaded = True
@@ -285,6 +459,136 @@ class CubiCasaService:
             logger.error(f"❌ Model loading failed: {error_msg}")
             raise CubiCasaError(f"Fatal error during model loading: {error_msg}")
     
+    def _read_checkpoint_state(self) -> Dict[str, torch.Tensor]:
+        """
+        Unpickle the checkpoint and return its 'model_state'.
+        
+        Returns:
+            Model state dict
+            
+        Raises:
+            CubiCasaError: If the checkpoint has no 'model_state'
+        """
+        # Load model checkpoint with PyTorch 2.x compatibility
+        logger.info("Attempting to load model checkpoint...")
+        
+        # Try loading with PyTorch version-specific parameters
+        if int(torch.__version__.split('.')[0]) >= 2:
+            checkpoint = torch.load(
+                self.model_path, 
+                map_location=torch.device(self.device),
+                weights_only=False
+            )
+        else:
+            checkpoint = torch.load(
+                self.model_path, 
+                map_location=torch.device(self.device)
+            )
+        
+        logger.info("✅ Model checkpoint loaded successfully.")
+        logger.info(f"Checkpoint keys: {list(checkpoint.keys())}")
+        
+        if 'model_state' not in checkpoint:
+            raise CubiCasaError("Checkpoint does not contain 'model_state' key.")
+        return checkpoint['model_state']
+    
+    def _build_model(self, state_dict: Dict[str, torch.Tensor]) -> nn.Module:
+        """
+        Build the CubiCasa5K architecture around the given weights.
+        
+        On PyTorch 2.1+ the parameters of the freshly built model are
+        replaced by the tensors of state_dict rather than copied into, so
+        mapped weights stay mapped and the initial values are freed. Older
+        versions copy the weights.
+        
+        Args:
+            state_dict: Model state (from the checkpoint or the weights file)
+            
+        Returns:
+            Model with the weights loaded
+        """
+        logger.info("Initializing real CubiCasa5K model architecture...")
+        n_classes = 44
+        torch_version = tuple(map(int, torch.__version__.split('+')[0].split('.')[:2]))
+        
+        if torch_version >= (2, 1):
+            # get_model would also load the pretrained pose weights, only to overwrite them
+            model = hg_furukawa_original(n_classes=51)
+            model.conv4_ = torch.nn.Conv2d(256, n_classes, bias=True, kernel_size=1)
+            model.upsample = torch.nn.ConvTranspose2d(n_classes, n_classes, kernel_size=4, stride=4)
+            model.load_state_dict(state_dict, assign=True)
+        else:
+            model = get_model('hg_furukawa_original', 51)
+            model.conv4_ = torch.nn.Conv2d(256, n_classes, bias=True, kernel_size=1)
+            model.upsample = torch.nn.ConvTranspose2d(n_classes, n_classes, kernel_size=4, stride=4)
+            model.load_state_dict(state_dict)
+        
+        logger.info("✅ Real model architecture initialized.")
+        return model
+    
+    def _compile_model(self) -> None:
+        """
+        Switch inference to a frozen TorchScript model, loading it from the
+        on-disk cache when possible. Falls back to eager mode on failure.
+        """
+        input_shape = (1, 3, self.INPUT_SIZE, self.INPUT_SIZE)
+        try:
+            self.compiled_model, source = load_or_compile_model(self.model, self.model_path, input_shape)
+            self.inference_path = f"torchscript ({source})"
+            self.compile_error = None
+            logger.info(f"✅ Using compiled model for inference: {self.inference_path}")
+        except Exception as e:
+            self.compiled_model = None
+            self.inference_path = "eager"
+            self.compile_error = str(e)
+            logger.warning(f"⚠️ Model compilation failed, using eager mode: {str(e)}")
+    
+    def _quantize_model(self) -> None:
+        """
+        Switch inference to a static int8 model calibrated on the bundled
+        calibration images. Falls back to fp32 on failure.
+        """
+        try:
+            calibration = load_calibration_images(self.calibration_dir)
+            tensors = [self._preprocess_image(image_bytes)[0] for _, image_bytes in calibration]
+            self.quantized_model = quantize_model(self.model, tensors)
+            self.inference_path = "int8"
+            self.quantize_error = None
+        except Exception as e:
+            self.quantized_model = None
+            self.quantize_error = str(e)
+            logger.warning(f"⚠️ Model quantization failed, using fp32: {str(e)}")
+    
+    def check_quantized_accuracy(self, min_mean_iou: float = 0.9) -> Dict[str, Any]:
+        """
+        Compare int8 against fp32 polygons and room boxes on the calibration set.
+        
+        Args:
+            min_mean_iou: Mean room box IoU required for the check to pass
+            
+        Returns:
+            Accuracy report (see summarize_comparisons)
+            
+        Raises:
+            CubiCasaError: If no quantized model is loaded
+        """
+        if self.quantized_model is None:
+            raise CubiCasaError("Quantized model not loaded")
+        
+        comparisons = []
+        for name, image_bytes in load_calibration_images(self.calibration_dir):
+            image_tensor, letterbox = self._preprocess_image(image_bytes)
+            with torch.no_grad():
+                reference = self._postprocess_outputs(letterbox.crop(self.model(image_tensor)), letterbox.original_size)
+                candidate = self._postprocess_outputs(letterbox.crop(self.quantized_model(image_tensor)), letterbox.original_size)
+            comparisons.append((name, compare_outputs(reference, candidate)))
+        
+        report = summarize_comparisons(comparisons, min_mean_iou)
+        log = logger.info if report["passed"] else logger.warning
+        log(f"int8 accuracy check: mean room IoU {report['mean_room_iou']:.3f}, "
+            f"{report['missing_rooms']} missing rooms over {report['images']} images")
+        return report
+    
     def _load_model_fallback(self) -> None:
         """
         Fallback model loading method for compatibility issues.
@@ -317,61 +621,131 @@ class CubiCasaService:
         except Exception as e:
             raise CubiCasaError(f"Fallback loading failed: {str(e)}")
     
-    def _preprocess_image(self, image_bytes: bytes) -> Tuple[torch.Tensor, Tuple[int, int]]:
+    def _preprocess_image(self, image_bytes: bytes) -> Tuple[torch.Tensor, Letterbox]:
         """
         Preprocess image for CubiCasa5K model.
         
+        The image is decoded once (at reduced size for large JPEGs), resized
+        with its aspect ratio kept and letterboxed into a square input whose
+        size is picked from ``input_sizes``.
+        
         Args:
             image_bytes: Raw image bytes
             
         Returns:
-            Tuple of (processed_tensor, original_dimensions)
+            Tuple of (processed_tensor, letterbox); crop model outputs with
+            letterbox.crop before post-processing at letterbox.original_size
         """
         try:
-            # Load image
-            image = Image.open(BytesIO(image_bytes))
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            image_tensor, letterbox = letterbox_image(image_bytes, self.input_sizes)
+            logger.debug(f"Image preprocessed: {letterbox.original_size} -> {letterbox.content_size} "
+                         f"in {letterbox.input_size}")
+            return image_tensor, letterbox
             
-            original_size = image.size  # (width, height)
+        except Exception as e:
+            raise CubiCasaError(f"Image preprocessing failed: {str(e)}")
+    
+    def _preprocess_tiles(self, image_bytes: bytes) -> Tuple[torch.Tensor, List[Tuple[int, int]], Tuple[int, int], Tuple[int, int]]:
+        """
+        Preprocess image for tiled CubiCasa5K inference.
+        
+        The image is resized with its aspect ratio kept to the canvas chosen
+        by plan_tiles and cut into overlapping ``tile_size`` tiles.
+        
+        Args:
+            image_bytes: Raw image bytes
             
-            # Convert to numpy array
-            image_np = np.array(image)
+        Returns:
+            Tuple of (tile_tensor, tile_origins, canvas_size, original_dimensions)
+        """
+        try:
+            image = open_image(image_bytes)
+            original_size = image.size  # (width, height)
+            canvas_size, origins = plan_tiles(
+                original_size[0], original_size[1], self.tile_size, self.tile_overlap, self.max_tiles
+            )
             
-            # Resize to model input size (typically 512x512 for CubiCasa5K)
-            target_size = (512, 512)
-            image_resized = cv2.resize(image_np, target_size)
+            tiles = make_tiles(load_rgb(image, canvas_size), origins, self.tile_size)
+            logger.debug(f"Image tiled: {original_size} -> {canvas_size} in {len(origins)} tiles")
+            return tiles, origins, canvas_size, original_size
             
-            # Normalize to [0, 1]
-            image_normalized = image_resized.astype(np.float32) / 255.0
+        except Exception as e:
+            raise CubiCasaError(f"Image preprocessing failed: {str(e)}")
+    
+    def _run_tiled_inference(self,
+                             tiles: torch.Tensor,
+                             origins: List[Tuple[int, int]],
+                             canvas_size: Tuple[int, int]) -> torch.Tensor:
+        """
+        Run the tiles of one image through the model and blend the outputs.
+        
+        Tiles go through the model in chunks of up to ``max_batch_size`` and
+        each chunk is blended in as soon as it is done.
+        
+        Args:
+            tiles: (N, 3, tile_size, tile_size) tensor from _preprocess_tiles
+            origins: Tile origins from _preprocess_tiles
+            canvas_size: Canvas (width, height) from _preprocess_tiles
             
-            # Convert to tensor format: (batch, channels, height, width)
-            image_tensor = torch.from_numpy(image_normalized)
-            image_tensor = image_tensor.permute(2, 0, 1)  # HWC to CHW
-            image_tensor = image_tensor.unsqueeze(0)  # Add batch dimension
+        Returns:
+            Raw (1, C, height, width) model output for the canvas
+        """
+        def tile_outputs():
+            for start in range(0, len(origins), self.max_batch_size):
+                chunk = slice(start, start + self.max_batch_size)
+                yield from zip(self._forward(tiles[chunk]), origins[chunk])
+        
+        return stitch_tiles(tile_outputs(), canvas_size, self.tile_overlap)
+    
+    def _forward(self, batch_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Run the CubiCasa5K model on a batch of preprocessed images.
+        
+        Args:
+            batch_tensor: Preprocessed (N, 3, H, W) image tensor
             
-            logger.debug(f"Image preprocessed: {original_size} -> {target_size}")
-            return image_tensor, original_size
+        Returns:
+            Raw (N, C, H, W) model output tensor
+        """
+        start_time = time.perf_counter()
+        try:
+            # The compiled graph is traced at INPUT_SIZE; other sizes stay eager
+            model = self.model
+            if self.quantized_model is not None:
+                model = self.quantized_model
+            elif self.compiled_model is not None and batch_tensor.shape[2:] == (self.INPUT_SIZE, self.INPUT_SIZE):
+                model = self.compiled_model
             
+            with torch.no_grad():
+                # Run model inference and return the raw tensor
+                outputs = model(batch_tensor)
+            self.inference_stats.record((time.perf_counter() - start_time) * 1000, True, batch_tensor.shape[0])
+            return outputs
+                
         except Exception as e:
-            raise CubiCasaError(f"Image preprocessing failed: {str(e)}")
+            self.inference_stats.record((time.perf_counter() - start_time) * 1000, False, batch_tensor.shape[0], str(e))
+            raise CubiCasaError(f"Model inference failed: {str(e)}")
     
     def _run_inference(self, image_tensor: torch.Tensor) -> torch.Tensor:
         """
         Run CubiCasa5K inference on preprocessed image.
         
+        Goes through the micro-batching queue when batching is enabled, so
+        concurrent jobs share a single forward pass.
+        
         Args:
             image_tensor: Preprocessed image tensor
             
         Returns:
             Raw model output tensor
         """
+        if self.batcher is None:
+            return self._forward(image_tensor)
+        
         try:
-            with torch.no_grad():
-                # Run model inference and return the raw tensor
-                outputs = self.model(image_tensor)
-                return outputs
-                
+            return self.batcher.submit(image_tensor).result()
+        except CubiCasaError:
+            raise
         except Exception as e:
             raise CubiCasaError(f"Model inference failed: {str(e)}")
     
@@ -390,17 +764,35 @@ class CubiCasaService:
         """
         try:
             height, width = original_size[1], original_size[0]
-            img_size = (height, width)
             split = [21, 12, 11] # Based on the notebook analysis
             
-            # 1. Split the raw prediction tensor
-            heatmaps, rooms, icons = split_prediction(outputs, img_size, split)
+            # 1. Split the raw prediction tensor at a bounded working resolution
+            # so memory does not grow with the upload size
+            work_height, work_width = get_working_shape((height, width), self.postprocess_max_size)
+            heatmaps, rooms, icons = split_prediction(outputs, (work_height, work_width), split)
 
             # 2. Call the main polygon extraction function
             # Note: We can fine-tune the threshold and opening types later
-            polygons, types, room_polygons, room_types = get_polygons((heatmaps, rooms, icons), 0.2, [1, 2])
+            postprocess_profile = None
+            if self.profile_postprocessing:
+                with profile_postprocessing() as profiler:
+                    polygons, types, room_polygons, room_types = get_polygons(
+                        (heatmaps, rooms, icons), self.HEATMAP_THRESHOLD, self.OPENING_TYPES, self.room_merge
+                    )
+                postprocess_profile = profiler.report()
+            else:
+                polygons, types, room_polygons, room_types = get_polygons(
+                    (heatmaps, rooms, icons), self.HEATMAP_THRESHOLD, self.OPENING_TYPES, self.room_merge
+                )
+
+            # 3. Map polygons from the working resolution back to image space
+            if (work_height, work_width) != (height, width):
+                logger.debug(f"Post-processed at {work_width}x{work_height}, rescaling to {width}x{height}")
+                polygons, room_polygons = rescale_polygons(
+                    polygons, room_polygons, width / work_width, height / work_height
+                )
 
-            # 3. Convert shapely polygons to simple coordinate lists for our data structures
+            # 4. Convert shapely polygons to simple coordinate lists for our data structures
             wall_coordinates = []
             room_bounding_boxes = {}
             
@@ -498,7 +890,8 @@ class CubiCasaService:
                 room_polygons=room_polygons_dict,
                 image_dimensions=original_size,
                 confidence_scores=confidence_scores,
-                processing_time=0.0  # Will be set by caller
+                processing_time=0.0,  # Will be set by caller
+                postprocess_profile=postprocess_profile
             )
             
         except Exception as e:
@@ -527,15 +920,23 @@ class CubiCasaService:
             # Preprocess image
             try:
                 logger.info(f"📸 Preprocessing image for job {job_id}")
-                image_tensor, original_size = self._preprocess_image(image_bytes)
-                logger.info(f"✅ Image preprocessed: {original_size} -> {image_tensor.shape}")
+                if self.tiled_inference:
+                    tiles, origins, canvas_size, original_size = self._preprocess_tiles(image_bytes)
+                    logger.info(f"✅ Image preprocessed: {original_size} -> {len(origins)} tiles over {canvas_size}")
+                else:
+                    image_tensor, letterbox = self._preprocess_image(image_bytes)
+                    original_size = letterbox.original_size
+                    logger.info(f"✅ Image preprocessed: {original_size} -> {letterbox.content_size} in {image_tensor.shape}")
             except Exception as e:
                 raise CubiCasaError(f"Image preprocessing failed: {str(e)}")
 
             # Run inference
             try:
                 logger.info(f"🤖 Running CubiCasa5K inference for job {job_id}")
-                outputs = self._run_inference(image_tensor)
+                if self.tiled_inference:
+                    outputs = self._run_tiled_inference(tiles, origins, canvas_size)
+                else:
+                    outputs = letterbox.crop(self._run_inference(image_tensor))
                 logger.info(f"✅ Model inference completed: {outputs.shape}")
             except Exception as e:
                 raise CubiCasaError(f"Model inference failed: {str(e)}")
@@ -561,10 +962,134 @@ class CubiCasaService:
             logger.error(f"❌ An unexpected error occurred during CubiCasa5K processing for job {job_id}: {str(e)}")
             raise CubiCasaError(f"An unexpected error occurred: {str(e)}")
     
+    def process_images(self, batch: List[Tuple[bytes, str]]) -> List[CubiCasaOutput]:
+        """
+        Process several floor plan images with batched CubiCasa5K inference.
+        
+        Images are preprocessed individually, run through the model in chunks
+        of up to ``max_batch_size`` as a single tensor, then post-processed
+        one by one. With tiled inference each image is processed on its own,
+        its tiles forming the batch.
+        
+        Args:
+            batch: List of (image_bytes, job_id) tuples
+            
+        Returns:
+            List of CubiCasaOutput in the same order as the input
+            
+        Raises:
+            CubiCasaError: If processing fails for any image
+        """
+        if not batch:
+            return []
+        
+        # The tiles of a single image already make up a batch
+        if self.tiled_inference:
+            return [self.process_image(image_bytes, job_id) for image_bytes, job_id in batch]
+        
+        job_ids = [job_id for _, job_id in batch]
+        try:
+            logger.info(f"🚀 Starting batched CubiCasa5K processing for {len(batch)} jobs: {job_ids}")
+            start_time = time.time()
+            
+            # Preprocess images
+            prepared = []
+            for image_bytes, job_id in batch:
+                try:
+                    prepared.append(self._preprocess_image(image_bytes))
+                except Exception as e:
+                    raise CubiCasaError(f"Image preprocessing failed for job {job_id}: {str(e)}")
+            
+            # Run inference, one forward pass per chunk of same-sized tensors
+            outputs: List[Optional[torch.Tensor]] = [None] * len(batch)
+            groups: Dict[Tuple[int, ...], List[int]] = {}
+            for index, (image_tensor, _) in enumerate(prepared):
+                groups.setdefault(tuple(image_tensor.shape[1:]), []).append(index)
+            
+            for indices in groups.values():
+                for chunk_start in range(0, len(indices), self.max_batch_size):
+                    chunk = indices[chunk_start:chunk_start + self.max_batch_size]
+                    batch_outputs = self._forward(torch.cat([prepared[i][0] for i in chunk], dim=0))
+                    for offset, index in enumerate(chunk):
+                        outputs[index] = batch_outputs[offset:offset + 1]
+            
+            inference_time = time.time() - start_time
+            logger.info(f"✅ Batched inference completed: {len(batch)} images in {inference_time:.2f}s")
+            
+            # Post-process each image
+            results = []
+            for index, job_id in enumerate(job_ids):
+                try:
+                    letterbox = prepared[index][1]
+                    results.append(self._postprocess_outputs(letterbox.crop(outputs[index]), letterbox.original_size))
+                except Exception as e:
+                    raise CubiCasaError(f"Output post-processing failed for job {job_id}: {str(e)}")
+                outputs[index] = None  # release the full-size output early
+            
+            processing_time = time.time() - start_time
+            logger.info(f"🎉 Batched CubiCasa5K processing completed for {len(batch)} jobs in {processing_time:.2f}s "
+                        f"({len(batch) / processing_time:.2f} images/s)")
+            
+            return results
+            
+        except CubiCasaError as e:
+            logger.error(f"❌ Batched CubiCasa5K processing failed: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"❌ An unexpected error occurred during batched CubiCasa5K processing: {str(e)}")
+            raise CubiCasaError(f"An unexpected error occurred: {str(e)}")
+    
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """
+        Describe everything besides the image that determines the result.
+        
+        Returns:
+            Model version, precision and post-processing settings
+        """
+        model_version = None
+        if self.model_path.exists():
+            stat = self.model_path.stat()
+            model_version = f"{self.MODEL_FILENAME}:{stat.st_size}:{stat.st_mtime_ns}"
+        
+        return {
+            "model_version": model_version,
+            "precision": "int8" if self.quantized_model is not None else "fp32",
+            "input_sizes": sorted(self.input_sizes),
+            "heatmap_threshold": self.HEATMAP_THRESHOLD,
+            "opening_types": self.OPENING_TYPES,
+            "postprocess_max_size": self.postprocess_max_size,
+            "room_merge": self.room_merge,
+            "tiling": [self.tile_size, self.tile_overlap, self.max_tiles] if self.tiled_inference else None
+        }
+    
+    def _run_health_probe(self) -> None:
+        """Run a small dummy image through preprocessing and the model; the result lands in inference_stats."""
+        start_time = time.perf_counter()
+        try:
+            dummy_image = Image.new('RGB', (256, 256), color='white')
+            dummy_bytes = BytesIO()
+            dummy_image.save(dummy_bytes, format='PNG')
+            test_tensor, _ = self._preprocess_image(dummy_bytes.getvalue())
+        except Exception as e:
+            self.inference_stats.record((time.perf_counter() - start_time) * 1000, False, error=str(e))
+            return
+        recorded = self.inference_stats.total
+        try:
+            self._run_inference(test_tensor)
+        except Exception as e:
+            # _forward records its own failures, not those around it
+            if self.inference_stats.total == recorded:
+                self.inference_stats.record((time.perf_counter() - start_time) * 1000, False, error=str(e))
+    
     def health_check(self) -> Dict[str, Any]:
         """
         Perform comprehensive health check on CubiCasa5K service.
         
+        Reports the last forward pass (warm-up, job or probe) and rolling
+        p50/p95 inference latency. A probe inference only runs when the
+        last pass is older than CUBICASA_HEALTH_TTL seconds, so frequent
+        polling does not take CPU from real jobs.
+        
         Returns:
             Health status information
         """
@@ -574,6 +1099,8 @@ class CubiCasaService:
             "device": self.device,
             "model_path_exists": self.model_path.exists(),
             "using_placeholder": False,
+            "inference_path": self.inference_path,
+            "weights_source": self.weights_source,
             "timestamp": time.time(),
             "pytorch_version": torch.__version__,
             "cuda_available": torch.cuda.is_available()
@@ -589,35 +1116,32 @@ class CubiCasaService:
             status["model_file_size_mb"] = 0
             status["model_file_valid"] = False
         
+        if self.compile_error:
+            status["compile_error"] = self.compile_error
+        if self.quantize_error:
+            status["quantize_error"] = self.quantize_error
+        
         if self.model_loaded:
-            try:
-                # Test with small dummy image
-                dummy_image = Image.new('RGB', (256, 256), color='white')
-                dummy_bytes = BytesIO()
-                dummy_image.save(dummy_bytes, format='PNG')
-                dummy_bytes = dummy_bytes.getvalue()
-                
-                start_time = time.time()
-                test_tensor, _ = self._preprocess_image(dummy_bytes)
-                test_outputs = self._run_inference(test_tensor)
-                test_time = time.time() - start_time
-                
-                status.update({
-                    "status": "healthy",
-                    "test_inference_time": round(test_time, 3),
-                    "test_passed": True,
-                    "model_has_forward": hasattr(self.model, 'forward'),
-                    "model_has_eval": hasattr(self.model, 'eval')
-                })
-                
-            except Exception as e:
-                status.update({
-                    "status": "degraded",
-                    "test_passed": False,
-                    "error": str(e),
-                    "model_has_forward": hasattr(self.model, 'forward') if self.model else False,
-                    "model_has_eval": hasattr(self.model, 'eval') if self.model else False
-                })
+            # Only probe the model when no forward pass ran within the TTL
+            age = self.inference_stats.age()
+            probed = age is None or age > self.health_ttl
+            if probed:
+                self._run_health_probe()
+            
+            latency = self.inference_stats.summary()
+            last = latency["last"]
+            status.update({
+                "status": "healthy" if last["success"] else "degraded",
+                "test_inference_time": round(last["latency_ms"] / 1000, 3),
+                "test_passed": last["success"],
+                "health_probe_run": probed,
+                "last_inference_age_seconds": round(time.time() - last["timestamp"], 1),
+                "inference_latency": latency,
+                "model_has_forward": hasattr(self.model, 'forward') if self.model else False,
+                "model_has_eval": hasattr(self.model, 'eval') if self.model else False
+            })
+            if not last["success"]:
+                status["error"] = last["error"]
         else:
             status.update({
                 "status": "unhealthy",
@@ -4,6 +4,18 @@ import torch.nn.functional as F
 from . import model_1427
 
 
+def upsample_add(x, y):
+    _, _, H, W = y.size()
+    if y.shape != x.shape:
+        return F.interpolate(x, size=(H, W), mode='bilinear', align_corners=False) + y
+    else:
+        return x + y
+
+
+# Shape-dependent branch: keep it a leaf call when the model is traced by torch.fx
+torch.fx.wrap('upsample_add')
+
+
 class Residual(nn.Module):
     def __init__(self, numIn, numOut):
         super(Residual, self).__init__()
@@ -204,7 +216,8 @@ class hg_furukawa_original(nn.Module):
         out = self.conv4_(out)
         out = self.upsample(out)
         # heatmap channels go trough sigmoid
-        out[:, :21] = self.sigmoid(out[:, :21])
+        # (concatenated rather than assigned in place so torch.fx can trace it)
+        out = torch.cat([self.sigmoid(out[:, :21]), out[:, 21:]], dim=1)
         return out
 
     def _upsample_add(self, x, y):
@@ -223,11 +236,7 @@ class hg_furukawa_original(nn.Module):
         upsampled feature map size: [N,_,16,16]
         So we choose bilinear upsample which supports arbitrary output sizes.
         '''
-        _, _, H, W = y.size()
-        if y.shape != x.shape:
-            return F.interpolate(x, size=(H, W), mode='bilinear', align_corners=False) + y
-        else:
-            return x + y
+        return upsample_add(x, y)
 
     def init_weights(self):
         # Pre-trained network weights from Human pose estimation via Convolutional Part Heatmap Regression
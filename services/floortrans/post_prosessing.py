@@ -2,31 +2,36 @@ import torch
 import torch.nn.functional as F
 import numpy as np
 import copy
+from bisect import bisect_left, bisect_right
 from itertools import combinations
 from scipy import stats
 from skimage import draw
-from scipy.ndimage import measurements
+from scipy.ndimage import measurements, label, find_objects
 from shapely.geometry import Polygon
 from shapely.ops import unary_union
-from collections.abc import Iterable
+from shapely import affinity
+from .profiling import profiled, profile_stage
 
 
+@profiled("wall_polygons")
 def get_wall_polygon(wall_heatmaps, room_segmentation, threshold, wall_classes, point_orientations, orientation_ranges):
     wall_lines, wall_points, wall_point_orientation_lines_map = get_wall_lines(wall_heatmaps, room_segmentation, threshold, wall_classes, point_orientations, orientation_ranges)
 
-    walls = np.empty([0, 4, 2], int)
+    walls = []
     types = [] 
     wall_lines_new = []
+    wall_runs = calc_wall_runs(room_segmentation, wall_classes)
     
     for indx, i in enumerate(wall_lines):
-        res = extract_wall_polygon(i, wall_points, room_segmentation, wall_classes)
+        res = extract_wall_polygon(i, wall_points, room_segmentation, wall_classes, wall_runs)
         if res is not None:
             wall_width, polygon = res
-            walls = np.append(walls, [polygon], axis=0)
+            walls.append(polygon)
             wall_type = {'type': 'wall', 'class': i[2]}
             types.append(wall_type)
             wall_lines_new.append(i)
 
+    walls = stack_polygons(walls)
     walls = fix_wall_corners(walls, wall_points, wall_lines_new)
     res = remove_overlapping_walls(walls, types, wall_lines_new)
     walls, types, wall_lines_new = res
@@ -51,73 +56,96 @@ def polygon_intersection(x_min, x_max, y_min, y_max, x_min_label, x_max_label, y
 def remove_overlapping_walls(walls, types, wall_lines):
     threshold = 0.4
     to_be_removed = set()
-    for i, wall1 in enumerate(walls):
-        y_min_wall1 = min(wall1[:, 1])
-        y_max_wall1 = max(wall1[:, 1])
-        x_min_wall1 = min(wall1[:, 0])
-        x_max_wall1 = max(wall1[:, 0])
-        label_area = np.sqrt((x_max_wall1-x_min_wall1)**2+(y_max_wall1-y_min_wall1)**2)
-        for j in range(i+1, len(walls)):
-            wall2 = walls[j]
-            wall1_dim = calc_polygon_dim(wall1)
-            wall2_dim = calc_polygon_dim(wall2)
-            if wall1_dim == wall2_dim:
-                y_min_wall2 = min(wall2[:, 1])
-                y_max_wall2 = max(wall2[:, 1])
-                x_min_wall2 = min(wall2[:, 0])
-                x_max_wall2 = max(wall2[:, 0])
-                intersection = polygon_intersection(x_min_wall1, x_max_wall1, y_min_wall1, y_max_wall1, x_min_wall2, x_max_wall2, y_min_wall2, y_max_wall2)
-                pred_area = np.sqrt((x_max_wall2-x_min_wall2)**2+(y_max_wall2-y_min_wall2)**2)
-                union = pred_area + label_area - intersection
-
-                iou = intersection / union
-                if iou > threshold:
-                    if label_area > pred_area:
-                        to_be_removed.add(i)
-                    else:
-                        to_be_removed.add(j)
-
-    walls_new = np.empty([0, 4, 2], int)
-    types_new = []
-    wall_lines_new = []
-    for i in range(len(walls)):
-        if i not in to_be_removed:
-            walls_new = np.append(walls_new, [walls[i]], axis=0)
-            types_new.append(types[i])
-            wall_lines_new.append(wall_lines[i])
+    if len(walls) > 0:
+        x_min, x_max = walls[:, :, 0].min(axis=1), walls[:, :, 0].max(axis=1)
+        y_min, y_max = walls[:, :, 1].min(axis=1), walls[:, :, 1].max(axis=1)
+        diagonals = np.sqrt((x_max - x_min)**2 + (y_max - y_min)**2)
+        dims = np.array([calc_polygon_dim(wall) for wall in walls])
+    for dim in (0, 1):
+        indices = np.flatnonzero(dims == dim) if len(walls) > 0 else []
+        if len(indices) < 2:
+            continue
+        # Only walls whose boxes overlap have a nonzero IoU. Sweep along the
+        # thin axis of the walls (y for horizontal, x for vertical ones) and
+        # check the other axis per candidate pair.
+        if dim == 0:
+            sweep_min, sweep_max = y_min, y_max
+        else:
+            sweep_min, sweep_max = x_min, x_max
+        for i, j in overlapping_interval_pairs(indices, sweep_min, sweep_max, strict=True):
+            intersection = polygon_intersection(x_min[i], x_max[i], y_min[i], y_max[i], x_min[j], x_max[j], y_min[j], y_max[j])
+            if intersection == 0:
+                continue
+            label_area = diagonals[i]
+            pred_area = diagonals[j]
+            union = pred_area + label_area - intersection
+
+            iou = intersection / union
+            if iou > threshold:
+                if label_area > pred_area:
+                    to_be_removed.add(i)
+                else:
+                    to_be_removed.add(j)
+
+    kept = [i for i in range(len(walls)) if i not in to_be_removed]
+    walls_new = stack_polygons([walls[i] for i in kept])
+    types_new = [types[i] for i in kept]
+    wall_lines_new = [wall_lines[i] for i in kept]
 
     return walls_new, types_new, wall_lines_new
 
 
+def stack_polygons(polygons):
+    # (n, 4, 2) int array of n corner lists; (0, 4, 2) when there are none.
+    # Polygons are collected in lists and stacked once instead of growing an
+    # array with np.append, which copies it on every step.
+    return np.array(polygons, dtype=int).reshape(-1, 4, 2)
+
+
 def remove_overlapping_openings(polygons, types, classes):
     opening_types = classes['window'] + classes['door']
-    good_openings = []
-    for i, t in enumerate(types):
-        keep = True
-        if t['type'] == 'icon' and int(t['class']) in opening_types:
-            for j, tt in enumerate(types):
-                if not (polygons[j] == polygons[i]).all() and tt['type'] == 'icon' and int(tt['class']) in opening_types:
-                    # Different opening
-                    if rectangles_overlap(polygons[j], polygons[i]):
-                        # The other must be removed.
-                        size_i = rectangle_size(polygons[i])
-                        size_j = rectangle_size(polygons[j])
-                        if size_i == size_j and tt['prob'] > t['prob']:
-                            # Fail
-                            keep = False
-                            break
-                        elif size_i < size_j:
-                            keep = False
-                            break
-
-        good_openings.append(keep)
-
-    new_polygons = polygons[np.array(good_openings)]
+    good_openings = [True] * len(types)
+    openings = np.array([i for i, t in enumerate(types)
+                         if t['type'] == 'icon' and int(t['class']) in opening_types], dtype=int)
+    if len(openings) > 1:
+        x_min, x_max = polygons[:, :, 0].min(axis=1), polygons[:, :, 0].max(axis=1)
+        y_min, y_max = polygons[:, :, 1].min(axis=1), polygons[:, :, 1].max(axis=1)
+        sizes = (x_max - x_min) * (y_max - y_min)
+        # Candidate pairs overlap on x; an opening is dropped if any other,
+        # different opening overlapping it is bigger, or as big and more
+        # probable.
+        for i, j in overlapping_interval_pairs(openings, x_min, x_max):
+            if not range_overlap(y_min[i], y_max[i], y_min[j], y_max[j]) or (polygons[i] == polygons[j]).all():
+                continue
+            for a, b in ((i, j), (j, i)):
+                if sizes[a] < sizes[b] or (sizes[a] == sizes[b] and types[b]['prob'] > types[a]['prob']):
+                    good_openings[a] = False
+
+    new_polygons = polygons[np.array(good_openings, dtype=bool)]
     new_types = [t for (t, good) in zip(types, good_openings) if good]
 
     return new_polygons, new_types
 
 
+def overlapping_interval_pairs(indices, mins, maxs, strict=False):
+    # Pairs (i, j), i < j, of the given indices whose intervals
+    # [mins, maxs] overlap (with positive length if strict). Sorting on the
+    # interval start means each interval is only compared with the ones
+    # starting before it ends.
+    starts = [mins[i] for i in indices]
+    order = [indices[k] for k in np.argsort(starts, kind='stable')]
+    pairs = []
+    for position, i in enumerate(order):
+        for j in order[position + 1:]:
+            if mins[j] > maxs[i] or (strict and mins[j] == maxs[i]):
+                break
+            if strict and not maxs[j] > mins[i]:
+                continue
+            pairs.append((min(i, j), max(i, j)))
+
+    return pairs
+
+
 def rectangles_overlap(r1, r2):
         return (range_overlap(min(r1[:, 0]), max(r1[:, 0]), min(r2[:, 0]), max(r2[:, 0]))
                 and range_overlap(min(r1[:, 1]), max(r1[:, 1]), min(r2[:, 1]), max(r2[:, 1])))
@@ -300,7 +328,16 @@ def get_rectangle_polygons(junction_points, size):
 
     return polygons
 
-def merge_rectangles(rectangles, room_types):
+@profiled("room_merge")
+def merge_rectangles(rectangles, room_types, method='grid'):
+    # Union of the same class room rectangles, one polygon per connected
+    # region. 'grid' works on the junction grid the rectangles come from,
+    # 'shapely' unions shapely polygons and also accepts arbitrary rectangles.
+    if method == 'grid':
+        return merge_grid_rectangles(rectangles, room_types)
+    if method != 'shapely':
+        raise ValueError(f"Unknown room merge method: {method}")
+
     # Room polygons to shapely Polygon type
     shapely_polygons = [Polygon(p) for p in rectangles]
 
@@ -330,24 +367,116 @@ def merge_rectangles(rectangles, room_types):
             polygon_union = unary_union(same_cls_pols)
 
             # If there are multiple polygons we split them.
-            if isinstance(polygon_union, Iterable):
-                for pol in polygon_union:
-#                     x, y = pol.boundary.coords.xy
-#                     numpy_pol = np.array([np.array(x), np.array(y)]).T
-#                     room_polygons.append(numpy_pol)
-                    room_polygons.append(pol)
-                    new_room_types.append(pol_type)
-                    
-            else:
-#                 x, y = polygon_union.boundary.coords.xy
-#                 numpy_pol = np.array([np.array(x), np.array(y)]).T
-#                 room_polygons.append(numpy_pol)
-                room_polygons.append(polygon_union)
+            for pol in getattr(polygon_union, 'geoms', [polygon_union]):
+                if pol.is_empty:
+                    continue
+                room_polygons.append(pol)
                 new_room_types.append(pol_type)
 
     return room_polygons, new_room_types
 
-def get_polygons(predictions, threshold, all_opening_types):
+
+def merge_grid_rectangles(rectangles, room_types):
+    # The rectangles are cells of the grid spanned by the junction
+    # coordinates (get_rectangle_polygons). Cells are painted into a small
+    # class grid, same class cells are joined by 4-connected labelling and
+    # each region's outline is traced from its cell edges. Regions that
+    # touch only at a corner stay separate, like in the shapely union.
+    room_polygons = []
+    new_room_types = []
+    if len(rectangles) == 0:
+        return room_polygons, new_room_types
+
+    rectangles = np.asarray(rectangles)
+    x_min, y_min = rectangles[:, 0, 0], rectangles[:, 0, 1]
+    x_max, y_max = rectangles[:, 2, 0], rectangles[:, 2, 1]
+    # Zero width or height cells have no area in the union
+    keep = np.flatnonzero((x_max > x_min) & (y_max > y_min))
+    xs = np.unique(np.concatenate([x_min[keep], x_max[keep]]))
+    ys = np.unique(np.concatenate([y_min[keep], y_max[keep]]))
+    cols_min, cols_max = np.searchsorted(xs, x_min), np.searchsorted(xs, x_max)
+    rows_min, rows_max = np.searchsorted(ys, y_min), np.searchsorted(ys, y_max)
+
+    classes = np.array([room_type['class'] for room_type in room_types], int)
+    class_grid = np.zeros((max(len(ys) - 1, 0), max(len(xs) - 1, 0)), int)
+    single = (rows_max[keep] - rows_min[keep] == 1) & (cols_max[keep] - cols_min[keep] == 1)
+    cells = keep[single]
+    class_grid[rows_min[cells], cols_min[cells]] = classes[cells]
+    for i in keep[~single]:
+        class_grid[rows_min[i]:rows_max[i], cols_min[i]:cols_max[i]] = classes[i]
+
+    for pol_class in np.unique(class_grid):
+        if pol_class == 0:  # index 0 is the background and we can ignore it.
+            continue
+        pol_type = {'type': 'room', 'class': int(pol_class)}
+        labels, _ = label(class_grid == pol_class)
+        for region_index, region in enumerate(find_objects(labels)):
+            mask = labels[region] == region_index + 1
+            rings = trace_cell_outline(mask, xs[region[1].start:region[1].stop + 1],
+                                       ys[region[0].start:region[0].stop + 1])
+            areas = [ring_signed_area(ring) for ring in rings]
+            shell = [ring for ring, area in zip(rings, areas) if area < 0]
+            holes = [ring for ring, area in zip(rings, areas) if area > 0]
+            room_polygons.append(Polygon(shell[0], holes))
+            new_room_types.append(pol_type)
+
+    return room_polygons, new_room_types
+
+
+def trace_cell_outline(mask, xs, ys):
+    # Closed rings around the True cells of mask, cell (r, c) spanning
+    # xs[c]..xs[c + 1] and ys[r]..ys[r + 1]. Edges are directed so that
+    # the region's shell has negative and its holes positive signed area.
+    # Only corner vertices are kept.
+    padded = np.pad(mask, 1)
+    inner = padded[1:-1, 1:-1]
+    rows, cols = np.nonzero(inner & ~padded[:-2, 1:-1])
+    edges = [((c + 1, r), (c, r)) for r, c in zip(rows, cols)]  # top
+    rows, cols = np.nonzero(inner & ~padded[2:, 1:-1])
+    edges += [((c, r + 1), (c + 1, r + 1)) for r, c in zip(rows, cols)]  # bottom
+    rows, cols = np.nonzero(inner & ~padded[1:-1, :-2])
+    edges += [((c, r), (c, r + 1)) for r, c in zip(rows, cols)]  # left
+    rows, cols = np.nonzero(inner & ~padded[1:-1, 2:])
+    edges += [((c + 1, r + 1), (c + 1, r)) for r, c in zip(rows, cols)]  # right
+
+    outgoing = {}
+    for start, end in edges:
+        outgoing.setdefault(start, []).append(end)
+
+    rings = []
+    unused = set(edges)
+    for first_edge in sorted(edges):
+        if first_edge not in unused:
+            continue
+        ring = []
+        edge = first_edge
+        while True:
+            unused.discard(edge)
+            start, end = edge
+            heading = (end[0] - start[0], end[1] - start[1])
+            # Where two cells of the region meet only at a corner, turn away
+            # from the own cell: each ring then follows a single outside
+            # region (the exterior or one hole) and rings just touch there
+            next_end = max(outgoing[end], key=lambda candidate: heading[0] * (candidate[1] - end[1]) -
+                           heading[1] * (candidate[0] - end[0]))
+            next_edge = (end, next_end)
+            if (next_end[0] - end[0], next_end[1] - end[1]) != heading:
+                ring.append((xs[end[0]], ys[end[1]]))
+            if next_edge == first_edge:
+                break
+            edge = next_edge
+        rings.append(ring)
+
+    return rings
+
+
+def ring_signed_area(ring):
+    # Shoelace formula over the closed ring
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])) / 2
+
+
+@profiled("get_polygons")
+def get_polygons(predictions, threshold, all_opening_types, room_merge='grid'):
     heatmaps, room_seg, icon_seg = predictions
     height = icon_seg.shape[1]
     width = icon_seg.shape[2]
@@ -371,25 +500,26 @@ def get_polygons(predictions, threshold, all_opening_types):
 
     openings, opening_types = get_opening_polygon(heatmaps, walls, icon_seg, wall_points, wall_lines, wall_point_orientation_lines_map, threshold, point_orientations, orientation_ranges, all_opening_types)
 
-    # junction_points shape n, 2, coordinate order x, y
-    junction_points = get_junction_points(wall_points, wall_lines)
-    grid_polygons = get_rectangle_polygons(junction_points, (height, width))
-
-    c, h, w = room_seg.shape
-    for i in range(c):
-        if i in [2, 8]: # we ignore walls (2) and railings (8)
-            room_seg[i] = np.zeros((h, w))
-  
-    room_seg_2D = np.argmax(room_seg, axis=0)
-    room_types = []
-    grid_polygons_new = []
-    for i, pol in enumerate(grid_polygons):
-        room_class = get_polygon_class(pol, room_seg_2D)
-        if room_class is not None:
-            grid_polygons_new.append(pol)
-            room_types.append({'type': 'room', 'class': room_class})
-
-    room_polygons, room_types = merge_rectangles(grid_polygons_new, room_types)
+    with profile_stage("grid_classification"):
+        # junction_points shape n, 2, coordinate order x, y
+        junction_points = get_junction_points(wall_points, wall_lines)
+        grid_polygons = get_rectangle_polygons(junction_points, (height, width))
+
+        c, h, w = room_seg.shape
+        for i in range(c):
+            if i in [2, 8]: # we ignore walls (2) and railings (8)
+                room_seg[i] = np.zeros((h, w))
+
+        room_seg_2D = np.argmax(room_seg, axis=0)
+        room_types = []
+        grid_polygons_new = []
+        for i, pol in enumerate(grid_polygons):
+            room_class = get_rectangle_class(pol, room_seg_2D)
+            if room_class is not None:
+                grid_polygons_new.append(pol)
+                room_types.append({'type': 'room', 'class': room_class})
+
+    room_polygons, room_types = merge_rectangles(grid_polygons_new, room_types, room_merge)
 
     polygons = np.concatenate([walls, icons, openings])
     types = wall_types + icon_types + opening_types
@@ -413,14 +543,13 @@ def split_by_value(arr, max_val, skip=[]):
 
 
 def get_junction_points(wall_points, wall_lines):
-    junction_points = np.empty([0, 2], int)
+    junction_points = []
     for wall in wall_lines:
         indx1 = wall[0]
         indx2 = wall[1]
-        p1 = np.array(wall_points[indx1][:2])
-        junction_points = np.append(junction_points, [p1], axis=0)
-        p2 = np.array(wall_points[indx2][:2])
-        junction_points = np.append(junction_points, [p2], axis=0)
+        junction_points.append(wall_points[indx1][:2])
+        junction_points.append(wall_points[indx2][:2])
+    junction_points = np.array(junction_points, dtype=int).reshape(-1, 2)
     
     if len(junction_points) > 0:
         junction_points = np.unique(junction_points, axis=0)
@@ -428,6 +557,7 @@ def get_junction_points(wall_points, wall_lines):
     return junction_points
 
 
+@profiled("openings")
 def get_opening_polygon(heatmaps, wall_polygons, icons_seg, wall_points, wall_lines, wall_point_orientation_lines_map, threshold, point_orientations, orientation_ranges, all_opening_types, max_num_points=100, gap=10):
     height, width = heatmaps.shape[1], heatmaps.shape[2]
     size = height, width
@@ -444,31 +574,11 @@ def get_opening_polygon(heatmaps, wall_polygons, icons_seg, wall_points, wall_li
     point_info = calc_point_info(door_points, gap, point_orientations, orientation_ranges, height, width, True)
     door_lines, door_point_orientation_lines_map, door_point_neighbors = point_info
     
-    label_votes_map = np.zeros(icons_seg.shape)
-    label_map = np.zeros((30, height, width))
-    for segment_index, segmentation_img in enumerate(icons_seg):
-        label_votes_map[segment_index] = segmentation_img
-        label_map[segment_index] = segmentation_img
-
     door_types = []
     num_door_types = 2
     door_offset = 23
-    for line_index, line in enumerate(door_lines):
-        point = door_points[line[0]]
-        neighbor_point = door_points[line[1]]
-        line_dim = calc_line_dim(door_points, line)
-        fixed_value = int(
-            round((neighbor_point[1 - line_dim] + point[1 - line_dim]) / 2))
-        door_evidence_sums = [0 for type_index in range(num_door_types)]
-        for delta in range(int(abs(neighbor_point[line_dim] - point[line_dim]) + 1)):
-            intermediate_point = [0, 0]
-            intermediate_point[line_dim] = int(
-                min(neighbor_point[line_dim], point[line_dim]) + delta)
-            intermediate_point[1 - line_dim] = fixed_value
-            for type_index in range(num_door_types):
-                door_evidence_sums[type_index] += label_map[door_offset + type_index][min(max(
-                    intermediate_point[1], 0), height - 1)][min(max(intermediate_point[0], 0), width - 1)]
-
+    door_evidence = get_door_evidence(door_points, door_lines, icons_seg, door_offset, num_door_types)
+    for line_index, door_evidence_sums in enumerate(door_evidence):
         door_types.append((line_index, np.argmax(
             door_evidence_sums), np.max(door_evidence_sums)))
 
@@ -540,6 +650,42 @@ def get_opening_polygon(heatmaps, wall_polygons, icons_seg, wall_points, wall_li
     return opening_polygons, opening_types
 
 
+def get_door_evidence(door_points, door_lines, icons_seg, door_offset, num_door_types):
+    # Sums of the door type channels door_offset.. over the pixels of each
+    # door line, shape (len(door_lines), num_door_types). The pixels are
+    # gathered straight from icons_seg; channels past its last one count as
+    # zero, as in the zero padded 30 channel label map this replaces.
+    height, width = icons_seg.shape[1:]
+    evidence = np.zeros((len(door_lines), num_door_types))
+    channels = [(type_index, door_offset + type_index) for type_index in range(num_door_types)
+                if door_offset + type_index < len(icons_seg)]
+    if len(door_lines) == 0 or not channels:
+        return evidence
+
+    xs, ys, starts = [], [], []
+    length = 0
+    for line in door_lines:
+        point = door_points[line[0]]
+        neighbor_point = door_points[line[1]]
+        line_dim = calc_line_dim(door_points, line)
+        fixed_value = int(
+            round((neighbor_point[1 - line_dim] + point[1 - line_dim]) / 2))
+        along = int(min(neighbor_point[line_dim], point[line_dim])) + \
+            np.arange(int(abs(neighbor_point[line_dim] - point[line_dim]) + 1))
+        across = np.full(len(along), fixed_value)
+        line_xs, line_ys = (along, across) if line_dim == 0 else (across, along)
+        xs.append(np.clip(line_xs, 0, width - 1))
+        ys.append(np.clip(line_ys, 0, height - 1))
+        starts.append(length)
+        length += len(along)
+
+    xs, ys = np.concatenate(xs), np.concatenate(ys)
+    for type_index, channel in channels:
+        evidence[:, type_index] = np.add.reduceat(icons_seg[channel][ys, xs].astype(float), starts)
+
+    return evidence
+
+
 def get_opening_types(opening_polygons, icons_seg, all_opening_classes):
     opening_types = []
     for pol in opening_polygons:
@@ -558,6 +704,7 @@ def get_opening_types(opening_polygons, icons_seg, all_opening_classes):
 
     return opening_types
 
+@profiled("icons")
 def get_icon_polygon(heatmaps, icons_seg, threshold, point_orientations, orientation_ranges, max_num_points=100):
     _, height, width = icons_seg.shape
 
@@ -573,7 +720,7 @@ def get_icon_polygon(heatmaps, icons_seg, threshold, point_orientations, orienta
     icons = find_icons(icon_points, gap, point_orientations, orientation_ranges, height, width, False)
     icons_good = drop_big_icons(icons, icon_points)
     icon_types_good = []
-    icon_polygons = np.empty((0, 4, 2), dtype=int)
+    icon_polygons = []
     for icon_index, icon in enumerate(icons_good):
         icon_evidence_sums = []
         point_1 = icon_points[icon[0]]
@@ -589,14 +736,14 @@ def get_icon_polygon(heatmaps, icons_seg, threshold, point_orientations, orienta
         icon_area = get_icon_area(icon, icon_points)
         icon_evidence_sums = icons_seg[:, y1:y2+1, x1:x2+1].sum(axis=(1, 2))
         icon_class = np.argmax(icon_evidence_sums)
-        icon_polygon = np.array([[[x1, y1], [x2, y1], [x2, y2], [x1, y2]]])
+        icon_polygon = [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
         if icon_class != 0:
             icon_types_good.append({'type': 'icon',
                                     'class': icon_class,
                                     'prob': np.max(icon_evidence_sums) / icon_area})
-            icon_polygons = np.append(icon_polygons, icon_polygon, axis=0)
+            icon_polygons.append(icon_polygon)
 
-    return icon_polygons, icon_types_good
+    return stack_polygons(icon_polygons), icon_types_good
 
 
 def get_connected_walls(walls):
@@ -639,7 +786,7 @@ def extract_opening_polygon(wall_polygons, door_points, door_lines, size):
     height = size[0]
     width = size[1]
 
-    opening_polygons = np.empty([0, 4, 2], dtype=int)
+    opening_polygons = []
     for i, pol in enumerate(wall_polygons):
         polygon_dim = calc_polygon_dim(pol)
         for door_line in door_lines:
@@ -696,10 +843,9 @@ def extract_opening_polygon(wall_polygons, door_points, door_lines, size):
                     p22 = [0, point2[1]]
                     down_left = get_intersect(p11, p12, p21, p22)
 
-                op_pol = np.array([[up_left, up_right, down_right, down_left]], dtype=int)
-                opening_polygons = np.append(opening_polygons, op_pol, axis=0)
+                opening_polygons.append([up_left, up_right, down_right, down_left])
 
-    return opening_polygons
+    return stack_polygons(opening_polygons)
 
 def get_polygon_class(polygon, segmentation, remove_layers=[]):
     seg_copy = np.copy(segmentation)
@@ -716,6 +862,23 @@ def get_polygon_class(polygon, segmentation, remove_layers=[]):
     else:
         return None
 
+def get_rectangle_class(polygon, segmentation):
+    # Same as get_polygon_class for an axis aligned rectangle in the corner
+    # order of get_rectangle_polygons, without rasterizing. The rasterized
+    # rectangle includes its border pixels, so the class map is read through
+    # an inclusive slice. A zero width or height rectangle rasterizes to its
+    # corner pixels only.
+    x_min, y_min = polygon[0].astype(int)
+    x_max, y_max = polygon[2].astype(int)
+    if x_min == x_max or y_min == y_max:
+        area = segmentation[[y_min, y_max], [x_min, x_max]]
+    else:
+        area = segmentation[y_min:y_max + 1, x_min:x_max + 1]
+    counts = np.bincount(area.ravel())
+
+    return np.argmax(counts)
+
+
 def get_intersect(p11, p12, p21, p22):
     # If door point is the same as wall point
     # we do not have to calculate the intersect.
@@ -858,50 +1021,23 @@ def walls_same_corner(wall1, wall2, wall_points):
     return False
 
 
-def extract_wall_polygon(wall, wall_points, segmentation, seg_class):
+def extract_wall_polygon(wall, wall_points, segmentation, seg_class, wall_runs=None):
     _, max_height, max_width = segmentation.shape
     x1 = wall_points[wall[0]][0]
     x2 = wall_points[wall[1]][0]
     y1 = wall_points[wall[0]][1]
     y2 = wall_points[wall[1]][1]
-    line_pxls = bresenham_line(x1, y1, x2, y2)
     w_dim = calc_line_dim(wall_points, wall)
 
-    widths = np.array([])
+    if wall_runs is None:
+        wall_runs = calc_wall_runs(segmentation, seg_class)
 
-    line_pxls = bresenham_line(x1, y1, x2, y2)
+    line_pxls = np.array(bresenham_line(x1, y1, x2, y2), dtype=int).reshape(-1, 2)
+    rows, cols = line_pxls[:, 0], line_pxls[:, 1]
     # strait vertical line
     if w_dim == 1:
-        for i in line_pxls:
-            w_pos = 0
-            w_neg = 0
-            j0, i0 = i[0], i[1]
-            con = True
-            while con and i0 < max_width-1:
-                i1 = i0 + 1
-                j1 = j0
-                pxl_class = get_pxl_class(int(np.floor(i1)), int(np.floor(j1)), segmentation)
-                if pxl_class in seg_class:
-                    w_pos += 1
-                else:
-                    con = False
-                j0 = j1
-                i0 = i1
-
-            j0, i0 = i[0], i[1]
-            con = True
-            while con and i0 > 0:
-                i1 = i0 - 1
-                j1 = j0
-                pxl_class = get_pxl_class(int(np.floor(i1)), int(np.floor(j1)), segmentation)
-                if pxl_class in seg_class:
-                    w_neg += 1
-                else:
-                    con = False
-                j0 = j1
-                i0 = i1
-
-            widths = np.append(widths, w_pos + w_neg + 1)
+        # Wall thickness across the line: wall pixels to the right and left
+        widths = (wall_runs[0][rows, cols] + wall_runs[1][rows, cols] + 1).astype(float)
 
         # widths = reject_outliers(widths)
         # if len(widths) == 0:
@@ -933,36 +1069,8 @@ def extract_wall_polygon(wall, wall_points, segmentation, seg_class):
         return wall_width, polygon
 
     else:
-        for i in line_pxls:
-            w_pos = 0
-            w_neg = 0
-            j0, i0 = i[0], i[1]
-            con = True
-            while con and j0 < max_height-1:
-                i1 = i0
-                j1 = j0 + 1
-                pxl_class = get_pxl_class(int(np.floor(i1)), int(np.floor(j1)), segmentation)
-                if pxl_class in seg_class:
-                    w_pos += 1
-                else:
-                    con = False
-                j0 = j1
-                i0 = i1
-
-            j0, i0 = i[0], i[1]
-            con = True
-            while con and j0 > 0:
-                i1 = i0
-                j1 = j0 - 1
-                pxl_class = get_pxl_class(int(np.floor(i1)), int(np.floor(j1)), segmentation)
-                if pxl_class in seg_class:
-                    w_neg += 1
-                else:
-                    con = False
-                j0 = j1
-                i0 = i1
-
-            widths = np.append(widths, w_pos + w_neg + 1)
+        # Wall thickness across the line: wall pixels below and above
+        widths = (wall_runs[2][rows, cols] + wall_runs[3][rows, cols] + 1).astype(float)
 
         # widths = reject_outliers(widths)
         # if len(widths) == 0:
@@ -994,6 +1102,30 @@ def extract_wall_polygon(wall, wall_points, segmentation, seg_class):
         return wall_width, polygon
 
 
+def calc_wall_runs(segmentation, seg_class):
+    # Number of consecutive wall class pixels next to each pixel, not counting
+    # the pixel itself, to the right, left, below and above it.
+    wall_mask = np.isin(np.argmax(segmentation, axis=0), seg_class)
+    right = calc_runs_after(wall_mask)
+    left = calc_runs_after(wall_mask[:, ::-1])[:, ::-1]
+    down = calc_runs_after(wall_mask.T).T
+    up = calc_runs_after(wall_mask[::-1].T).T[::-1]
+
+    return right, left, down, up
+
+
+def calc_runs_after(mask):
+    # Length of the run of True values that starts right after each position
+    # along the last axis.
+    length = mask.shape[1]
+    index = np.arange(length)
+    stops = np.minimum.accumulate(np.where(mask, length, index)[:, ::-1], axis=1)[:, ::-1]
+    runs = np.zeros(mask.shape, int)
+    runs[:, :-1] = (stops - index)[:, 1:]
+
+    return runs
+
+
 def reject_outliers(data, m=0.5):
     data = data[data < 70]
     return data[abs(data - np.mean(data)) < m * np.std(data)]
@@ -1065,10 +1197,35 @@ def split_prediction(tensor, shape, split):
     return heatmaps, rooms, icons
 
 
+def get_working_shape(shape, max_size):
+    # Largest (height, width) with the same aspect ratio as shape whose
+    # longer side does not exceed max_size. max_size <= 0 disables the cap.
+    height, width = shape
+    if max_size is None or max_size <= 0 or max(height, width) <= max_size:
+        return height, width
+
+    scale = float(max_size) / max(height, width)
+    return max(int(round(height * scale)), 1), max(int(round(width * scale)), 1)
+
+
+def rescale_polygons(polygons, room_polygons, x_scale, y_scale):
+    # Maps get_polygons output computed on a resized prediction back to
+    # image space. polygons is the (n, 4, 2) x, y array of walls, icons and
+    # openings, room_polygons the list of shapely room polygons.
+    if len(polygons) > 0:
+        polygons = np.round(polygons * np.array([x_scale, y_scale])).astype(int)
+
+    room_polygons = [affinity.scale(pol, xfact=x_scale, yfact=y_scale, origin=(0, 0))
+                     for pol in room_polygons]
+
+    return polygons, room_polygons
+
+
+@profiled("peak_extraction")
 def extract_local_max(mask_img, num_points, info, heatmap_value_threshold=0.5,
                       close_point_suppression=False, line_width=5,
                       mask_index=-1, gap=10):
-    mask = copy.deepcopy(mask_img)
+    mask = np.array(mask_img, copy=True, order='C')
     height, width = mask.shape
     points = []
 
@@ -1090,23 +1247,65 @@ def extract_local_max(mask_img, num_points, info, heatmap_value_threshold=0.5,
 
 
 def maximum_suppression(mask, x, y, heatmap_value_threshold):
+    # Sets to -1 every pixel reachable from (x, y) by 4-neighbour steps onto
+    # a value that is not higher and above the threshold. Grows breadth-first
+    # over the whole frontier at once, so plateaus need no recursion.
+    # mask must be C-contiguous; it is modified in place.
     height, width = mask.shape
-    value = mask[y][x]
-    mask[y][x] = -1
-    deltas = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for delta in deltas:
-        neighbor_x = x + delta[0]
-        neighbor_y = y + delta[1]
-        if neighbor_x < 0 or neighbor_y < 0 or neighbor_x >= width or neighbor_y >= height:
-            continue
-        neighbor_value = mask[neighbor_y][neighbor_x]
-        if neighbor_value <= value and neighbor_value > heatmap_value_threshold:
-            maximum_suppression(mask, neighbor_x, neighbor_y,
-                               heatmap_value_threshold)
-            pass
-        continue
-
-
+    flat = mask.reshape(-1)
+
+    frontier = np.array([y * width + x], dtype=np.intp)
+    values = flat[frontier].copy()
+    flat[frontier] = -1
+
+    while frontier.size:
+        column = frontier % width
+        neighbors = []
+        parent_values = []
+        for valid, offset in ((frontier >= width, -width),
+                              (frontier < (height - 1) * width, width),
+                              (column > 0, -1),
+                              (column < width - 1, 1)):
+            neighbors.append(frontier[valid] + offset)
+            parent_values.append(values[valid])
+
+        neighbors = np.concatenate(neighbors)
+        parent_values = np.concatenate(parent_values)
+        neighbor_values = flat[neighbors]
+        # Threshold test in float64, like the per-pixel scalar comparison it replaces
+        grow = ((neighbor_values <= parent_values) &
+                (neighbor_values.astype(np.float64) > heatmap_value_threshold))
+
+        frontier = np.unique(neighbors[grow])
+        values = flat[frontier].copy()
+        flat[frontier] = -1
+
+
+def index_points_by_orientation(points, point_orientations):
+    # For each orientation, the indices of the points that have it sorted by
+    # x and by y, next to the sorted coordinates for bisection:
+    # index[orientation][c] = (coordinates, point indices) for c in (0, 1).
+    index = {}
+    for orientation in range(4):
+        members = [point_index for point_index, point in enumerate(points)
+                   if orientation in point_orientations[point[2]][point[3]]]
+        axes = []
+        for c in range(2):
+            order = sorted(members, key=lambda point_index: points[point_index][c])
+            axes.append(([points[point_index][c] for point_index in order], order))
+        index[orientation] = axes
+
+    return index
+
+
+def points_in_strip(index, orientation, c, min_value, max_value):
+    # Indices of the points with the given orientation whose coordinate c is
+    # in [min_value, max_value], in coordinate order.
+    values, order = index[orientation][c]
+    return order[bisect_left(values, min_value):bisect_right(values, max_value)]
+
+
+@profiled("line_finding")
 def calc_point_info(points, gap, point_orientations, orientation_ranges, 
                     height, width, min_distance_only=False,
                     double_direction=False):
@@ -1123,6 +1322,7 @@ def calc_point_info(points, gap, point_orientations, orientation_ranges,
 
         point_orientation_lines_map.append(orientation_lines)
 
+    point_index_map = index_points_by_orientation(points, point_orientations)
     for point_index, point in enumerate(points):
         point_type = point[2]
         orientations = point_orientations[point_type][point[3]]
@@ -1153,14 +1353,14 @@ def calc_point_info(points, gap, point_orientations, orientation_ranges,
             min_distance = max(width, height)
             min_distance_neighbor_point = -1
 
-            for neighbor_point_index, neighbor_point in enumerate(points):
+            # Only points with the opposite orientation inside the strip across the line
+            c = 1 - line_dim
+            candidates = points_in_strip(point_index_map, opposite_orientation, c, ranges[c], ranges[c + 2])
+            for neighbor_point_index in sorted(candidates):
+                neighbor_point = points[neighbor_point_index]
                 if (neighbor_point_index <= point_index and not double_direction) or neighbor_point_index == point_index:
                     continue
 
-                neighbor_orientations = point_orientations[neighbor_point[2]][neighbor_point[3]]
-                if opposite_orientation not in neighbor_orientations:
-                    continue
-
                 in_range = True
                 for c in range(2):
                     if neighbor_point[c] < ranges[c] or neighbor_point[c] > ranges[c + 2]:
@@ -1325,6 +1525,7 @@ def find_conflict_rectangle_pairs(points, rectangles, gap):
     return conflict_rectangle_pairs
 
 
+@profiled("line_finding")
 def find_icons(points, gap, point_orientations, orientation_ranges,
                height, width, min_distance_only=False,
                max_lengths=(10000, 10000)):
@@ -1340,6 +1541,7 @@ def find_icons(points, gap, point_orientations, orientation_ranges,
         point_orientation_neighbors_map.append(orientation_neighbors)
         continue
 
+    point_index_map = index_points_by_orientation(points, point_orientations)
     for point_index, point in enumerate(points):
         point_type = point[2]
         orientations = point_orientations[point_type][point[3]]
@@ -1369,13 +1571,13 @@ def find_icons(points, gap, point_orientations, orientation_ranges,
             min_distance = max(width, height)
             min_distance_neighbor_point = -1
 
-            for neighbor_point_index, neighbor_point in enumerate(points):
+            # Only points with the opposite orientation inside the strip across the line
+            c = 1 - line_dim
+            candidates = points_in_strip(point_index_map, opposite_orientation, c, ranges[c], ranges[c + 2])
+            for neighbor_point_index in sorted(candidates):
+                neighbor_point = points[neighbor_point_index]
                 if neighbor_point_index <= point_index:
                     continue
-                neighbor_orientations = point_orientations[neighbor_point[2]
-                                                         ][neighbor_point[3]]
-                if opposite_orientation not in neighbor_orientations:
-                    continue
 
                 in_range = True
                 for c in range(2):
@@ -0,0 +1,127 @@
+"""
+Opt-in stage profiling for the floortrans post-processing.
+
+Stages are marked with the ``profiled`` decorator or the ``profile_stage``
+context manager. They only record anything inside ``profile_postprocessing``;
+otherwise the decorator calls straight through after a single context
+variable lookup. Each stage records its call count, wall time and peak
+traced allocation (tracemalloc) above the memory in use when it started.
+Nested stages are included in their parents' numbers.
+
+tracemalloc is process-wide: it is started by the first active profiling
+block and stopped by the last one, and its single peak is shared under a
+lock between the open stages of every active profiler. Wall times stay
+per job, but while several jobs are profiled at once (batcher threads,
+concurrent requests) a stage's peak also counts the other jobs'
+allocations, so it is an upper bound; exact peaks need one job at a time.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional
+
+_active_profiler: ContextVar[Optional['StageProfiler']] = ContextVar("postprocess_profiler", default=None)
+
+# Tracing state shared by all profilers, guarded by _tracing_lock
+_tracing_lock = threading.Lock()
+_active_sessions = 0
+_started_tracing = False
+# Open stages of every profiler by id, as [name, traced memory at entry, highest traced memory]
+_open_stages: Dict[int, list] = {}
+
+
+def _fold_peak() -> None:
+    # tracemalloc keeps a single peak, so hand it to every open stage
+    # before it is reset for the next one (caller holds _tracing_lock)
+    peak = tracemalloc.get_traced_memory()[1]
+    for entry in _open_stages.values():
+        entry[2] = max(entry[2], peak)
+    tracemalloc.reset_peak()
+
+
+class StageProfiler:
+    """Accumulates calls, wall time and peak allocation per stage name."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        with _tracing_lock:
+            _fold_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            entry = [name, current, current]
+            _open_stages[id(entry)] = entry
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with _tracing_lock:
+                _fold_peak()
+                del _open_stages[id(entry)]
+            record = self.stages.setdefault(name, {"calls": 0, "wall_time_ms": 0.0, "peak_alloc_bytes": 0})
+            record["calls"] += 1
+            record["wall_time_ms"] += elapsed * 1000
+            record["peak_alloc_bytes"] = max(record["peak_alloc_bytes"], entry[2] - entry[1])
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage totals, in the order the stages were first entered."""
+        return {name: dict(record) for name, record in self.stages.items()}
+
+
+@contextmanager
+def profile_postprocessing():
+    """
+    Profile the stages run inside the block.
+
+    Yields:
+        StageProfiler collecting the stages of this block
+    """
+    global _active_sessions, _started_tracing
+    profiler = StageProfiler()
+    with _tracing_lock:
+        if _active_sessions == 0:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+        _active_sessions += 1
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+        with _tracing_lock:
+            _active_sessions -= 1
+            if _active_sessions == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Record the block as stage ``name`` when profiling is active."""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profiled(name: str):
+    """Decorator recording every call of the function as stage ``name``."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+            with profiler.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
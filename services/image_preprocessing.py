@@ -0,0 +1,109 @@
+"""
+Image preprocessing for CubiCasa5K inference.
+
+Uploads are decoded once, at reduced size when the decoder supports it
+(JPEG draft mode decodes at 1/2, 1/4 or 1/8 scale), resized with their
+aspect ratio kept and letterboxed into a square network input. The input
+size comes from a ladder of sizes picked by the image size. The Letterbox
+returned alongside the tensor records where the image sits in the input,
+so model outputs can be cropped back to exactly the image area.
+"""
+
+from io import BytesIO
+from typing import NamedTuple, Sequence, Tuple
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Total downsampling of hg_furukawa_original (strided conv + 5 max pools);
+# inputs that are a multiple of it come back at exactly the input size
+NETWORK_STRIDE = 64
+
+
+class Letterbox(NamedTuple):
+    """Placement of a resized image inside the padded network input."""
+    original_size: Tuple[int, int]  # (width, height) of the upload
+    content_size: Tuple[int, int]  # (width, height) of the image inside the input
+    input_size: Tuple[int, int]  # (width, height) of the padded input
+
+    def crop(self, outputs: torch.Tensor) -> torch.Tensor:
+        """Drop the padding from (N, C, H, W) model outputs."""
+        width, height = self.content_size
+        return outputs[:, :, :height, :width]
+
+
+def round_to_stride(size: int, stride: int = NETWORK_STRIDE) -> int:
+    """Smallest multiple of stride that is at least size."""
+    return max(stride, -(-int(size) // stride) * stride)
+
+
+def choose_input_size(width: int, height: int, ladder: Sequence[int]) -> int:
+    """
+    Smallest ladder size that fits the image's longer side, or the largest
+    one for images bigger than every size. Sizes are rounded up to the
+    network stride.
+    """
+    sizes = sorted(round_to_stride(size) for size in ladder)
+    longest = max(width, height)
+    for size in sizes:
+        if size >= longest:
+            return size
+    return sizes[-1]
+
+
+def fit_size(width: int, height: int, max_side: int) -> Tuple[int, int]:
+    """(width, height) scaled so the longer side is max_side."""
+    scale = max_side / max(width, height)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def open_image(image_bytes: bytes) -> Image.Image:
+    """Open an upload without decoding its pixels yet."""
+    return Image.open(BytesIO(image_bytes))
+
+
+def load_rgb(image: Image.Image, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Decode an opened image straight to an (H, W, 3) uint8 array at size.
+
+    Args:
+        image: Image from open_image, not yet loaded
+        size: Target (width, height)
+    """
+    # No-op for formats without reduced decoding; keeps at least size pixels
+    image.draft('RGB', size)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    if image.size != size:
+        image = image.resize(size, resample=Image.BILINEAR, reducing_gap=3.0)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.asarray(image)
+
+
+def letterbox_image(image_bytes: bytes, ladder: Sequence[int]) -> Tuple[torch.Tensor, Letterbox]:
+    """
+    Decode, resize and letterbox an upload into a (1, 3, S, S) input in [0, 1].
+
+    The padding is white, the floor plan background.
+
+    Args:
+        image_bytes: Raw image bytes
+        ladder: Candidate input sizes
+
+    Returns:
+        Tuple of (input_tensor, letterbox)
+    """
+    image = open_image(image_bytes)
+    original_size = image.size
+    input_side = choose_input_size(original_size[0], original_size[1], ladder)
+    content_size = fit_size(original_size[0], original_size[1], input_side)
+
+    pixels = load_rgb(image, content_size)
+    padded = np.full((3, input_side, input_side), 255, dtype=np.float32)
+    padded[:, :content_size[1], :content_size[0]] = pixels.transpose(2, 0, 1)
+    padded *= 1.0 / 255.0
+
+    tensor = torch.from_numpy(padded).unsqueeze(0)
+    return tensor, Letterbox(original_size, content_size, (input_side, input_side))
@@ -0,0 +1,477 @@
+"""
+Inference Pool for PlanCast.
+
+Persistent pool of CubiCasa5K worker processes. Workers are started with
+the forkserver method (spawn where it is unavailable), never forked from
+the API process: that process runs the event loop, the batcher and
+collector threads and an initialised OpenMP pool, none of which survive a
+fork safely. Each worker loads its own CubiCasaService; the model weights
+come from the memory-mapped weights file the parent converted, so their
+pages are shared through the page cache instead of copied per worker.
+With warm-up runs configured, a worker runs its dummy inferences before it
+reports ready, so kernel setup happens in the process that serves jobs.
+
+Each worker pins its torch intra-op thread count, takes image bytes over
+its own pipe and answers with the CubiCasaOutput and the timings of the
+forward passes it ran, which are recorded in the parent's InferenceStats.
+Jobs therefore no longer contend for the GIL and torch threads of the API
+process, and a crashing job only takes down its worker. A worker whose
+resident memory grows past the ceiling retires after finishing its job,
+and a replacement is started.
+"""
+
+import itertools
+import multiprocessing
+import os
+import resource
+import threading
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import torch
+
+from models.data_structures import CubiCasaOutput
+from services.cubicasa_service import (
+    CubiCasaService,
+    CubiCasaError,
+    get_cubicasa_service,
+    get_loaded_cubicasa_service
+)
+from services.inference_stats import InferenceStats
+from utils.logger import get_logger
+from config.settings import (
+    CUBICASA_INFERENCE_WORKERS,
+    CUBICASA_WORKER_THREADS,
+    CUBICASA_WORKER_MAX_RSS_MB,
+    CUBICASA_WARMUP_ON_STARTUP,
+    CUBICASA_WARMUP_RUNS,
+    CUBICASA_LATENCY_WINDOW
+)
+
+logger = get_logger("inference_pool")
+
+# Global pool instance (singleton pattern)
+_global_inference_pool = None
+
+
+def get_inference_pool() -> Optional['InferencePool']:
+    """
+    Get or create the global inference pool.
+
+    Returns:
+        Started InferencePool, or None when CUBICASA_INFERENCE_WORKERS is 0
+        and inference runs in the calling thread
+    """
+    global _global_inference_pool
+    if _global_inference_pool is None and CUBICASA_INFERENCE_WORKERS > 0:
+        # Convert the weights file once here, so workers map it instead of racing to write it
+        CubiCasaService(load_model=False).prepare_weights()
+        # Worker timings land where the health check reads them when the service is loaded here
+        service = get_loaded_cubicasa_service()
+        inference_stats = service.inference_stats if service is not None else InferenceStats(CUBICASA_LATENCY_WINDOW)
+        _global_inference_pool = InferencePool(
+            get_cubicasa_service,
+            num_workers=CUBICASA_INFERENCE_WORKERS,
+            threads_per_worker=CUBICASA_WORKER_THREADS,
+            max_rss_mb=CUBICASA_WORKER_MAX_RSS_MB,
+            inference_stats=inference_stats,
+            warmup_runs=CUBICASA_WARMUP_RUNS if CUBICASA_WARMUP_ON_STARTUP else 0
+        )
+        _global_inference_pool.start()
+    return _global_inference_pool
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _CallRecorder:
+    """Collects the forward passes of a worker until they are sent to the parent."""
+
+    def __init__(self):
+        self.calls: List[Tuple[float, bool, int, Optional[str]]] = []
+
+    def record(self, latency_ms: float, success: bool, batch_size: int = 1, error: Optional[str] = None) -> None:
+        self.calls.append((latency_ms, success, batch_size, error))
+
+    def drain(self) -> List[Tuple[float, bool, int, Optional[str]]]:
+        calls, self.calls = self.calls, []
+        return calls
+
+
+def _worker_main(load_service: Callable[[], Any], connection, num_threads: int, max_rss_bytes: int,
+                 warmup_runs: int) -> None:
+    """Worker loop: load and warm up the service, then process (task_id, image_bytes, job_id) until None arrives or memory runs over."""
+    torch.set_num_threads(num_threads)
+    recorder = _CallRecorder()
+    try:
+        service = load_service()
+        # One job at a time per worker
+        service.batcher = None
+        service.inference_stats = recorder
+        warmup_ms = {}
+        if warmup_runs > 0:
+            from services.model_warmup import run_warmup
+            warmup_ms = run_warmup(service, warmup_runs)
+    except Exception as e:
+        connection.send(("failed", None, str(e), None, recorder.drain()))
+        return
+    # Dummy inferences are not job latencies
+    recorder.drain()
+    connection.send(("ready", None, warmup_ms, None, []))
+
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        task_id, image_bytes, job_id = task
+        try:
+            kind, payload = "done", service.process_image(image_bytes, job_id)
+        except Exception as e:
+            kind, payload = "error", str(e)
+
+        # Announce retirement with the result, so no new job is sent here
+        rss = current_rss_bytes()
+        retiring = 0 < max_rss_bytes < rss
+        connection.send((kind, task_id, payload, rss if retiring else None, recorder.drain()))
+        if retiring:
+            return
+
+
+class InferencePoolError(CubiCasaError):
+    """Exception for jobs that failed in or were lost by the inference pool."""
+    pass
+
+
+def _worker_context():
+    """forkserver where available: workers fork from a clean server process with torch imported."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["services.cubicasa_service"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class InferencePool:
+    """
+    CubiCasa5K worker processes fed from a shared job queue.
+
+    Jobs are queued in the parent and handed to idle workers one at a time,
+    so the parent always knows which job a worker holds. A collector thread
+    receives results, restarts workers that retired or died, and fails the
+    job of a worker that died with InferencePoolError.
+
+    A worker that dies before it has loaded its service is not restarted;
+    its job goes back to the queue, and once no worker is left queued jobs
+    fail with the load error.
+    """
+
+    def __init__(self,
+                 load_service: Callable[[], Any],
+                 num_workers: int = 2,
+                 threads_per_worker: int = 1,
+                 max_rss_mb: int = 0,
+                 inference_stats: Optional[Any] = None,
+                 warmup_runs: int = 0):
+        """
+        Initialize the pool.
+
+        Args:
+            load_service: Picklable callable returning the loaded CubiCasaService
+                in a worker (e.g. get_cubicasa_service)
+            num_workers: Number of worker processes
+            threads_per_worker: torch intra-op threads per worker
+            max_rss_mb: Worker memory ceiling in MB; 0 disables the check
+            inference_stats: InferenceStats the workers' forward passes are recorded in
+            warmup_runs: Dummy inferences per input size each worker runs before it is ready
+        """
+        self.load_service = load_service
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = max(1, int(threads_per_worker))
+        self.max_rss_bytes = max(0, int(max_rss_mb)) * 1024 * 1024
+        self.inference_stats = inference_stats
+        self.warmup_runs = max(0, int(warmup_runs))
+        self.warmup_ms: Dict[int, float] = {}  # input size -> slowest worker's last dummy inference
+        self._context = _worker_context()
+        self._lock = threading.Lock()
+        self._ready_changed = threading.Condition(self._lock)
+        self._task_ids = itertools.count()
+        self._pending: Deque[Tuple[int, bytes, str]] = deque()
+        self._futures: Dict[int, Future] = {}
+        self._workers: Dict[int, Tuple[Any, Any]] = {}  # worker id -> (process, connection)
+        self._idle: Deque[int] = deque()
+        self._in_flight: Dict[int, Tuple[int, bytes, str]] = {}  # worker id -> task
+        self._ready: Set[int] = set()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+        self.startup_error: Optional[str] = None
+        self.jobs_run = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Start the workers and collecting results; see wait_ready for the model load."""
+        with self._lock:
+            for worker_id in range(self.num_workers):
+                self._start_worker(worker_id)
+        self._collector = threading.Thread(target=self._collect, name="inference-pool", daemon=True)
+        self._collector.start()
+        logger.info(f"✅ Inference pool started: {self.num_workers} workers x {self.threads_per_worker} threads")
+
+    def _start_worker(self, worker_id: int) -> None:
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.load_service, child_connection, self.threads_per_worker, self.max_rss_bytes,
+                  self.warmup_runs),
+            name=f"cubicasa-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_connection.close()
+        self._workers[worker_id] = (process, parent_connection)
+        self._idle.append(worker_id)
+
+    def submit(self, image_bytes: bytes, job_id: str) -> Future:
+        """
+        Queue an image for processing by the next idle worker.
+
+        Args:
+            image_bytes: Raw image bytes
+            job_id: Job ID for logging
+
+        Returns:
+            Future resolving to the CubiCasaOutput
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise InferencePoolError("Inference pool is closed")
+            if not self._workers:
+                raise InferencePoolError(f"No inference workers could start: {self.startup_error}")
+            task_id = next(self._task_ids)
+            self._futures[task_id] = future
+            self._pending.append((task_id, image_bytes, job_id))
+            self._dispatch()
+        return future
+
+    def process_image(self, image_bytes: bytes, job_id: str) -> CubiCasaOutput:
+        """Process an image in a worker process and wait for the result."""
+        return self.submit(image_bytes, job_id).result()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every worker has loaded and warmed up its service.
+
+        Jobs submitted earlier are not lost: they wait in the worker's pipe.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True once all workers are ready, False on timeout
+
+        Raises:
+            InferencePoolError: If no worker could load the service
+        """
+        with self._ready_changed:
+            ready = self._ready_changed.wait_for(
+                lambda: not self._workers or self._ready >= set(self._workers), timeout
+            )
+            if not self._workers:
+                raise InferencePoolError(f"No inference workers could start: {self.startup_error}")
+            return ready
+
+    def _dispatch(self) -> None:
+        # Called with the lock held
+        while self._pending and self._idle:
+            worker_id = self._idle.popleft()
+            task = self._pending.popleft()
+            try:
+                self._workers[worker_id][1].send(task)
+            except (BrokenPipeError, OSError):
+                # Worker died while idle; its replacement picks the job up
+                self._pending.appendleft(task)
+                continue
+            self._in_flight[worker_id] = task
+
+    def _collect(self) -> None:
+        while not self._closed:
+            with self._lock:
+                waitables = {}
+                for worker_id, (process, connection) in self._workers.items():
+                    waitables[connection] = worker_id
+                    waitables[process.sentinel] = worker_id
+            try:
+                ready_list = wait(list(waitables), timeout=0.5)
+            except (OSError, ValueError):
+                # A connection was closed by close() while waiting
+                continue
+            for ready in ready_list:
+                worker_id = waitables[ready]
+                if worker_id not in self._workers:
+                    continue
+                process, connection = self._workers[worker_id]
+                if ready is connection:
+                    self._receive(worker_id, connection)
+                elif ready == process.sentinel and not process.is_alive():
+                    self._replace_worker(worker_id)
+
+    def _receive(self, worker_id: int, connection, reusable: bool = True) -> bool:
+        """Receive one result; False once the worker's end of the pipe is gone."""
+        try:
+            kind, task_id, payload, retire_rss, calls = connection.recv()
+        except (EOFError, OSError):
+            # The sentinel reports the dead worker
+            return False
+
+        if self.inference_stats is not None:
+            for call in calls:
+                self.inference_stats.record(*call)
+
+        if kind in ("ready", "failed"):
+            with self._lock:
+                if kind == "ready":
+                    self._ready.add(worker_id)
+                    for size, ms in payload.items():
+                        self.warmup_ms[size] = max(ms, self.warmup_ms.get(size, 0.0))
+                else:
+                    self.startup_error = payload
+                    logger.error(f"❌ Worker {worker_id} could not load the model: {payload}")
+                self._ready_changed.notify_all()
+            return True
+
+        with self._lock:
+            self._in_flight.pop(worker_id, None)
+            future = self._futures.pop(task_id, None)
+            self.jobs_run += 1
+            if retire_rss is not None:
+                logger.info(f"♻️ Worker {worker_id} retiring at {retire_rss / (1024 * 1024):.0f} MB RSS")
+            elif reusable:
+                self._idle.append(worker_id)
+                self._dispatch()
+
+        if future is not None:
+            if kind == "done":
+                future.set_result(payload)
+            else:
+                future.set_exception(InferencePoolError(payload))
+        return True
+
+    def _replace_worker(self, worker_id: int) -> None:
+        process, connection = self._workers[worker_id]
+        with self._lock:
+            if worker_id in self._idle:
+                self._idle.remove(worker_id)
+        # Results the worker sent before exiting are still in the pipe
+        try:
+            while connection.poll() and self._receive(worker_id, connection, reusable=False):
+                pass
+        except OSError:
+            pass
+        process.join()
+        connection.close()
+
+        with self._lock:
+            task = self._in_flight.pop(worker_id, None)
+            task_id = task[0] if task is not None else None
+            future = self._futures.pop(task_id, None) if task is not None else None
+            if self._closed:
+                return
+            dropped = worker_id not in self._ready
+            if dropped:
+                # Died loading the model: restarting would fail the same way
+                failed = self._drop_worker(worker_id, task, future)
+            else:
+                self._ready.discard(worker_id)
+                self.restarts += 1
+                self._start_worker(worker_id)
+                self._dispatch()
+
+        if dropped:
+            error = InferencePoolError(f"No inference workers could start: {self.startup_error}")
+            for failed_future in failed:
+                failed_future.set_exception(error)
+            return
+
+        if future is not None:
+            logger.error(f"❌ Worker {worker_id} died (exit code {process.exitcode}) during task {task_id}")
+            future.set_exception(InferencePoolError(f"Inference worker died with exit code {process.exitcode}"))
+        else:
+            logger.info(f"♻️ Worker {worker_id} replaced (exit code {process.exitcode})")
+
+    def _drop_worker(self, worker_id: int, task: Optional[Tuple[int, bytes, str]],
+                     future: Optional[Future]) -> List[Future]:
+        """Remove a worker that never became ready; returns the futures to fail when none is left."""
+        # Called with the lock held
+        del self._workers[worker_id]
+        logger.error(f"❌ Worker {worker_id} exited before loading the model; {len(self._workers)} workers left")
+        self._ready_changed.notify_all()
+        if task is not None and future is not None:
+            self._futures[task[0]] = future
+            self._pending.appendleft(task)
+        if self._workers:
+            self._dispatch()
+            return []
+        failed = [self._futures.pop(task_id) for task_id, _, _ in self._pending]
+        self._pending.clear()
+        return failed
+
+    def worker_pids(self) -> Dict[int, int]:
+        """Process id per worker id."""
+        with self._lock:
+            return {worker_id: process.pid for worker_id, (process, _) in self._workers.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth and counters."""
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "ready": len(self._ready),
+                "threads_per_worker": self.threads_per_worker,
+                "max_rss_mb": self.max_rss_bytes // (1024 * 1024),
+                "busy": len(self._in_flight),
+                "queued": len(self._pending),
+                "jobs_run": self.jobs_run,
+                "restarts": self.restarts
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the workers; queued and running jobs fail with InferencePoolError."""
+        with self._lock:
+            self._closed = True
+            pending = [self._futures.pop(task_id) for task_id, _, _ in self._pending]
+            self._pending.clear()
+            workers = list(self._workers.values())
+        for future in pending:
+            future.set_exception(InferencePoolError("Inference pool closed"))
+
+        for process, connection in workers:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        if self._collector is not None:
+            self._collector.join(timeout)
+        for process, connection in workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            connection.close()
+
+        with self._lock:
+            lost = list(self._futures.values())
+            self._futures.clear()
+        for future in lost:
+            future.set_exception(InferencePoolError("Inference pool closed"))
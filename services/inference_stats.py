@@ -0,0 +1,83 @@
+"""
+Inference Stats for PlanCast.
+
+Records the outcome and latency of every CubiCasa5K forward pass (warm-up
+or real job), so health checks can report the last result and rolling
+latency percentiles instead of running inference themselves.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+
+class InferenceStats:
+    """
+    Last inference result and a rolling window of latencies.
+
+    Only successful passes enter the latency window, so a burst of fast
+    failures does not make the percentiles look better.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the stats.
+
+        Args:
+            window: Number of most recent successful latencies kept
+        """
+        self._latencies: Deque[float] = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+        self.last: Optional[Dict[str, Any]] = None
+        self.total = 0
+        self.failures = 0
+
+    def record(self, latency_ms: float, success: bool, batch_size: int = 1, error: Optional[str] = None) -> None:
+        """
+        Record one forward pass.
+
+        Args:
+            latency_ms: Wall time of the pass in milliseconds
+            success: Whether the pass produced an output
+            batch_size: Number of images in the pass
+            error: Error message of a failed pass
+        """
+        with self._lock:
+            self.total += 1
+            if success:
+                self._latencies.append(latency_ms)
+            else:
+                self.failures += 1
+            self.last = {
+                "success": success,
+                "latency_ms": round(latency_ms, 1),
+                "batch_size": batch_size,
+                "timestamp": time.time(),
+                "error": error
+            }
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last recorded pass, or None if there was none."""
+        last = self.last
+        return time.time() - last["timestamp"] if last is not None else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Last result, counters and p50/p95 over the latency window."""
+        with self._lock:
+            latencies = list(self._latencies)
+            summary = {
+                "last": dict(self.last) if self.last is not None else None,
+                "total": self.total,
+                "failures": self.failures,
+                "window": len(latencies),
+                "p50_ms": None,
+                "p95_ms": None
+            }
+        if latencies:
+            p50, p95 = np.percentile(latencies, [50, 95])
+            summary["p50_ms"] = round(float(p50), 1)
+            summary["p95_ms"] = round(float(p95), 1)
+        return summary
@@ -9,7 +9,8 @@ import time
 import os
 import math
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
 try:
@@ -25,9 +26,10 @@ from models.data_structures import (
     Building3D, 
     Room3D, 
     Wall3D, 
-    Vertex3D, 
-    Face,
+    TriangleMesh,
+    concatenate_mesh_arrays,
     MeshExportResult,
+    MeshAudit,
     WebPreviewData,
     ExportFormat
 )
@@ -36,11 +38,17 @@ from config.settings import (
     GENERATED_MODELS_DIR,
     USE_Y_UP_FOR_WEB,
     DEFAULT_UNITS,
-    WEB_OPTIMIZED_GLB
+    WEB_OPTIMIZED_GLB,
+    MESH_EXPORT_WORKERS,
+    MESH_DIAGNOSTICS
 )
 
 logger = get_logger("mesh_exporter")
 
+# Writers that may write the same building_<ts>.obj file (FBX placeholder,
+# SKP OBJ fallback); they always run one after another in request order
+OBJ_WRITING_FORMATS = ("obj", "fbx", "skp")
+
 
 class MeshExportError(Exception):
     """Custom exception for mesh export errors."""
@@ -60,8 +68,13 @@ class MeshExporter:
     in multiple formats (GLB, OBJ, STL, etc.).
     """
     
-    def __init__(self):
-        """Initialize mesh exporter."""
+    def __init__(self, diagnostics: Optional[str] = None):
+        """
+        Initialize mesh exporter.
+        
+        Args:
+            diagnostics: "off" or "audit" (defaults to MESH_DIAGNOSTICS)
+        """
         if not TRIMESH_AVAILABLE:
             raise DependencyError(
                 "trimesh library not available. Install with: pip install trimesh"
@@ -70,6 +83,7 @@ class MeshExporter:
         self.supported_formats = ["glb", "obj", "stl", "fbx", "skp"]
         self.web_optimized_formats = ["glb"]
         self.placeholder_formats = ["fbx"]  # Only FBX is still a placeholder
+        self.diagnostics = (diagnostics or MESH_DIAGNOSTICS).lower()
         
     def check_skp_export_support(self) -> str:
         """
@@ -234,14 +248,23 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
     def export_building(self, 
                        building: Building3D,
                        formats: List[str],
-                       out_dir: str = "output/generated_models") -> MeshExportResult:
+                       out_dir: str = "output/generated_models",
+                       max_workers: Optional[int] = None,
+                       on_format_exported: Optional[Callable[[str, str, int], None]] = None) -> MeshExportResult:
         """
         Export building model in multiple formats.
         
+        Format writers run concurrently on the shared combined mesh (see
+        _run_format_writers); the result is the same as a serial export.
+        
         Args:
             building: Building3D object with rooms and walls
             formats: List of export formats (glb, obj, stl, etc.)
             out_dir: Output directory for exported files
+            max_workers: Concurrent format writers (defaults to MESH_EXPORT_WORKERS,
+                1 exports serially)
+            on_format_exported: Called with (format, file_path, size_bytes) as each
+                format finishes, before the slower formats are done
             
         Returns:
             MeshExportResult with file paths and metadata
@@ -269,65 +292,34 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             timestamp = int(time.time())
             filename_base = f"building_{timestamp}"
             
-            # Export in each requested format
-            exported_files = {}
-            file_sizes = {}
+            # Combine once per job; every format writer reuses these meshes
+            combined_mesh = self._combine_building_meshes(building)
+            mesh_audit = None
+            if self.diagnostics == "audit":
+                mesh_audit = self.audit_mesh(building, combined_mesh)
+            web_mesh = None
+            if any(format_name.lower() == "glb" for format_name in formats):
+                web_mesh = self._prepare_web_mesh(combined_mesh)
             
+            # Write each requested format; results are collected in request order
+            requested_formats = []
             for format_name in formats:
-                try:
-                    format_name = format_name.lower()
-                    if format_name not in self.supported_formats:
-                        logger.warning(f"Unsupported format '{format_name}', skipping")
-                        continue
-                    
-                    # Generate output file path
-                    out_path = output_path / f"{filename_base}.{format_name}"
-                    
-                    # Export based on format
-                    if format_name == "glb":
-                        file_path = self.export_glb(building, str(out_path), web_optimized=True)
-                    elif format_name == "obj":
-                        file_path = self.export_obj(building, str(out_path))
-                    elif format_name == "stl":
-                        file_path = self.export_stl(building, str(out_path))
-                    elif format_name == "fbx":
-                        file_path = self.export_fbx(building, str(out_path))
-                    elif format_name == "skp":
-                        file_path = self.export_skp(building, str(out_path))
-                    else:
-                        logger.warning(f"Format '{format_name}' not implemented, skipping")
-                        continue
-                    
-                    # Get file size and store results
-                    file_size = os.path.getsize(file_path)
-                    
-                    # Handle placeholder formats (FBX exports as OBJ)
-                    if format_name in self.placeholder_formats:
-                        logger.info(f"📝 Note: {format_name.upper()} exported as OBJ (placeholder implementation)")
-                        # Store as OBJ format in results
-                        exported_files["obj"] = file_path
-                        file_sizes["obj"] = file_size
-                    # Handle SKP format (may return .skp, .dae, or .obj)
-                    elif format_name == "skp":
-                        # Determine actual format from file extension
-                        actual_format = os.path.splitext(file_path)[1][1:].lower()
-                        if actual_format in ["skp", "dae", "obj"]:
-                            exported_files[actual_format] = file_path
-                            file_sizes[actual_format] = file_size
-                            logger.info(f"📝 Note: SKP exported as {actual_format.upper()}")
-                        else:
-                            # Fallback to storing as requested format
-                            exported_files[format_name] = file_path
-                            file_sizes[format_name] = file_size
-                    else:
-                        exported_files[format_name] = file_path
-                        file_sizes[format_name] = file_size
-                    
-                    logger.info(f"✅ Exported {format_name.upper()}: {file_path} ({file_size} bytes)")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Failed to export {format_name}: {str(e)}")
-                    raise MeshExportError(f"Export failed for format '{format_name}': {str(e)}")
+                format_name = format_name.lower()
+                if format_name not in self.supported_formats:
+                    logger.warning(f"Unsupported format '{format_name}', skipping")
+                    continue
+                requested_formats.append(format_name)
+            
+            outputs = self._run_format_writers(
+                building, requested_formats, output_path, filename_base,
+                combined_mesh, web_mesh, max_workers, on_format_exported
+            )
+            
+            exported_files = {}
+            file_sizes = {}
+            for result_format, file_path, file_size in outputs:
+                exported_files[result_format] = file_path
+                file_sizes[result_format] = file_size
             
             # Generate web preview data
             preview_data = self._generate_web_preview_data(building, exported_files, filename_base)
@@ -352,7 +344,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             result = MeshExportResult(
                 files=exported_files,
                 preview_data=preview_data,
-                summary=summary
+                summary=summary,
+                mesh_audit=mesh_audit
             )
             
             logger.info(f"✅ Building export completed: {len(exported_files)} formats in {export_time:.3f}s")
@@ -364,7 +357,175 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             logger.error(f"❌ Building export failed after {export_time:.3f}s: {str(e)}")
             raise MeshExportError(f"Building export failed: {str(e)}")
     
-    def export_glb(self, building: Building3D, out_path: str, web_optimized: bool = True) -> str:
+    def _run_format_writers(self,
+                            building: Building3D,
+                            formats: List[str],
+                            output_path: Path,
+                            filename_base: str,
+                            combined_mesh: trimesh.Trimesh,
+                            web_mesh: Optional[trimesh.Trimesh],
+                            max_workers: Optional[int] = None,
+                            on_format_exported: Optional[Callable[[str, str, int], None]] = None
+                            ) -> List[Tuple[str, str, int]]:
+        """
+        Run the format writers, concurrently when more than one worker is allowed.
+        
+        Formats are grouped into lanes: OBJ-writing formats share one lane so
+        they keep their serial overwrite order, every other format gets its own.
+        Lanes run in a bounded thread pool and each lane writes from its own
+        trimesh view of the shared arrays, so no mesh cache is shared between
+        threads. Total time stays bound by the slowest lane (the SKP writer
+        repairs normals in Python), but finished formats are reported at once.
+        
+        Args:
+            building: Building3D object
+            formats: Lower-cased, supported export formats
+            output_path: Output directory
+            filename_base: File name without extension
+            combined_mesh: Combined Z-up building mesh
+            web_mesh: Web-prepared mesh for GLB (None if GLB not requested)
+            max_workers: Worker bound (defaults to MESH_EXPORT_WORKERS)
+            on_format_exported: Called in the calling thread as each format finishes
+            
+        Returns:
+            (result format, file path, size in bytes) per requested format, in request order
+        """
+        lanes = []
+        obj_lane = None
+        for index, format_name in enumerate(formats):
+            if format_name in OBJ_WRITING_FORMATS:
+                if obj_lane is None:
+                    obj_lane = []
+                    lanes.append(obj_lane)
+                obj_lane.append(index)
+            else:
+                lanes.append([index])
+        
+        outputs = [None] * len(formats)
+        
+        def report(lane_outputs):
+            for index, output in lane_outputs:
+                outputs[index] = output
+                if on_format_exported is not None:
+                    on_format_exported(*output)
+        
+        workers = min(max_workers or MESH_EXPORT_WORKERS, len(lanes))
+        if workers <= 1:
+            for lane in lanes:
+                report(self._write_format_lane(building, formats, lane, output_path, filename_base,
+                                               combined_mesh, web_mesh))
+            return outputs
+        
+        logger.info(f"Writing {len(formats)} formats in {len(lanes)} lanes with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mesh-export") as executor:
+            futures = [
+                executor.submit(self._write_format_lane, building, formats, lane, output_path, filename_base,
+                                self._mesh_view(combined_mesh), self._mesh_view(web_mesh))
+                for lane in lanes
+            ]
+            for future in as_completed(futures):
+                report(future.result())
+        
+        return outputs
+    
+    def _write_format_lane(self,
+                           building: Building3D,
+                           formats: List[str],
+                           lane: List[int],
+                           output_path: Path,
+                           filename_base: str,
+                           combined_mesh: trimesh.Trimesh,
+                           web_mesh: Optional[trimesh.Trimesh]) -> List[Tuple[int, Tuple[str, str, int]]]:
+        """
+        Write one lane of formats in request order.
+        
+        Returns:
+            (format index, export output) per format of the lane
+        """
+        lane_outputs = []
+        for index in lane:
+            format_name = formats[index]
+            out_path = output_path / f"{filename_base}.{format_name}"
+            lane_outputs.append(
+                (index, self._export_format(building, format_name, str(out_path), combined_mesh, web_mesh))
+            )
+        return lane_outputs
+    
+    def _mesh_view(self, mesh: Optional[trimesh.Trimesh]) -> Optional[trimesh.Trimesh]:
+        """
+        New trimesh over the same vertex/face arrays, with its own caches.
+        
+        Args:
+            mesh: Mesh to view (None passes through)
+            
+        Returns:
+            Unprocessed trimesh sharing mesh's arrays
+        """
+        if mesh is None:
+            return None
+        return trimesh.Trimesh(vertices=mesh.vertices, faces=mesh.faces, process=False)
+    
+    def _export_format(self,
+                       building: Building3D,
+                       format_name: str,
+                       out_path: str,
+                       combined_mesh: trimesh.Trimesh,
+                       web_mesh: Optional[trimesh.Trimesh]) -> Tuple[str, str, int]:
+        """
+        Write one format from the shared meshes.
+        
+        Args:
+            building: Building3D object
+            format_name: Lower-cased export format
+            out_path: Requested output file path
+            combined_mesh: Combined Z-up building mesh
+            web_mesh: Web-prepared mesh for GLB
+            
+        Returns:
+            Tuple of (format the file is stored under, file path, size in bytes)
+            
+        Raises:
+            MeshExportError: If the writer fails
+        """
+        try:
+            # Export based on format
+            if format_name == "glb":
+                file_path = self.export_glb(building, out_path, web_optimized=True, web_mesh=web_mesh)
+            elif format_name == "obj":
+                file_path = self.export_obj(building, out_path, combined_mesh=combined_mesh)
+            elif format_name == "stl":
+                file_path = self.export_stl(building, out_path, combined_mesh=combined_mesh)
+            elif format_name == "fbx":
+                file_path = self.export_fbx(building, out_path, combined_mesh=combined_mesh)
+            else:
+                file_path = self.export_skp(building, out_path, combined_mesh=combined_mesh)
+            
+            file_size = os.path.getsize(file_path)
+            result_format = format_name
+            
+            # Handle placeholder formats (FBX exports as OBJ)
+            if format_name in self.placeholder_formats:
+                logger.info(f"📝 Note: {format_name.upper()} exported as OBJ (placeholder implementation)")
+                result_format = "obj"
+            # Handle SKP format (may return .skp, .dae, or .obj)
+            elif format_name == "skp":
+                actual_format = os.path.splitext(file_path)[1][1:].lower()
+                if actual_format in ["skp", "dae", "obj"]:
+                    result_format = actual_format
+                    logger.info(f"📝 Note: SKP exported as {actual_format.upper()}")
+            
+            logger.info(f"✅ Exported {format_name.upper()}: {file_path} ({file_size} bytes)")
+            return result_format, file_path, file_size
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to export {format_name}: {str(e)}")
+            raise MeshExportError(f"Export failed for format '{format_name}': {str(e)}")
+    
+    def export_glb(self,
+                   building: Building3D,
+                   out_path: str,
+                   web_optimized: bool = True,
+                   web_mesh: Optional[trimesh.Trimesh] = None) -> str:
         """
         Export building as GLB format (web-optimized).
         
@@ -372,6 +533,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             building: Building3D object
             out_path: Output file path
             web_optimized: Optimize for web viewing
+            web_mesh: Mesh already prepared for the web by _prepare_web_mesh
+                (combined from the building if omitted)
             
         Returns:
             Path to exported GLB file
@@ -379,16 +542,13 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         logger.info(f"Exporting GLB: {out_path} (web_optimized={web_optimized})")
         
         try:
-            # Combine all meshes
-            combined_mesh = self._combine_building_meshes(building)
-            
-            # Convert to Y-up for web compatibility if needed
-            if USE_Y_UP_FOR_WEB and web_optimized:
-                combined_mesh = self._convert_to_y_up(combined_mesh)
-            
-            # Optimize for web if requested
-            if web_optimized:
-                combined_mesh = self._optimize_for_web(combined_mesh)
+            if web_mesh is not None:
+                combined_mesh = web_mesh
+            else:
+                # Combine all meshes; the fresh mesh can be converted in place
+                combined_mesh = self._combine_building_meshes(building)
+                if web_optimized:
+                    combined_mesh = self._prepare_web_mesh(combined_mesh, copy=False)
             
             # Export as GLB
             combined_mesh.export(out_path, file_type="glb")
@@ -400,13 +560,17 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             logger.error(f"❌ GLB export failed: {str(e)}")
             raise MeshExportError(f"GLB export failed: {str(e)}")
     
-    def export_obj(self, building: Building3D, out_path: str) -> str:
+    def export_obj(self,
+                   building: Building3D,
+                   out_path: str,
+                   combined_mesh: Optional[trimesh.Trimesh] = None) -> str:
         """
         Export building as OBJ format.
         
         Args:
             building: Building3D object
             out_path: Output file path
+            combined_mesh: Pre-combined building mesh (combined if omitted)
             
         Returns:
             Path to exported OBJ file
@@ -415,7 +579,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         
         try:
             # Combine all meshes
-            combined_mesh = self._combine_building_meshes(building)
+            if combined_mesh is None:
+                combined_mesh = self._combine_building_meshes(building)
             
             # Export as OBJ
             combined_mesh.export(out_path, file_type="obj")
@@ -427,13 +592,17 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             logger.error(f"❌ OBJ export failed: {str(e)}")
             raise MeshExportError(f"OBJ export failed: {str(e)}")
     
-    def export_stl(self, building: Building3D, out_path: str) -> str:
+    def export_stl(self,
+                   building: Building3D,
+                   out_path: str,
+                   combined_mesh: Optional[trimesh.Trimesh] = None) -> str:
         """
         Export building as STL format.
         
         Args:
             building: Building3D object
             out_path: Output file path
+            combined_mesh: Pre-combined building mesh (combined if omitted)
             
         Returns:
             Path to exported STL file
@@ -442,7 +611,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         
         try:
             # Combine all meshes
-            combined_mesh = self._combine_building_meshes(building)
+            if combined_mesh is None:
+                combined_mesh = self._combine_building_meshes(building)
             
             # Export as STL
             combined_mesh.export(out_path, file_type="stl")
@@ -454,13 +624,17 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             logger.error(f"❌ STL export failed: {str(e)}")
             raise MeshExportError(f"STL export failed: {str(e)}")
     
-    def export_fbx(self, building: Building3D, out_path: str) -> str:
+    def export_fbx(self,
+                   building: Building3D,
+                   out_path: str,
+                   combined_mesh: Optional[trimesh.Trimesh] = None) -> str:
         """
         Export building as FBX format (placeholder - exports OBJ for now).
         
         Args:
             building: Building3D object
             out_path: Output file path
+            combined_mesh: Pre-combined building mesh (combined if omitted)
             
         Returns:
             Path to exported OBJ file (converted from FBX request)
@@ -471,7 +645,7 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         try:
             # Export as OBJ instead (placeholder implementation)
             obj_path = out_path.replace('.fbx', '.obj')
-            result = self.export_obj(building, obj_path)
+            result = self.export_obj(building, obj_path, combined_mesh=combined_mesh)
             
             logger.info(f"✅ FBX placeholder: exported OBJ instead: {result}")
             return result
@@ -480,13 +654,17 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             logger.error(f"❌ FBX placeholder export failed: {str(e)}")
             raise MeshExportError(f"FBX placeholder export failed: {str(e)}")
     
-    def export_skp(self, building: Building3D, out_path: str) -> str:
+    def export_skp(self,
+                   building: Building3D,
+                   out_path: str,
+                   combined_mesh: Optional[trimesh.Trimesh] = None) -> str:
         """
         Export building as SKP format using hybrid approach.
         
         Args:
             building: Building3D object
             out_path: Output file path
+            combined_mesh: Pre-combined building mesh (combined if omitted)
             
         Returns:
             Path to exported file (.skp, .dae, or .obj)
@@ -498,7 +676,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
             export_method = self.check_skp_export_support()
             
             # Combine building meshes
-            combined_mesh = self._combine_building_meshes(building)
+            if combined_mesh is None:
+                combined_mesh = self._combine_building_meshes(building)
             
             if export_method == 'trimesh':
                 # Try direct SKP export
@@ -599,68 +778,116 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         Returns:
             Combined trimesh object
         """
-        logger.info("Combining building meshes...")
-        logger.info(f"Building has {len(building.rooms)} rooms and {len(building.walls)} walls")
+        logger.info(f"Combining building meshes: {len(building.rooms)} rooms and {len(building.walls)} walls")
         
-        all_meshes = []
-        
-        # Convert room meshes with detailed logging
-        for i, room in enumerate(building.rooms):
-            room_mesh = self._room_to_trimesh(room)
-            all_meshes.append(room_mesh)
-            
-            # Detailed room logging
-            logger.info(f"Room {i+1} '{room.name}':")
-            logger.info(f"  - Vertices: {len(room_mesh.vertices)}")
-            logger.info(f"  - Faces: {len(room_mesh.faces)}")
-            logger.info(f"  - Bounds: {room_mesh.bounds}")
-            logger.info(f"  - Volume: {room_mesh.volume:.2f}")
-            logger.info(f"  - Dimensions: {room_mesh.bounds[1] - room_mesh.bounds[0]}")
-        
-        # Convert wall meshes with detailed logging
-        for i, wall in enumerate(building.walls):
-            wall_mesh = self._wall_to_trimesh(wall)
-            all_meshes.append(wall_mesh)
-            
-            # Detailed wall logging
-            logger.info(f"Wall {i+1} '{wall.id}':")
-            logger.info(f"  - Vertices: {len(wall_mesh.vertices)}")
-            logger.info(f"  - Faces: {len(wall_mesh.faces)}")
-            logger.info(f"  - Bounds: {wall_mesh.bounds}")
-            logger.info(f"  - Volume: {wall_mesh.volume:.2f}")
-        
-        # Check if we have overlapping or very large rooms
-        if len(building.rooms) > 0:
-            room_volumes = [mesh.volume for mesh in all_meshes[:len(building.rooms)]]
-            total_volume = sum(room_volumes)
-            avg_volume = total_volume / len(room_volumes)
-            logger.info(f"Room volume analysis:")
-            logger.info(f"  - Total room volume: {total_volume:.2f}")
-            logger.info(f"  - Average room volume: {avg_volume:.2f}")
-            logger.info(f"  - Room volumes: {[f'{v:.2f}' for v in room_volumes]}")
-            
-            # Check for suspiciously large rooms
-            for i, volume in enumerate(room_volumes):
-                if volume > avg_volume * 3:  # Room is 3x larger than average
-                    logger.warning(f"Room {i+1} '{building.rooms[i].name}' has suspiciously large volume: {volume:.2f}")
-        
-        # Combine all meshes
-        if len(all_meshes) == 1:
-            combined_mesh = all_meshes[0]
-        else:
-            logger.info("Combining meshes using trimesh.util.concatenate...")
-            combined_mesh = trimesh.util.concatenate(all_meshes)
-        
-        logger.info(f"✅ Combined {len(all_meshes)} meshes into single mesh:")
-        logger.info(f"  - Total vertices: {len(combined_mesh.vertices)}")
-        logger.info(f"  - Total faces: {len(combined_mesh.faces)}")
-        logger.info(f"  - Combined bounds: {combined_mesh.bounds}")
-        logger.info(f"  - Combined volume: {combined_mesh.volume:.2f}")
-        logger.info(f"  - Is watertight: {combined_mesh.is_watertight}")
-        logger.info(f"  - Is winding consistent: {combined_mesh.is_winding_consistent}")
+        # Combine all meshes; volume and topology checks are left to audit_mesh
+        all_meshes = [room.mesh for room in building.rooms] + [wall.mesh for wall in building.walls]
+        combined_mesh = self._concatenate_meshes(all_meshes)
+        
+        logger.info(f"✅ Combined {len(all_meshes)} meshes into single mesh: "
+                    f"{len(combined_mesh.vertices)} vertices, {len(combined_mesh.faces)} faces")
         
         return combined_mesh
     
+    def audit_mesh(self, building: Building3D, combined_mesh: trimesh.Trimesh) -> MeshAudit:
+        """
+        Check the combined mesh once and return the results as data.
+        
+        Volume, watertightness and winding build trimesh's edge and
+        mass caches, so they are only computed here, on the combined
+        mesh, and only when asked for. Room volumes come from the
+        room arrays.
+        
+        Args:
+            building: Building3D the mesh was combined from
+            combined_mesh: Result of _combine_building_meshes
+            
+        Returns:
+            MeshAudit for the combined mesh
+        """
+        room_volumes = [float(room.mesh.volume) for room in building.rooms]
+        oversized_rooms = []
+        if room_volumes:
+            avg_volume = sum(room_volumes) / len(room_volumes)
+            oversized_rooms = [
+                room.name for room, volume in zip(building.rooms, room_volumes)
+                if volume > avg_volume * 3
+            ]
+        
+        bounds = {}
+        if len(combined_mesh.vertices):
+            mins, maxs = combined_mesh.bounds
+            bounds = {
+                "min_x": float(mins[0]), "max_x": float(maxs[0]),
+                "min_y": float(mins[1]), "max_y": float(maxs[1]),
+                "min_z": float(mins[2]), "max_z": float(maxs[2])
+            }
+        
+        audit = MeshAudit(
+            vertex_count=len(combined_mesh.vertices),
+            face_count=len(combined_mesh.faces),
+            bounds=bounds,
+            volume=float(combined_mesh.volume),
+            is_watertight=bool(combined_mesh.is_watertight),
+            is_winding_consistent=bool(combined_mesh.is_winding_consistent),
+            room_volumes=room_volumes,
+            oversized_rooms=oversized_rooms
+        )
+        
+        logger.info(f"🔍 Mesh audit: volume {audit.volume:.2f}, watertight={audit.is_watertight}, "
+                    f"winding consistent={audit.is_winding_consistent}, "
+                    f"{len(oversized_rooms)} oversized rooms")
+        return audit
+    
+    def _concatenate_meshes(self, meshes: List[TriangleMesh]) -> trimesh.Trimesh:
+        """
+        Join meshes into one trimesh in a single pass.
+        
+        Vertices go straight into one float64 buffer and faces into one
+        int64 buffer, which trimesh wraps without copying. Within each
+        input mesh, duplicate vertices are merged and unreferenced ones
+        dropped, as trimesh's default processing does per mesh; vertices
+        of different meshes are never merged.
+        
+        Args:
+            meshes: Room and wall meshes
+            
+        Returns:
+            Combined trimesh object
+        """
+        vertices, faces = concatenate_mesh_arrays(meshes)
+        if len(vertices) == 0:
+            return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        
+        vertex_counts = [mesh.vertex_count for mesh in meshes]
+        mesh_ids = np.repeat(np.arange(len(meshes)), vertex_counts)
+        
+        # Meshes without faces keep all their vertices
+        referenced = np.zeros(len(vertices), dtype=bool)
+        referenced[faces] = True
+        faceless = np.array([mesh.face_count == 0 for mesh in meshes])
+        if faceless.any():
+            referenced |= faceless[mesh_ids]
+        
+        # Same rounding as trimesh.Trimesh.merge_vertices, keyed per mesh
+        digits = trimesh.util.decimal_to_digits(trimesh.tol.merge)
+        keys = np.column_stack([mesh_ids, (vertices * 10 ** digits).round()]).astype(np.int64)
+        referenced_ids = np.nonzero(referenced)[0]
+        _, first, inverse = np.unique(keys[referenced_ids], axis=0, return_index=True, return_inverse=True)
+        
+        # Keep the first occurrence of each vertex, in original order
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        remap = np.zeros(len(vertices), dtype=np.int64)
+        remap[referenced_ids] = rank[inverse.reshape(-1)]
+        
+        return trimesh.Trimesh(
+            vertices=vertices[referenced_ids[first[order]]],
+            faces=remap[faces],
+            process=False
+        )
+    
     def _room_to_trimesh(self, room: Room3D) -> trimesh.Trimesh:
         """
         Convert Room3D to trimesh.
@@ -671,20 +898,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         Returns:
             Trimesh object
         """
-        # Extract vertices and faces
-        vertices = np.array([[v.x, v.y, v.z] for v in room.vertices])
-        faces = np.array([f.indices for f in room.faces])
-        
-        # Create trimesh
-        mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-        
-        # Debug logging
-        logger.debug(f"Room '{room.name}' mesh: {len(vertices)} vertices, {len(faces)} faces")
-        logger.debug(f"Mesh bounds: {mesh.bounds}")
-        logger.debug(f"Mesh volume: {mesh.volume}")
-        logger.debug(f"Mesh is watertight: {mesh.is_watertight}")
-        logger.debug(f"Mesh is winding consistent: {mesh.is_winding_consistent}")
-        
+        mesh = room.mesh.to_trimesh(process=True)
+        logger.debug("Room '%s' mesh: %d vertices, %d faces", room.name, len(mesh.vertices), len(mesh.faces))
         return mesh
     
     def _wall_to_trimesh(self, wall: Wall3D) -> trimesh.Trimesh:
@@ -697,20 +912,8 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         Returns:
             Trimesh object
         """
-        # Extract vertices and faces
-        vertices = np.array([[v.x, v.y, v.z] for v in wall.vertices])
-        faces = np.array([f.indices for f in wall.faces])
-        
-        # Create trimesh
-        mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-        
-        # Debug logging
-        logger.debug(f"Wall '{wall.id}' mesh: {len(vertices)} vertices, {len(faces)} faces")
-        logger.debug(f"Mesh bounds: {mesh.bounds}")
-        logger.debug(f"Mesh volume: {mesh.volume}")
-        logger.debug(f"Mesh is watertight: {mesh.is_watertight}")
-        logger.debug(f"Mesh is winding consistent: {mesh.is_winding_consistent}")
-        
+        mesh = wall.mesh.to_trimesh(process=True)
+        logger.debug("Wall '%s' mesh: %d vertices, %d faces", wall.id, len(mesh.vertices), len(mesh.faces))
         return mesh
     
     def _convert_to_y_up(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
@@ -737,6 +940,22 @@ Generated by PlanCast - AI Floor Plan to 3D Converter
         logger.debug("Converted mesh to Y-up coordinate system")
         return mesh
     
+    def _prepare_web_mesh(self, combined_mesh: trimesh.Trimesh, copy: bool = True) -> trimesh.Trimesh:
+        """
+        Build the web (GLB) variant of the combined mesh.
+        
+        Args:
+            combined_mesh: Combined Z-up building mesh
+            copy: Leave combined_mesh untouched for the other format writers
+            
+        Returns:
+            Y-up (if USE_Y_UP_FOR_WEB), web-optimized trimesh
+        """
+        mesh = combined_mesh
+        if USE_Y_UP_FOR_WEB:
+            mesh = self._convert_to_y_up(mesh.copy() if copy else mesh)
+        return self._optimize_for_web(mesh)
+    
     def _optimize_for_web(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
         """
         Optimize mesh for web viewing.
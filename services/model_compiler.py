@@ -0,0 +1,241 @@
+"""
+Model Compiler for PlanCast.
+
+Traces the CubiCasa5K model to TorchScript, freezes it (which folds the
+BatchNorm layers that directly follow a convolution into that convolution)
+and caches the frozen graph on disk next to the checkpoint, so later
+startups load the compiled artifact instead of tracing again.
+
+Freezing turns the folded weights into graph constants that torch.jit.load
+reads into private memory in every process. They are therefore also written
+to a flat weights file next to the artifact, and the loaded constants are
+rebound to that file's mapped pages so that processes share one copy.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import torch
+
+from services.weight_cache import load_weights, save_weights
+from utils.logger import get_logger
+
+logger = get_logger("model_compiler")
+
+COMPILED_SUFFIX = ".torchscript.pt"
+CONSTANTS_SUFFIX = ".torchscript.safetensors"
+CACHE_KEY_FILE = "cache_key"
+
+
+class ModelCompilationError(Exception):
+    """Exception for model compilation and compiled-cache errors."""
+    pass
+
+
+def compiled_model_path(checkpoint_path: Path) -> Path:
+    """
+    Location of the compiled artifact for a checkpoint.
+
+    Args:
+        checkpoint_path: Path to the eager model checkpoint
+
+    Returns:
+        Path next to the checkpoint, e.g. model_best_val_loss_var.torchscript.pt
+    """
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(checkpoint_path.stem + COMPILED_SUFFIX)
+
+
+def compiled_constants_path(checkpoint_path: Path) -> Path:
+    """
+    Location of the mapped constants file for a checkpoint's compiled artifact.
+
+    Args:
+        checkpoint_path: Path to the eager model checkpoint
+
+    Returns:
+        Path next to the checkpoint, e.g. model_best_val_loss_var.torchscript.safetensors
+    """
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(checkpoint_path.stem + CONSTANTS_SUFFIX)
+
+
+def compile_cache_key(checkpoint_path: Path, input_shape: Tuple[int, ...]) -> str:
+    """
+    Key identifying the checkpoint, torch version and traced input shape.
+
+    A cached artifact is only reused when its key matches, so replacing the
+    checkpoint or upgrading torch triggers a fresh compile.
+
+    Args:
+        checkpoint_path: Path to the eager model checkpoint
+        input_shape: Example input shape used for tracing
+
+    Returns:
+        Cache key string
+    """
+    stat = Path(checkpoint_path).stat()
+    shape = "x".join(str(dim) for dim in input_shape)
+    return f"{stat.st_size}:{stat.st_mtime_ns}:torch-{torch.__version__}:{shape}"
+
+
+def compile_model(model: torch.nn.Module, input_shape: Tuple[int, ...]) -> torch.jit.ScriptModule:
+    """
+    Trace and freeze an eval-mode model.
+
+    The model is traced rather than scripted because hg_furukawa_original
+    only defines some submodules conditionally. Tracing fixes the
+    shape-dependent branch in _upsample_add, so the result is only valid
+    for inputs with the traced spatial size; the batch dimension is free.
+
+    Args:
+        model: Model in eval mode
+        input_shape: Example (N, C, H, W) input shape
+
+    Returns:
+        Frozen TorchScript module with Conv+BatchNorm pairs folded
+    """
+    example = torch.rand(*input_shape)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example, check_trace=False)
+        frozen = torch.jit.freeze(traced.eval())
+
+    remaining = sum(1 for node in frozen.graph.nodes() if node.kind() == "aten::batch_norm")
+    logger.debug(f"Frozen graph keeps {remaining} pre-activation BatchNorm layers")
+    return frozen
+
+
+def load_or_compile_model(model: torch.nn.Module,
+                          checkpoint_path: Path,
+                          input_shape: Tuple[int, ...]) -> Tuple[torch.jit.ScriptModule, str]:
+    """
+    Load the cached compiled model, compiling and caching it if needed.
+
+    Args:
+        model: Eager model in eval mode with checkpoint weights loaded
+        checkpoint_path: Path to the checkpoint the weights came from
+        input_shape: Example (N, C, H, W) input shape
+
+    Returns:
+        Tuple of (compiled_module, source) where source is "cache" or "compiled"
+
+    Raises:
+        ModelCompilationError: If compilation fails
+    """
+    cache_path = compiled_model_path(checkpoint_path)
+    cache_key = compile_cache_key(checkpoint_path, input_shape)
+
+    if cache_path.exists():
+        try:
+            extra_files = {CACHE_KEY_FILE: ""}
+            compiled = torch.jit.load(str(cache_path), map_location="cpu", _extra_files=extra_files)
+            cached_key = extra_files[CACHE_KEY_FILE]
+            if isinstance(cached_key, bytes):
+                cached_key = cached_key.decode()
+            if cached_key == cache_key:
+                logger.info(f"✅ Loaded compiled model from cache: {cache_path}")
+                share_constants(compiled, compiled_constants_path(checkpoint_path), cache_key)
+                return compiled, "cache"
+            logger.info("Compiled model cache is stale, recompiling")
+        except Exception as e:
+            logger.warning(f"Could not load compiled model cache {cache_path}: {str(e)}")
+
+    start_time = time.time()
+    try:
+        compiled = compile_model(model, input_shape)
+    except Exception as e:
+        raise ModelCompilationError(f"Model compilation failed: {str(e)}")
+    logger.info(f"✅ Model compiled in {time.time() - start_time:.2f}s")
+
+    # Written next to the cache and renamed into place, so a crash or a
+    # concurrent compile never leaves a truncated artifact behind
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        torch.jit.save(compiled, str(temp_path), _extra_files={CACHE_KEY_FILE: cache_key})
+        os.replace(temp_path, cache_path)
+        logger.info(f"Compiled model cached at {cache_path}")
+    except Exception as e:
+        # A read-only models dir only costs a recompile on the next startup
+        logger.warning(f"Could not cache compiled model at {cache_path}: {str(e)}")
+        return compiled, "compiled"
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+    # torch.jit.load orders the constants differently from the module it was
+    # saved from, so the constants file is written from the reloaded artifact
+    try:
+        reloaded = torch.jit.load(str(cache_path), map_location="cpu")
+    except Exception as e:
+        logger.warning(f"Could not reload compiled model from {cache_path}: {str(e)}")
+        return compiled, "compiled"
+    share_constants(reloaded, compiled_constants_path(checkpoint_path), cache_key, rewrite=True)
+    return reloaded, "compiled"
+
+
+def _tensor_constants(module: torch.jit.ScriptModule) -> List[torch.Tensor]:
+    return [node.output().toIValue() for node in module.graph.nodes()
+            if node.kind() == "prim::Constant" and node.output().type().kind() == "TensorType"]
+
+
+def share_constants(module: torch.jit.ScriptModule,
+                    constants_path: Path,
+                    cache_key: str,
+                    rewrite: bool = False) -> bool:
+    """
+    Rebind the tensor constants of a loaded frozen module to a mapped file.
+
+    The file is (re)written from the module when it is missing, belongs to
+    another cache key or does not match the module's constants. Failures
+    are logged and leave the module with its private constants.
+
+    Args:
+        module: Frozen module loaded with torch.jit.load
+        constants_path: Path to the constants weights file
+        cache_key: Compile cache key of the artifact the module came from
+        rewrite: Write the file even if it looks current (after a recompile)
+
+    Returns:
+        True if the constants now live on the mapped pages
+    """
+    constants = _tensor_constants(module)
+    if not constants:
+        return False
+
+    mapped = None
+    if constants_path.exists() and not rewrite:
+        try:
+            mapped, metadata = load_weights(constants_path)
+            if metadata.get("compiled") != cache_key or not _constants_match(constants, mapped):
+                mapped = None
+        except Exception as e:
+            logger.warning(f"Could not map compiled model constants {constants_path}: {str(e)}")
+
+    try:
+        if mapped is None:
+            save_weights({f"c{i}": tensor for i, tensor in enumerate(constants)},
+                         constants_path, {"compiled": cache_key})
+            mapped, _ = load_weights(constants_path)
+            if not _constants_match(constants, mapped):
+                raise ValueError("constants file does not match the compiled model")
+    except Exception as e:
+        logger.warning(f"Could not share compiled model constants via {constants_path}: {str(e)}")
+        return False
+
+    with torch.no_grad():
+        for i, tensor in enumerate(constants):
+            tensor.set_(mapped[f"c{i}"])
+    logger.info(f"Compiled model constants mapped from {constants_path}")
+    return True
+
+
+def _constants_match(constants: List[torch.Tensor], mapped: Dict[str, torch.Tensor]) -> bool:
+    if len(mapped) != len(constants):
+        return False
+    for i, tensor in enumerate(constants):
+        other = mapped.get(f"c{i}")
+        if other is None or other.shape != tensor.shape or other.dtype != tensor.dtype:
+            return False
+    return True
@@ -0,0 +1,198 @@
+"""
+Model Quantizer for PlanCast.
+
+Static post-training int8 quantization of the CubiCasa5K model for CPU
+deployments. Convolutions, BatchNorm/ReLU and residual adds run in int8;
+the output head (final upsample and heatmap sigmoid) stays in fp32 so the
+room and icon logits keep their full range. Observers are calibrated on a
+small bundled image set.
+"""
+
+import copy
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import torch
+
+from models.data_structures import CubiCasaOutput
+from utils.logger import get_logger
+
+logger = get_logger("model_quantizer")
+
+CALIBRATION_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+class ModelQuantizationError(Exception):
+    """Exception for model quantization errors."""
+    pass
+
+
+def select_quantized_engine() -> str:
+    """
+    Pick the int8 kernel backend for this CPU.
+
+    Returns:
+        Name of the engine now set in torch.backends.quantized.engine
+    """
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    raise ModelQuantizationError(f"No int8 engine available (supported: {supported})")
+
+
+def load_calibration_images(calibration_dir: Path) -> List[Tuple[str, bytes]]:
+    """
+    Read the bundled calibration images.
+
+    Args:
+        calibration_dir: Directory containing calibration floor plans
+
+    Returns:
+        List of (file_name, image_bytes), sorted by file name
+
+    Raises:
+        ModelQuantizationError: If the directory holds no images
+    """
+    calibration_dir = Path(calibration_dir)
+    paths = sorted(
+        path for path in calibration_dir.glob("*")
+        if path.suffix.lower() in CALIBRATION_EXTENSIONS
+    ) if calibration_dir.is_dir() else []
+
+    if not paths:
+        raise ModelQuantizationError(f"No calibration images found in {calibration_dir}")
+    return [(path.name, path.read_bytes()) for path in paths]
+
+
+def quantize_model(model: torch.nn.Module,
+                   calibration_tensors: List[torch.Tensor]) -> torch.nn.Module:
+    """
+    Quantize a copy of the model to int8 with FX graph mode static PTQ.
+
+    Args:
+        model: fp32 model in eval mode (left untouched)
+        calibration_tensors: Preprocessed (1, 3, H, W) calibration inputs
+
+    Returns:
+        Quantized model
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    if not calibration_tensors:
+        raise ModelQuantizationError("Calibration set is empty")
+
+    engine = select_quantized_engine()
+
+    # The heatmap sigmoid has fixed [0, 1] output qparams, which torch.cat
+    # would impose on the room/icon logits, so the head stays in fp32
+    qconfig_mapping = (
+        get_default_qconfig_mapping(engine)
+        .set_module_name("upsample", None)
+        .set_module_name("sigmoid", None)
+        .set_object_type(torch.cat, None)
+    )
+
+    start_time = time.time()
+    prepared = prepare_fx(copy.deepcopy(model).eval(), qconfig_mapping,
+                          example_inputs=(calibration_tensors[0],))
+    with torch.no_grad():
+        for tensor in calibration_tensors:
+            prepared(tensor)
+    quantized = convert_fx(prepared)
+
+    logger.info(f"✅ Model quantized to int8 ({engine}) on {len(calibration_tensors)} "
+                f"calibration images in {time.time() - start_time:.2f}s")
+    return quantized
+
+
+def _box_iou(a: Dict[str, int], b: Dict[str, int]) -> float:
+    inter_w = min(a["max_x"], b["max_x"]) - max(a["min_x"], b["min_x"])
+    inter_h = min(a["max_y"], b["max_y"]) - max(a["min_y"], b["min_y"])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    area_a = (a["max_x"] - a["min_x"]) * (a["max_y"] - a["min_y"])
+    area_b = (b["max_x"] - b["min_x"]) * (b["max_y"] - b["min_y"])
+    return inter / float(area_a + area_b - inter)
+
+
+def _room_class(room_name: str) -> str:
+    # Room names are "room_<class>_<index>"; the index depends on polygon order
+    return room_name.rsplit("_", 1)[0]
+
+
+def compare_outputs(reference: CubiCasaOutput,
+                    candidate: CubiCasaOutput,
+                    min_iou: float = 0.5) -> Dict[str, Any]:
+    """
+    Compare the rooms and walls of a quantized result against fp32.
+
+    Every reference room is matched to the best-overlapping candidate room
+    of the same class.
+
+    Args:
+        reference: fp32 result
+        candidate: int8 result
+        min_iou: Box IoU below which a room counts as missing
+
+    Returns:
+        Dictionary with room IoU statistics and wall/opening count deltas
+    """
+    ious = []
+    missing_rooms = 0
+    matched = set()
+    for name, box in reference.room_bounding_boxes.items():
+        best_name, best_iou = None, 0.0
+        for candidate_name, candidate_box in candidate.room_bounding_boxes.items():
+            if candidate_name in matched or _room_class(candidate_name) != _room_class(name):
+                continue
+            iou = _box_iou(box, candidate_box)
+            if iou > best_iou:
+                best_name, best_iou = candidate_name, iou
+        if best_name is None or best_iou < min_iou:
+            missing_rooms += 1
+        else:
+            matched.add(best_name)
+        ious.append(best_iou)
+
+    return {
+        "reference_rooms": len(reference.room_bounding_boxes),
+        "candidate_rooms": len(candidate.room_bounding_boxes),
+        "missing_rooms": missing_rooms,
+        "extra_rooms": len(candidate.room_bounding_boxes) - len(matched),
+        "mean_room_iou": round(sum(ious) / len(ious), 4) if ious else 1.0,
+        "min_room_iou": round(min(ious), 4) if ious else 1.0,
+        "wall_point_delta": len(candidate.wall_coordinates) - len(reference.wall_coordinates),
+        "door_point_delta": len(candidate.door_coordinates) - len(reference.door_coordinates),
+        "window_point_delta": len(candidate.window_coordinates) - len(reference.window_coordinates)
+    }
+
+
+def summarize_comparisons(comparisons: List[Tuple[str, Dict[str, Any]]],
+                          min_mean_iou: float = 0.9) -> Dict[str, Any]:
+    """
+    Aggregate per-image comparisons into an accuracy report.
+
+    Args:
+        comparisons: List of (image_name, compare_outputs result)
+        min_mean_iou: Mean room IoU required for the check to pass
+
+    Returns:
+        Accuracy report with a ``passed`` flag
+    """
+    mean_ious = [result["mean_room_iou"] for _, result in comparisons]
+    mean_iou = sum(mean_ious) / len(mean_ious) if mean_ious else 1.0
+    missing = sum(result["missing_rooms"] for _, result in comparisons)
+
+    return {
+        "images": len(comparisons),
+        "mean_room_iou": round(mean_iou, 4),
+        "missing_rooms": missing,
+        "extra_rooms": sum(result["extra_rooms"] for _, result in comparisons),
+        "passed": mean_iou >= min_mean_iou and missing == 0,
+        "per_image": dict(comparisons)
+    }
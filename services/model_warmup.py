@@ -0,0 +1,227 @@
+"""
+Model Warm-up for PlanCast.
+
+Loads the CubiCasa5K service in a background thread at startup and runs a
+few dummy inferences at every configured input size, so the first upload
+does not pay for the dependency check, model download, model load and
+first-inference kernel setup. With the inference pool enabled, the dummy
+inferences run in the worker processes that serve the jobs instead. The
+warm-up state is reported as readiness, separately from liveness, and
+uploads arriving before the model is ready wait on it in the event loop
+instead of holding a worker thread.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+
+from services.cubicasa_service import get_cubicasa_service
+from services.image_preprocessing import round_to_stride
+from services.inference_pool import get_inference_pool
+from utils.logger import get_logger
+from config.settings import CUBICASA_WARMUP_ON_STARTUP, CUBICASA_WARMUP_RUNS
+
+logger = get_logger("model_warmup")
+
+# Global warm-up instance (singleton pattern)
+_global_model_warmup = None
+
+
+def get_model_warmup() -> 'ModelWarmup':
+    """Get or create the global model warm-up."""
+    global _global_model_warmup
+    if _global_model_warmup is None:
+        _global_model_warmup = ModelWarmup(enabled=CUBICASA_WARMUP_ON_STARTUP, runs=CUBICASA_WARMUP_RUNS)
+    return _global_model_warmup
+
+
+def warmup_sizes(service) -> List[int]:
+    """Network input sizes the service runs at: the input size ladder, or the tile size."""
+    if getattr(service, "tiled_inference", False):
+        return [round_to_stride(service.tile_size)]
+    return sorted({round_to_stride(size) for size in service.input_sizes})
+
+
+def run_warmup(service, runs: int) -> Dict[int, float]:
+    """
+    Run dummy inferences at each input size of the service.
+
+    Args:
+        service: Loaded CubiCasaService
+        runs: Dummy inferences per input size
+
+    Returns:
+        Milliseconds of the last dummy inference per input size
+    """
+    warmup_ms: Dict[int, float] = {}
+    for size in warmup_sizes(service):
+        dummy = torch.ones(1, 3, size, size)
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            service._run_inference(dummy)
+            warmup_ms[size] = (time.perf_counter() - start_time) * 1000
+    return warmup_ms
+
+
+class ModelNotReadyError(Exception):
+    """Exception for jobs that gave up waiting for the model warm-up."""
+    pass
+
+
+class ModelWarmup:
+    """
+    Background model load and warm-up with a readiness state.
+
+    States: "disabled" (warm-up off; the model loads on the first job),
+    "pending", "loading", "warming", "ready" and "failed". Jobs waiting
+    through wait_ready are released once the warm-up ends either way; a
+    failed warm-up leaves the error to the job's own model load.
+
+    The inference pool, when enabled, starts right after the model load;
+    its workers run the dummy inferences themselves, and the warm-up is
+    ready once every worker is.
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 runs: int = 2,
+                 load_service: Callable[[], Any] = get_cubicasa_service,
+                 start_pool: Callable[[], Any] = get_inference_pool):
+        """
+        Initialize the warm-up.
+
+        Args:
+            enabled: Whether start() loads the model at all
+            runs: Dummy inferences per input size
+            load_service: Returns the loaded CubiCasaService
+            start_pool: Starts the inference pool (returns None when disabled); the
+                pool's workers run the warm-up inferences
+        """
+        self.enabled = enabled
+        self.runs = max(0, int(runs))
+        self._load_service = load_service
+        self._start_pool = start_pool
+        self.state = "pending" if enabled else "disabled"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.load_time: Optional[float] = None
+        self.warmup_ms: Dict[int, float] = {}  # input size -> last dummy inference
+        self.waiting = 0
+        self._done: Future = Future()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether uploads can be processed without waiting for the model."""
+        return self.state in ("ready", "disabled")
+
+    def start(self) -> None:
+        """Start the warm-up thread (once; no-op when disabled)."""
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        self.started_at = time.time()
+        try:
+            self.state = "loading"
+            logger.info("🤖 Loading CubiCasa5K model in the background...")
+            service = self._load_service()
+            self.load_time = time.time() - self.started_at
+
+            self.state = "warming"
+            pool = self._start_pool()
+            if pool is not None:
+                pool.wait_ready()
+                self.warmup_ms = dict(pool.warmup_ms)
+            else:
+                self.warmup_ms = run_warmup(service, self.runs)
+            for size, ms in sorted(self.warmup_ms.items()):
+                logger.info(f"Warm-up inference at {size}x{size}: {ms:.0f}ms")
+
+            self.ready_at = time.time()
+            self.state = "ready"
+            logger.info(f"✅ CubiCasa5K model ready in {self.ready_at - self.started_at:.2f}s "
+                        f"(load {self.load_time:.2f}s)")
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            logger.error(f"❌ Model warm-up failed: {str(e)}")
+        finally:
+            self._done.set_result(self.state)
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """
+        Block until the warm-up has finished.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            Final state ("ready" or "failed"), or the current one when the
+            warm-up was never started
+
+        Raises:
+            ModelNotReadyError: If the warm-up is still running after timeout
+        """
+        if self._thread is None:
+            return self.state
+        try:
+            return self._done.result(timeout)
+        except FutureTimeoutError:
+            raise ModelNotReadyError(f"Model not ready after {timeout:.0f}s (state: {self.state})")
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> str:
+        """
+        Wait for the warm-up from the event loop without holding a thread.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            Final state ("ready" or "failed"), or the current one when the
+            warm-up was never started
+
+        Raises:
+            ModelNotReadyError: If the warm-up is still running after timeout
+        """
+        if self._thread is None or self._done.done():
+            return self.state
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def wake(_):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+
+        self._done.add_done_callback(wake)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            raise ModelNotReadyError(f"Model not ready after {timeout:.0f}s (state: {self.state})")
+        finally:
+            self.waiting -= 1
+        return self.state
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness state, timings and the number of queued jobs."""
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "error": self.error,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "load_time_seconds": round(self.load_time, 3) if self.load_time is not None else None,
+            "warmup_ms": {str(size): round(ms, 1) for size, ms in self.warmup_ms.items()},
+            "queued_jobs": self.waiting
+        }
@@ -14,8 +14,7 @@ from dataclasses import dataclass
 from models.data_structures import (
     ScaledCoordinates, 
     Wall3D, 
-    Vertex3D, 
-    Face,
+    TriangleMesh,
     CubiCasaOutput
 )
 from utils.logger import get_logger
@@ -23,6 +22,16 @@ from utils.logger import get_logger
 logger = get_logger("opening_cutout_generator")
 
 
+# Two triangles of the rectangular cutout
+CUTOUT_FACES = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int32)
+CUTOUT_FACES.setflags(write=False)
+
+# Simplified two-triangle frame; indices are not offset past the wall
+# vertices the frame is appended to
+FRAME_FACES = np.array([[0, 1, 2], [1, 2, 3]], dtype=np.int32)
+FRAME_FACES.setflags(write=False)
+
+
 class OpeningCutoutError(Exception):
     """Custom exception for opening cutout generation errors."""
     pass
@@ -130,10 +139,11 @@ class OpeningCutoutGenerator:
             Dictionary mapping wall IDs to list of openings
         """
         wall_openings = {}
+        wall_centers = [self._calculate_wall_center(wall) for wall in walls]
         
         # Process doors
         for door_coord in doors:
-            nearest_wall = self._find_nearest_wall(walls, door_coord)
+            nearest_wall = self._find_nearest_wall(walls, door_coord, wall_centers)
             if nearest_wall:
                 if nearest_wall.id not in wall_openings:
                     wall_openings[nearest_wall.id] = []
@@ -147,7 +157,7 @@ class OpeningCutoutGenerator:
         
         # Process windows
         for window_coord in windows:
-            nearest_wall = self._find_nearest_wall(walls, window_coord)
+            nearest_wall = self._find_nearest_wall(walls, window_coord, wall_centers)
             if nearest_wall:
                 if nearest_wall.id not in wall_openings:
                     wall_openings[nearest_wall.id] = []
@@ -161,13 +171,17 @@ class OpeningCutoutGenerator:
         
         return wall_openings
     
-    def _find_nearest_wall(self, walls: List[Wall3D], point: Tuple[float, float]) -> Optional[Wall3D]:
+    def _find_nearest_wall(self,
+                          walls: List[Wall3D],
+                          point: Tuple[float, float],
+                          wall_centers: Optional[List[Tuple[float, float]]] = None) -> Optional[Wall3D]:
         """
         Find the nearest wall to a given point.
         
         Args:
             walls: List of wall meshes
             point: Point coordinates (x, y) in feet
+            wall_centers: Precomputed wall centers, parallel to walls
             
         Returns:
             Nearest wall or None if no wall found
@@ -175,12 +189,14 @@ class OpeningCutoutGenerator:
         if not walls:
             return None
         
+        if wall_centers is None:
+            wall_centers = [self._calculate_wall_center(wall) for wall in walls]
+        
         min_distance = float('inf')
         nearest_wall = None
         
-        for wall in walls:
+        for wall, wall_center in zip(walls, wall_centers):
             # Calculate distance to wall center
-            wall_center = self._calculate_wall_center(wall)
             distance = math.sqrt((point[0] - wall_center[0])**2 + (point[1] - wall_center[1])**2)
             
             if distance < min_distance:
@@ -199,17 +215,13 @@ class OpeningCutoutGenerator:
         Returns:
             Center coordinates (x, y) in feet
         """
-        vertices = wall.vertices
-        if not vertices:
+        vertices = wall.mesh.vertices
+        if not len(vertices):
             return (0.0, 0.0)
         
-        x_coords = [v.x for v in vertices]
-        y_coords = [v.y for v in vertices]
+        center_x, center_y = vertices[:, :2].mean(axis=0, dtype=np.float64)
         
-        center_x = sum(x_coords) / len(x_coords)
-        center_y = sum(y_coords) / len(y_coords)
-        
-        return (center_x, center_y)
+        return (float(center_x), float(center_y))
     
     def _create_wall_with_cutouts(self, wall: Wall3D, openings: List[Opening]) -> Wall3D:
         """
@@ -222,9 +234,11 @@ class OpeningCutoutGenerator:
         Returns:
             Wall mesh with cutouts
         """
-        # Start with original wall vertices and faces
-        vertices = wall.vertices.copy()
-        faces = wall.faces.copy()
+        # Start with original wall vertices and faces; frame geometry is
+        # collected and joined once at the end
+        faces = wall.mesh.faces
+        vertex_parts = [wall.mesh.vertices]
+        frame_face_parts = []
         
         # For each opening, create a rectangular cutout
         for opening in openings:
@@ -246,13 +260,12 @@ class OpeningCutoutGenerator:
                     cutout_vertices, wall.height_feet, opening
                 )
             
-            vertices.extend(frame_vertices)
-            faces.extend(frame_faces)
+            vertex_parts.append(frame_vertices)
+            frame_face_parts.append(frame_faces)
         
         return Wall3D(
             id=wall.id,
-            vertices=vertices,
-            faces=faces,
+            mesh=TriangleMesh(np.concatenate(vertex_parts), np.concatenate([faces] + frame_face_parts)),
             height_feet=wall.height_feet,
             thickness_feet=wall.thickness_feet
         )
@@ -261,7 +274,7 @@ class OpeningCutoutGenerator:
                                  wall: Wall3D, 
                                  position: Tuple[float, float], 
                                  width: float, 
-                                 height: float) -> Tuple[List[Vertex3D], List[Face]]:
+                                 height: float) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create a rectangular cutout in a wall.
         
@@ -272,32 +285,29 @@ class OpeningCutoutGenerator:
             height: Cutout height in feet
             
         Returns:
-            Tuple of (vertices, faces) for the cutout
+            Tuple of (vertices, faces) arrays for the cutout
         """
         x, y = position
         half_width = width / 2
         half_height = height / 2
         
         # Create cutout vertices (rectangular opening)
-        cutout_vertices = [
-            Vertex3D(x=x - half_width, y=y - half_height, z=0.0),  # Bottom-left
-            Vertex3D(x=x + half_width, y=y - half_height, z=0.0),  # Bottom-right
-            Vertex3D(x=x + half_width, y=y + half_height, z=0.0),  # Top-right
-            Vertex3D(x=x - half_width, y=y + half_height, z=0.0),  # Top-left
-        ]
+        cutout_vertices = np.array([
+            [x - half_width, y - half_height, 0.0],  # Bottom-left
+            [x + half_width, y - half_height, 0.0],  # Bottom-right
+            [x + half_width, y + half_height, 0.0],  # Top-right
+            [x - half_width, y + half_height, 0.0],  # Top-left
+        ], dtype=np.float32)
         
         # Create cutout faces (simple rectangle)
-        cutout_faces = [
-            Face(indices=[0, 1, 2]),  # First triangle
-            Face(indices=[0, 2, 3]),  # Second triangle
-        ]
+        cutout_faces = CUTOUT_FACES
         
         return cutout_vertices, cutout_faces
     
     def _create_door_frame(self, 
-                          cutout_vertices: List[Vertex3D], 
+                          cutout_vertices: np.ndarray, 
                           wall_height: float,
-                          opening: Opening) -> Tuple[List[Vertex3D], List[Face]]:
+                          opening: Opening) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create door frame geometry.
         
@@ -311,31 +321,20 @@ class OpeningCutoutGenerator:
         """
         frame_thickness = self.standard_openings["door"]["frame_thickness"]
         
-        # Create door frame vertices (thicker frame around the opening)
-        frame_vertices = []
-        frame_faces = []
-        
-        # Door frame extends from floor to wall height
-        for vertex in cutout_vertices:
-            # Create frame vertices at different Z levels
-            frame_vertices.extend([
-                Vertex3D(x=vertex.x, y=vertex.y, z=0.0),  # Bottom
-                Vertex3D(x=vertex.x, y=vertex.y, z=wall_height),  # Top
-            ])
+        # Door frame extends from floor to wall height: each cutout corner
+        # gets a bottom and a top frame vertex
+        frame_vertices = self._extrude_frame(cutout_vertices, 0.0, wall_height)
         
         # Create frame faces (simple rectangular frame)
         # This is a simplified frame - in a real implementation, you'd create more detailed geometry
-        frame_faces = [
-            Face(indices=[0, 1, 2]),  # Frame face 1
-            Face(indices=[1, 2, 3]),  # Frame face 2
-        ]
+        frame_faces = FRAME_FACES
         
         return frame_vertices, frame_faces
     
     def _create_window_frame(self, 
-                           cutout_vertices: List[Vertex3D], 
+                           cutout_vertices: np.ndarray, 
                            wall_height: float,
-                           opening: Opening) -> Tuple[List[Vertex3D], List[Face]]:
+                           opening: Opening) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create window frame geometry.
         
@@ -353,37 +352,43 @@ class OpeningCutoutGenerator:
         window_height = opening.height
         window_bottom = wall_height * 0.3  # Windows typically start at 30% of wall height
         
-        # Create window frame vertices
-        frame_vertices = []
-        frame_faces = []
-        
-        for vertex in cutout_vertices:
-            # Create frame vertices at window height
-            frame_vertices.extend([
-                Vertex3D(x=vertex.x, y=vertex.y, z=window_bottom),  # Bottom
-                Vertex3D(x=vertex.x, y=vertex.y, z=window_bottom + window_height),  # Top
-            ])
+        # Create window frame vertices at window height
+        frame_vertices = self._extrude_frame(cutout_vertices, window_bottom, window_bottom + window_height)
         
         # Create frame faces
-        frame_faces = [
-            Face(indices=[0, 1, 2]),  # Frame face 1
-            Face(indices=[1, 2, 3]),  # Frame face 2
-        ]
+        frame_faces = FRAME_FACES
         
         return frame_vertices, frame_faces
     
+    def _extrude_frame(self, cutout_vertices: np.ndarray, bottom: float, top: float) -> np.ndarray:
+        """
+        Interleave bottom and top frame vertices for each cutout corner.
+        
+        Args:
+            cutout_vertices: (4, 3) cutout corner array
+            bottom: Frame bottom height in feet
+            top: Frame top height in feet
+            
+        Returns:
+            (8, 3) float32 array: corner 0 bottom, corner 0 top, corner 1 bottom, ...
+        """
+        frame_vertices = np.repeat(cutout_vertices, 2, axis=0)
+        frame_vertices[0::2, 2] = bottom
+        frame_vertices[1::2, 2] = top
+        return frame_vertices
+    
     def _remove_intersecting_faces(self, 
-                                 faces: List[Face], 
-                                 cutout_vertices: List[Vertex3D]) -> List[Face]:
+                                 faces: np.ndarray, 
+                                 cutout_vertices: np.ndarray) -> np.ndarray:
         """
         Remove faces that intersect with the cutout.
         
         Args:
-            faces: List of faces
+            faces: (M, 3) face array
             cutout_vertices: Cutout vertices
             
         Returns:
-            List of faces with intersecting faces removed
+            Face array with intersecting faces removed
         """
         # This is a simplified implementation
         # In a real implementation, you'd need more sophisticated intersection detection
@@ -0,0 +1,243 @@
+"""
+Result Cache for PlanCast.
+
+Content-addressed disk cache for the CubiCasa5K analysis stage. Entries are
+keyed by a hash of the image bytes plus the model version and
+post-processing thresholds, stored as serialized CubiCasaOutput JSON and
+evicted least-recently-used once the cache exceeds its size budget.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from models.data_structures import CubiCasaOutput
+from utils.logger import get_logger
+from config.settings import (
+    CUBICASA_CACHE_ENABLED,
+    CUBICASA_CACHE_DIR,
+    CUBICASA_CACHE_MAX_MB
+)
+
+logger = get_logger("result_cache")
+
+ENTRY_SUFFIX = ".json"
+
+# Global cache instance (singleton pattern)
+_global_result_cache = None
+
+
+def get_result_cache() -> 'ResultCache':
+    """
+    Get or create global result cache instance.
+
+    Returns:
+        ResultCache singleton
+    """
+    global _global_result_cache
+    if _global_result_cache is None:
+        _global_result_cache = ResultCache(
+            cache_dir=CUBICASA_CACHE_DIR,
+            max_bytes=CUBICASA_CACHE_MAX_MB * 1024 * 1024,
+            enabled=CUBICASA_CACHE_ENABLED
+        )
+    return _global_result_cache
+
+
+class ResultCache:
+    """
+    Size-bounded LRU disk cache of CubiCasaOutput results.
+
+    The LRU order is kept in memory and rebuilt from file modification
+    times on startup; a hit touches the entry file so the order survives
+    restarts.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size budget for all entries
+            enabled: When False, lookups always miss and nothing is stored
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, fingerprint: Dict[str, Any]) -> str:
+        """
+        Build the cache key for an image.
+
+        Args:
+            image_bytes: Raw uploaded image bytes
+            fingerprint: Model version and post-processing settings
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256(image_bytes)
+        digest.update(json.dumps(fingerprint, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{ENTRY_SUFFIX}"
+
+    def _load_index(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size_bytes += size
+
+        if entries:
+            logger.info(f"Result cache loaded: {len(entries)} entries, {self._size_bytes / (1024 * 1024):.2f} MB")
+        self._evict()
+
+    def get(self, key: str) -> Optional[CubiCasaOutput]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached CubiCasaOutput, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            path = self._entry_path(key)
+            try:
+                output = CubiCasaOutput.model_validate_json(path.read_bytes())
+                os.utime(path)
+            except Exception as e:
+                # Unreadable or truncated entry: drop it and treat as a miss
+                logger.warning(f"Discarding corrupt result cache entry {key[:12]}: {str(e)}")
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return output
+
+    def put(self, key: str, output: CubiCasaOutput) -> None:
+        """
+        Store a result, evicting least-recently-used entries if over budget.
+
+        Args:
+            key: Cache key from make_key
+            output: CubiCasa5K result to store
+        """
+        if not self.enabled:
+            return
+
+        data = output.model_dump_json().encode()
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            path = self._entry_path(key)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            try:
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write result cache entry {key[:12]}: {str(e)}")
+                tmp_path.unlink(missing_ok=True)
+                return
+
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._size_bytes += len(data)
+            self._evict()
+
+    def get_or_process(self, runner: Any, fingerprint: Dict[str, Any], image_bytes: bytes, job_id: str) -> CubiCasaOutput:
+        """
+        Run CubiCasa5K analysis, reusing a cached result for identical uploads.
+
+        Args:
+            runner: CubiCasaService or InferencePool to run on a miss
+            fingerprint: Model version and post-processing settings (CubiCasaService.cache_fingerprint)
+            image_bytes: Raw uploaded image bytes
+            job_id: Job identifier
+
+        Returns:
+            CubiCasaOutput for the image
+        """
+        key = self.make_key(image_bytes, fingerprint)
+        cached_output = self.get(key)
+        if cached_output is not None:
+            logger.info(f"♻️ Reusing cached AI analysis for job {job_id} (key {key[:12]})")
+            return cached_output
+
+        output = runner.process_image(image_bytes, job_id)
+        # A stage profile describes this run only, not later cache hits
+        self.put(key, output.model_copy(update={"postprocess_profile": None}))
+        return output
+
+    def _remove(self, key: str) -> None:
+        self._size_bytes -= self._entries.pop(key, 0)
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        while self._size_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self.hits = self.misses = self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for monitoring.
+
+        Returns:
+            Hit/miss counters, hit rate and size information
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -10,17 +10,31 @@ import math
 from typing import List, Tuple, Dict, Optional, Any
 import logging
 
+import numpy as np
+
 from models.data_structures import (
     ScaledCoordinates, 
     Room3D, 
-    Vertex3D, 
-    Face,
+    TriangleMesh,
     ProcessingJob
 )
 from utils.logger import get_logger, log_job_start, log_job_complete, log_job_error
 
 logger = get_logger("room_generator")
 
+# 12 triangles (6 quads) of the room box, counter-clockwise when viewed from outside.
+# Vertices 0-3 are the floor corners (bottom-left, bottom-right, top-right,
+# top-left), 4-7 the same corners at ceiling height.
+ROOM_BOX_FACES = np.array([
+    [0, 2, 1], [0, 3, 2],  # Floor - viewed from below (negative Z)
+    [4, 5, 6], [4, 6, 7],  # Ceiling - viewed from above (positive Z)
+    [0, 1, 5], [0, 5, 4],  # Wall 1: Bottom wall (y = min_y)
+    [1, 2, 6], [1, 6, 5],  # Wall 2: Right wall (x = max_x)
+    [2, 3, 7], [2, 7, 6],  # Wall 3: Top wall (y = max_y)
+    [3, 0, 4], [3, 4, 7],  # Wall 4: Left wall (x = min_x)
+], dtype=np.int32)
+ROOM_BOX_FACES.setflags(write=False)  # shared by every mesh built from it
+
 
 class RoomGenerationError(Exception):
     """Custom exception for room mesh generation errors."""
@@ -194,8 +208,7 @@ class RoomMeshGenerator:
         # Create Room3D object
         room_mesh = Room3D(
             name=room_name,
-            vertices=vertices,
-            faces=faces,
+            mesh=TriangleMesh(vertices, faces),
             elevation_feet=0.0,
             height_feet=room_height_feet
         )
@@ -207,7 +220,7 @@ class RoomMeshGenerator:
                           min_y: float,
                           max_x: float,
                           max_y: float,
-                          height_feet: float) -> Tuple[List[Vertex3D], List[Face]]:
+                          height_feet: float) -> Tuple[np.ndarray, np.ndarray]:
         """
         Build complete 3D room box with floor, walls, and ceiling.
         
@@ -217,56 +230,22 @@ class RoomMeshGenerator:
             height_feet: Room height
             
         Returns:
-            Tuple of (vertices, faces) for the complete 3D room
+            Tuple of (vertices, faces) arrays for the complete 3D room
         """
-        # Create 8 vertices for the room box (4 bottom + 4 top)
-        vertices = [
-            # Bottom vertices (z = 0) - floor
-            Vertex3D(x=min_x, y=min_y, z=0.0),      # 0: bottom-left
-            Vertex3D(x=max_x, y=min_y, z=0.0),      # 1: bottom-right
-            Vertex3D(x=max_x, y=max_y, z=0.0),      # 2: top-right
-            Vertex3D(x=min_x, y=max_y, z=0.0),      # 3: top-left
-            
-            # Top vertices (z = height) - ceiling
-            Vertex3D(x=min_x, y=min_y, z=height_feet),   # 4: bottom-left
-            Vertex3D(x=max_x, y=min_y, z=height_feet),   # 5: bottom-right
-            Vertex3D(x=max_x, y=max_y, z=height_feet),   # 6: top-right
-            Vertex3D(x=min_x, y=max_y, z=height_feet),   # 7: top-left
-        ]
-        
-        # Create 12 triangular faces (6 quads = 12 triangles)
-        # All faces should have counter-clockwise winding when viewed from outside
-        faces = [
-            # Floor (triangulated) - viewed from below (negative Z)
-            Face(indices=[0, 2, 1]),  # Triangle 1 (counter-clockwise from below)
-            Face(indices=[0, 3, 2]),  # Triangle 2 (counter-clockwise from below)
-            
-            # Ceiling (triangulated) - viewed from above (positive Z)
-            Face(indices=[4, 5, 6]),  # Triangle 1 (counter-clockwise from above)
-            Face(indices=[4, 6, 7]),  # Triangle 2 (counter-clockwise from above)
-            
-            # Wall 1: Bottom wall (y = min_y) - viewed from negative Y
-            Face(indices=[0, 1, 5]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[0, 5, 4]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # Wall 2: Right wall (x = max_x) - viewed from positive X
-            Face(indices=[1, 2, 6]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[1, 6, 5]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # Wall 3: Top wall (y = max_y) - viewed from positive Y
-            Face(indices=[2, 3, 7]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[2, 7, 6]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # Wall 4: Left wall (x = min_x) - viewed from negative X
-            Face(indices=[3, 0, 4]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[3, 4, 7]),  # Triangle 2 (counter-clockwise from outside)
-        ]
-        
-        return vertices, faces
+        # 8 vertices for the room box (4 bottom + 4 top)
+        corners = np.array([
+            [min_x, min_y],  # bottom-left
+            [max_x, min_y],  # bottom-right
+            [max_x, max_y],  # top-right
+            [min_x, max_y],  # top-left
+        ], dtype=np.float32)
+        vertices = self._extrude_ring(corners, height_feet)
+        
+        return vertices, ROOM_BOX_FACES
     
     def _build_3d_room_from_polygon(self,
                                    room_polygon: List[Tuple[float, float]],
-                                   height_feet: float) -> Tuple[List[Vertex3D], List[Face]]:
+                                   height_feet: float) -> Tuple[np.ndarray, np.ndarray]:
         """
         Build 3D room mesh from actual polygon coordinates.
         
@@ -275,85 +254,74 @@ class RoomMeshGenerator:
             height_feet: Room height in feet
             
         Returns:
-            Tuple of (vertices, faces) for the 3D room mesh
+            Tuple of (vertices, faces) arrays for the 3D room mesh
         """
-        vertices = []
-        faces = []
-        
-        # Ensure polygon is closed (first and last points are the same)
-        if room_polygon[0] != room_polygon[-1]:
-            room_polygon = room_polygon + [room_polygon[0]]
-        
-        num_points = len(room_polygon) - 1  # Exclude the closing point
+        # Drop the closing point if the polygon is already closed
+        ring = np.asarray(room_polygon, dtype=np.float64).reshape(-1, 2)
+        if len(ring) > 1 and tuple(room_polygon[0]) == tuple(room_polygon[-1]):
+            ring = ring[:-1]
         
-        # Create bottom vertices (floor level)
-        bottom_vertices = []
-        for x, y in room_polygon[:-1]:  # Exclude the closing point
-            vertices.append(Vertex3D(x=x, y=y, z=0.0))
-            bottom_vertices.append(len(vertices) - 1)
+        num_points = len(ring)
         
-        # Create top vertices (ceiling level)
-        top_vertices = []
-        for x, y in room_polygon[:-1]:  # Exclude the closing point
-            vertices.append(Vertex3D(x=x, y=y, z=height_feet))
-            top_vertices.append(len(vertices) - 1)
+        # Bottom vertices (floor level) are 0..n-1, top vertices (ceiling) n..2n-1
+        vertices = self._extrude_ring(ring, height_feet)
+        bottom_vertices = np.arange(num_points, dtype=np.int32)
+        top_vertices = bottom_vertices + num_points
         
-        # Create floor faces (triangulate the polygon)
+        # Floor and ceiling faces (triangulate the polygon)
         floor_faces = self._triangulate_polygon(bottom_vertices)
-        faces.extend(floor_faces)
-        
-        # Create ceiling faces (triangulate the polygon)
         ceiling_faces = self._triangulate_polygon(top_vertices)
-        faces.extend(ceiling_faces)
         
-        # Create wall faces (connect bottom to top)
-        for i in range(num_points):
-            next_i = (i + 1) % num_points
-            
-            # Create two triangles for each wall segment
-            # Triangle 1: bottom_i, top_i, bottom_next_i
-            faces.append(Face(indices=[
-                bottom_vertices[i],
-                top_vertices[i],
-                bottom_vertices[next_i]
-            ]))
-            
-            # Triangle 2: top_i, top_next_i, bottom_next_i
-            faces.append(Face(indices=[
-                top_vertices[i],
-                top_vertices[next_i],
-                bottom_vertices[next_i]
-            ]))
+        # Wall faces: two triangles per segment connecting bottom to top
+        next_bottom = np.roll(bottom_vertices, -1)
+        next_top = np.roll(top_vertices, -1)
+        wall_faces = np.empty((2 * num_points, 3), dtype=np.int32)
+        wall_faces[0::2] = np.column_stack([bottom_vertices, top_vertices, next_bottom])
+        wall_faces[1::2] = np.column_stack([top_vertices, next_top, next_bottom])
         
+        faces = np.concatenate([floor_faces, ceiling_faces, wall_faces])
         return vertices, faces
     
-    def _triangulate_polygon(self, vertex_indices: List[int]) -> List[Face]:
+    def _extrude_ring(self, ring: np.ndarray, height_feet: float) -> np.ndarray:
         """
-        Triangulate a polygon using ear clipping algorithm.
+        Stack a 2D ring at floor level and at ceiling height.
         
         Args:
-            vertex_indices: List of vertex indices forming the polygon
+            ring: (n, 2) array of x/y coordinates
+            height_feet: Ceiling height
             
         Returns:
-            List of triangular faces
+            (2n, 3) float32 vertex array, floor ring first
         """
-        if len(vertex_indices) < 3:
-            return []
+        num_points = len(ring)
+        vertices = np.empty((2 * num_points, 3), dtype=np.float32)
+        vertices[:num_points, :2] = ring
+        vertices[num_points:, :2] = ring
+        vertices[:num_points, 2] = 0.0
+        vertices[num_points:, 2] = height_feet
+        return vertices
+    
+    def _triangulate_polygon(self, vertex_indices: np.ndarray) -> np.ndarray:
+        """
+        Triangulate a polygon as a fan around its first vertex.
         
-        if len(vertex_indices) == 3:
-            return [Face(indices=vertex_indices)]
+        Args:
+            vertex_indices: Vertex indices forming the polygon
+            
+        Returns:
+            (n - 2, 3) array of triangular faces
+        """
+        vertex_indices = np.asarray(vertex_indices, dtype=np.int32)
+        if len(vertex_indices) < 3:
+            return np.empty((0, 3), dtype=np.int32)
         
         # Simple triangulation for convex polygons
         # For complex polygons, you'd want a more sophisticated algorithm
-        faces = []
-        for i in range(1, len(vertex_indices) - 1):
-            faces.append(Face(indices=[
-                vertex_indices[0],
-                vertex_indices[i],
-                vertex_indices[i + 1]
-            ]))
-        
-        return faces
+        return np.column_stack([
+            np.full(len(vertex_indices) - 2, vertex_indices[0], dtype=np.int32),
+            vertex_indices[1:-1],
+            vertex_indices[2:]
+        ])
     
     def validate_room_mesh(self, room_mesh: Room3D) -> Dict[str, Any]:
         """
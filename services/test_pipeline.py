@@ -1,55 +1,141 @@
 """
-Temporary Test Pipeline for PlanCast Debugging
+Simplified Test Pipeline for PlanCast
 
-This module contains a simplified pipeline for processing floor plan images.
-It is intended for debugging purposes only and should be removed once the
-main processing pipeline is stable.
+This module contains the simplified pipeline the API runs for uploads
+(/convert and /convert-test) until FloorPlanProcessor replaces it there.
+It runs real CubiCasa5K inference, through the inference pool when it is
+enabled, and exports under GENERATED_MODELS_DIR/<job_id>.
 
 Key features of this test pipeline:
-- Skips coordinate scaling
+- Skips coordinate scaling: the simple generators map one pixel to one
+  foot, so the exported building is in pixel space
+- Saves that building as building_pixels.json, so /scale/{job_id} can
+  re-export it at the user's scale without running the pipeline again
 - Bypasses door/window cutout generation
 - Uses simplified room and wall generators
 
 """
 
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
 from services.test_room_generator import SimpleRoomGenerator
 from services.test_wall_generator import SimpleWallGenerator
 from services.mesh_exporter import MeshExporter
-from models.data_structures import ProcessingJob, ProcessingStatus
+from services.building_rescaler import BuildingRescaler, PIXEL_BUILDING_FILENAME
+from services.result_cache import ResultCache, get_result_cache
+from models.data_structures import Building3D, FileFormat, ProcessingJob, ProcessingStatus
+from utils.logger import get_logger
+from config.settings import GENERATED_MODELS_DIR
 import time
 
+logger = get_logger("test_pipeline")
+
+
 class SimpleTestPipeline:
-    """A simplified pipeline for testing and debugging."""
+    """Simplified upload pipeline: inference, simple rooms and walls, export."""
 
-    def __init__(self):
+    def __init__(self, output_dir: Optional[str] = None, cubicasa_service: Optional[Any] = None,
+                 result_cache: Optional[ResultCache] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            output_dir: Directory job files are written to, under <output_dir>/<job_id>
+                (defaults to GENERATED_MODELS_DIR)
+            cubicasa_service: CubiCasaService that analyses uploads; defaults to the global
+                service, with inference in the inference pool when it is enabled
+            result_cache: Cache of analysis results by image content (defaults to the global cache)
+        """
+        self.output_dir = output_dir or GENERATED_MODELS_DIR
+        self.cubicasa_service = cubicasa_service
+        self.inference_pool = None
+        self.result_cache = result_cache or get_result_cache()
         self.room_generator = SimpleRoomGenerator()
         self.wall_generator = SimpleWallGenerator()
         self.mesh_exporter = MeshExporter()
+        self.building_rescaler = BuildingRescaler(self.mesh_exporter)
 
-    def process_test_image(self, file_content: bytes, filename: str, export_formats: list[str]) -> ProcessingJob:
-        job = ProcessingJob(job_id="test_job", status=ProcessingStatus.PROCESSING)
-        start_time = time.time()
+    def process_test_image(self, file_content: bytes, filename: str, export_formats: list[str],
+                           job_id: str = "test_job") -> ProcessingJob:
+        extension = Path(filename).suffix.lower().lstrip(".")
+        job = ProcessingJob(
+            job_id=job_id,
+            filename=filename,
+            file_format=FileFormat(extension) if extension in FileFormat._value2member_map_ else FileFormat.JPEG,
+            file_size_bytes=len(file_content),
+            status=ProcessingStatus.PROCESSING,
+            started_at=time.time()
+        )
+        job_dir = Path(self.output_dir) / job_id
 
         try:
-            # This is a placeholder for the actual CubiCasa output
-            cubicasa_output = {"wall_coordinates": [], "room_bounding_boxes": {}}
-            
-            rooms = self.room_generator.generate_rooms(cubicasa_output)
-            walls = self.wall_generator.generate_walls(cubicasa_output)
-            
-            exported_files = self.mesh_exporter.export_meshes(
-                rooms=rooms,
-                walls=walls,
-                job_id="test_job",
-                formats=export_formats
+            cubicasa_output = self._analyze_image(file_content, job_id)
+            job.cubicasa_output = cubicasa_output
+
+            rooms = self.room_generator.generate_simple_rooms(cubicasa_output)
+            walls = self.wall_generator.generate_simple_walls(cubicasa_output)
+            building = self._assemble_building(rooms, walls)
+            job.building_3d = building
+
+            # 1:1 pixel to foot scaling: the building already is in pixel space,
+            # so /scale can re-export it with BuildingRescaler instead of a rerun
+            self._save_pixel_building(building, job_dir)
+
+            export_result = self.mesh_exporter.export_building(
+                building=building,
+                formats=export_formats,
+                out_dir=str(job_dir)
             )
-            
+
             job.status = ProcessingStatus.COMPLETED
-            job.exported_files = exported_files
-            
+            job.exported_files = export_result.files
+
         except Exception as e:
             job.status = ProcessingStatus.FAILED
             job.error_message = str(e)
-            
-        job.processing_time_seconds = time.time() - start_time
+
+        job.completed_at = time.time()
         return job
+
+    def _analyze_image(self, file_content: bytes, job_id: str):
+        # Same lookup as FloorPlanProcessor, so re-uploads skip inference here too
+        if self.cubicasa_service is None:
+            from services.cubicasa_service import get_cubicasa_service
+            from services.inference_pool import get_inference_pool
+            self.cubicasa_service = get_cubicasa_service()
+            self.inference_pool = get_inference_pool()
+        runner = self.inference_pool or self.cubicasa_service
+        return self.result_cache.get_or_process(
+            runner, self.cubicasa_service.cache_fingerprint(), file_content, job_id
+        )
+
+    def _assemble_building(self, rooms: List, walls: List) -> Building3D:
+        meshes = [room.mesh for room in rooms] + [wall.mesh for wall in walls]
+        bounds = [mesh.bounds for mesh in meshes if mesh.vertex_count]
+        bounding_box = {}
+        if bounds:
+            bounds = np.stack(bounds)
+            mins, maxs = bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)
+            bounding_box = {
+                "min_x": float(mins[0]), "max_x": float(maxs[0]),
+                "min_y": float(mins[1]), "max_y": float(maxs[1]),
+                "min_z": float(mins[2]), "max_z": float(maxs[2])
+            }
+        return Building3D(
+            rooms=rooms,
+            walls=walls,
+            total_vertices=sum(mesh.vertex_count for mesh in meshes),
+            total_faces=sum(mesh.face_count for mesh in meshes),
+            bounding_box=bounding_box,
+            export_ready=True
+        )
+
+    def _save_pixel_building(self, building: Building3D, job_dir: Path) -> None:
+        try:
+            self.building_rescaler.save_pixel_building(building, str(job_dir / PIXEL_BUILDING_FILENAME))
+        except Exception as e:
+            # Only the rescale fast path depends on this file
+            logger.warning(f"⚠️ Could not save pixel-space building in {job_dir}: {str(e)}")
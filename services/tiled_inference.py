@@ -0,0 +1,161 @@
+"""
+Tiled sliding-window inference for PlanCast.
+
+Instead of fitting the whole upload into one network input, the image is
+resized with its aspect ratio kept to the largest scale (never above the
+native one) at which a grid of at most ``max_tiles`` overlapping tiles
+covers it. The tiles run through the model as a batch and their outputs are
+blended back into a single prediction map. Inside overlaps the weights ramp
+down towards each tile's border, where the model sees the least context.
+
+Tiles must be a multiple of the network stride, so each tile's output comes
+back at exactly the tile size; align_tiling rounds the configured size up to
+that. Tile origins are spread evenly over the canvas and need no alignment.
+"""
+
+import math
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import torch
+
+from services.image_preprocessing import NETWORK_STRIDE, round_to_stride
+
+
+def align_tiling(tile_size: int, overlap: int) -> Tuple[int, int]:
+    """
+    Round a tile size up to the network stride and clamp the overlap at 0.
+
+    Args:
+        tile_size: Configured tile side
+        overlap: Configured minimum overlap
+
+    Returns:
+        Tuple of (tile_size, overlap) accepted by plan_tiles
+    """
+    return round_to_stride(tile_size), max(0, int(overlap))
+
+
+def tile_count(length: int, tile_size: int, overlap: int) -> int:
+    """Tiles needed to cover length pixels with at least overlap pixels shared."""
+    if length <= tile_size:
+        return 1
+    return math.ceil((length - overlap) / (tile_size - overlap))
+
+
+def tile_positions(length: int, tile_size: int, overlap: int) -> List[int]:
+    """Tile start offsets along one axis, spread evenly from 0 to length - tile_size."""
+    count = tile_count(length, tile_size, overlap)
+    if count == 1:
+        return [0]
+    return [int(round(i * (length - tile_size) / (count - 1))) for i in range(count)]
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: int,
+               max_tiles: int) -> Tuple[Tuple[int, int], List[Tuple[int, int]]]:
+    """
+    Choose the canvas size the image is resized to and the tiles covering it.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        tile_size: Side of the square tiles
+        overlap: Minimum overlap between neighbouring tiles
+        max_tiles: Upper bound on the number of tiles
+
+    Returns:
+        Tuple of ((canvas_width, canvas_height), [(x, y) tile origins])
+
+    Raises:
+        ValueError: If the tile size is not aligned (see align_tiling) or the
+            overlap is not smaller than a tile
+    """
+    if tile_size % NETWORK_STRIDE:
+        raise ValueError(f"Tile size must be a multiple of {NETWORK_STRIDE}, got {tile_size}")
+    if not 0 <= overlap < tile_size:
+        raise ValueError(f"Tile overlap must be in [0, {tile_size}), got {overlap}")
+    stride = tile_size - overlap
+    max_tiles = max(1, int(max_tiles))
+
+    # Largest scale over all grids of at most max_tiles tiles
+    scale = 0.0
+    for columns in range(1, max_tiles + 1):
+        rows = max_tiles // columns
+        covered_width = tile_size + (columns - 1) * stride
+        covered_height = tile_size + (rows - 1) * stride
+        scale = max(scale, min(1.0, covered_width / width, covered_height / height))
+
+    # width * scale never exceeds the covered width, so rounding keeps the grid
+    canvas_width = max(1, int(round(width * scale)))
+    canvas_height = max(1, int(round(height * scale)))
+
+    origins = [(x, y)
+               for y in tile_positions(canvas_height, tile_size, overlap)
+               for x in tile_positions(canvas_width, tile_size, overlap)]
+    return (canvas_width, canvas_height), origins
+
+
+def make_tiles(image: np.ndarray, origins: List[Tuple[int, int]], tile_size: int) -> torch.Tensor:
+    """
+    Cut a normalized (N, 3, tile_size, tile_size) batch out of an RGB image.
+
+    Images smaller than a tile are padded with white, the floor plan
+    background.
+
+    Args:
+        image: (H, W, 3) uint8 image at canvas size
+        origins: Tile origins from plan_tiles
+        tile_size: Side of the square tiles
+    """
+    height, width = image.shape[:2]
+    padded_height, padded_width = max(height, tile_size), max(width, tile_size)
+    if (padded_height, padded_width) != (height, width):
+        padded = np.full((padded_height, padded_width, 3), 255, dtype=np.uint8)
+        padded[:height, :width] = image
+        image = padded
+
+    tiles = np.stack([image[y:y + tile_size, x:x + tile_size] for x, y in origins])
+    return torch.from_numpy(tiles).permute(0, 3, 1, 2).float().div_(255.0)
+
+
+def tile_weights(tile_size: int, overlap: int) -> torch.Tensor:
+    """(tile_size, tile_size) blending weights ramping up over the overlap from each border."""
+    ramp = torch.ones(tile_size)
+    if overlap > 0:
+        steps = torch.arange(1, overlap + 1, dtype=torch.float32) / (overlap + 1)
+        ramp[:overlap] = steps
+        ramp[-overlap:] = torch.minimum(ramp[-overlap:], steps.flip(0))
+    return ramp[:, None] * ramp[None, :]
+
+
+def stitch_tiles(tile_outputs: Iterable[Tuple[torch.Tensor, Tuple[int, int]]],
+                 canvas_size: Tuple[int, int], overlap: int) -> torch.Tensor:
+    """
+    Blend per-tile model outputs into one prediction map.
+
+    Tiles are accumulated one at a time, so outputs can be produced (and
+    freed) chunk by chunk.
+
+    Args:
+        tile_outputs: (C, tile_size, tile_size) output and (x, y) origin per tile
+        canvas_size: (width, height) from plan_tiles
+        overlap: Overlap the tiles were planned with
+
+    Returns:
+        (1, C, height, width) prediction for the canvas
+    """
+    width, height = canvas_size
+    blended = total_weight = weights = None
+    for output, (x, y) in tile_outputs:
+        channels, tile_size, _ = output.shape
+        if blended is None:
+            weights = tile_weights(tile_size, overlap)
+            blended = torch.zeros(channels, max(height, tile_size), max(width, tile_size))
+            total_weight = torch.zeros(blended.shape[1:])
+        blended[:, y:y + tile_size, x:x + tile_size].add_(output * weights)
+        total_weight[y:y + tile_size, x:x + tile_size].add_(weights)
+
+    if blended is None:
+        raise ValueError("No tile outputs to stitch")
+    blended.div_(total_weight)
+    return blended[None, :, :height, :width]
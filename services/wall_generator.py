@@ -10,17 +10,31 @@ import math
 from typing import List, Tuple, Dict, Optional, Any
 import logging
 
+import numpy as np
+
 from models.data_structures import (
     ScaledCoordinates, 
     Wall3D, 
-    Vertex3D, 
-    Face,
+    TriangleMesh,
     ProcessingJob
 )
 from utils.logger import get_logger, log_job_start, log_job_complete, log_job_error
 
 logger = get_logger("wall_generator")
 
+# 12 triangles (6 quads) of the wall prism, counter-clockwise when viewed from outside.
+# Vertices 0-3 are left start, left end, right end, right start at z = 0;
+# 4-7 the same points at wall height.
+WALL_PRISM_FACES = np.array([
+    [0, 2, 1], [0, 3, 2],  # Bottom face - viewed from below (negative Z)
+    [4, 5, 6], [4, 6, 7],  # Top face - viewed from above (positive Z)
+    [0, 1, 5], [0, 5, 4],  # Left side face
+    [2, 3, 7], [2, 7, 6],  # Right side face
+    [0, 4, 7], [0, 7, 3],  # Start end face
+    [1, 2, 6], [1, 6, 5],  # End end face
+], dtype=np.int32)
+WALL_PRISM_FACES.setflags(write=False)  # shared by every mesh built from it
+
 
 class WallGenerationError(Exception):
     """Custom exception for wall mesh generation errors."""
@@ -377,8 +391,7 @@ class WallMeshGenerator:
         # Create Wall3D object
         wall_mesh = Wall3D(
             id=wall_id,
-            vertices=vertices,
-            faces=faces,
+            mesh=TriangleMesh(vertices, faces),
             height_feet=wall_height_feet,
             thickness_feet=wall_thickness_feet
         )
@@ -393,7 +406,7 @@ class WallMeshGenerator:
                          left_end: Tuple[float, float],
                          right_start: Tuple[float, float],
                          right_end: Tuple[float, float],
-                         height_feet: float) -> Tuple[List[Vertex3D], List[Face]]:
+                         height_feet: float) -> Tuple[np.ndarray, np.ndarray]:
         """
         Build wall prism from offset polylines.
         
@@ -403,52 +416,17 @@ class WallMeshGenerator:
             height_feet: Wall height
             
         Returns:
-            Tuple of (vertices, faces) for the wall prism
+            Tuple of (vertices, faces) arrays for the wall prism
         """
-        # Create 8 vertices for the wall box (4 bottom + 4 top)
-        vertices = [
-            # Bottom vertices (z = 0)
-            Vertex3D(x=left_start[0], y=left_start[1], z=0.0),      # 0: left start bottom
-            Vertex3D(x=left_end[0], y=left_end[1], z=0.0),          # 1: left end bottom
-            Vertex3D(x=right_end[0], y=right_end[1], z=0.0),        # 2: right end bottom
-            Vertex3D(x=right_start[0], y=right_start[1], z=0.0),    # 3: right start bottom
-            
-            # Top vertices (z = height)
-            Vertex3D(x=left_start[0], y=left_start[1], z=height_feet),   # 4: left start top
-            Vertex3D(x=left_end[0], y=left_end[1], z=height_feet),       # 5: left end top
-            Vertex3D(x=right_end[0], y=right_end[1], z=height_feet),     # 6: right end top
-            Vertex3D(x=right_start[0], y=right_start[1], z=height_feet), # 7: right start top
-        ]
-        
-        # Create 12 triangular faces (6 quads = 12 triangles)
-        # All faces should have counter-clockwise winding when viewed from outside
-        faces = [
-            # Bottom face (triangulated) - viewed from below (negative Z)
-            Face(indices=[0, 2, 1]),  # Triangle 1 (counter-clockwise from below)
-            Face(indices=[0, 3, 2]),  # Triangle 2 (counter-clockwise from below)
-            
-            # Top face (triangulated) - viewed from above (positive Z)
-            Face(indices=[4, 5, 6]),  # Triangle 1 (counter-clockwise from above)
-            Face(indices=[4, 6, 7]),  # Triangle 2 (counter-clockwise from above)
-            
-            # Left side face - viewed from left side
-            Face(indices=[0, 1, 5]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[0, 5, 4]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # Right side face - viewed from right side
-            Face(indices=[2, 3, 7]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[2, 7, 6]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # Start end face - viewed from start
-            Face(indices=[0, 4, 7]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[0, 7, 3]),  # Triangle 2 (counter-clockwise from outside)
-            
-            # End end face - viewed from end
-            Face(indices=[1, 2, 6]),  # Triangle 1 (counter-clockwise from outside)
-            Face(indices=[1, 6, 5]),  # Triangle 2 (counter-clockwise from outside)
-        ]
-        
-        return vertices, faces
+        # 8 vertices for the wall box (4 bottom + 4 top)
+        corners = (left_start, left_end, right_end, right_start)
+        vertices = np.empty((8, 3), dtype=np.float32)
+        vertices[:4, :2] = corners
+        vertices[4:, :2] = corners
+        vertices[:4, 2] = 0.0
+        vertices[4:, 2] = height_feet
+        
+        return vertices, WALL_PRISM_FACES
     
     def validate_wall_mesh(self, wall_mesh: Wall3D) -> Dict[str, Any]:
         """
@@ -0,0 +1,241 @@
+"""
+Weight Cache for PlanCast.
+
+Converts the model_state of a pickled CubiCasa5K checkpoint, once, into a
+flat weights file next to the checkpoint: an 8-byte little-endian header
+length, a JSON header describing every tensor, then the raw tensor data
+(the safetensors layout, with every tensor 64-byte aligned). Later
+startups map that file into memory and build tensors directly on the
+mapped pages instead of unpickling the checkpoint, so loading costs little
+more than reading the header, and every process mapping the file shares
+the same page-cache pages.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import torch
+
+from utils.logger import get_logger
+
+logger = get_logger("weight_cache")
+
+WEIGHTS_SUFFIX = ".safetensors"
+FORMAT_VERSION = "plancast-weights-1"
+
+# Alignment of the data section and of every tensor in it (the cache line
+# size; oneDNN copies convolution weights that are less aligned)
+ALIGNMENT = 64
+
+DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+DTYPE_NAMES = {dtype: name for name, dtype in DTYPES.items()}
+
+
+class WeightCacheError(Exception):
+    """Exception for weight conversion and weight cache errors."""
+    pass
+
+
+def weight_cache_path(checkpoint_path: Path) -> Path:
+    """
+    Location of the flat weights file for a checkpoint.
+
+    Args:
+        checkpoint_path: Path to the pickled model checkpoint
+
+    Returns:
+        Path next to the checkpoint, e.g. model_best_val_loss_var.safetensors
+    """
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(checkpoint_path.stem + WEIGHTS_SUFFIX)
+
+
+def checkpoint_key(checkpoint_path: Path) -> str:
+    """
+    Key identifying the checkpoint a weights file was converted from.
+
+    Args:
+        checkpoint_path: Path to the pickled model checkpoint
+
+    Returns:
+        Size and modification time of the checkpoint
+    """
+    stat = Path(checkpoint_path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def save_weights(state_dict: Dict[str, torch.Tensor],
+                 path: Path,
+                 metadata: Dict[str, str] = None) -> str:
+    """
+    Write tensors to a flat weights file.
+
+    The file is written under a temporary name and renamed into place, so a
+    process mapping it never sees a partial file.
+
+    Args:
+        state_dict: Tensors by name
+        path: Destination path
+        metadata: Extra string metadata stored in the header
+
+    Returns:
+        Version hash (sha256 over tensor names, dtypes, shapes and data)
+
+    Raises:
+        WeightCacheError: If a tensor has an unsupported dtype
+    """
+    tensors = []
+    for name, tensor in state_dict.items():
+        if tensor.dtype not in DTYPE_NAMES:
+            raise WeightCacheError(f"Unsupported dtype {tensor.dtype} for tensor {name}")
+        tensors.append((name, tensor.detach().cpu().contiguous()))
+
+    digest = hashlib.sha256()
+    header = {}
+    offset = 0
+    for name, tensor in tensors:
+        size = tensor.numel() * tensor.element_size()
+        header[name] = {
+            "dtype": DTYPE_NAMES[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [offset, offset + size]
+        }
+        digest.update(json.dumps([name, header[name]["dtype"], header[name]["shape"]]).encode())
+        digest.update(_tensor_bytes(tensor))
+        offset += size + (-size % ALIGNMENT)
+
+    version = digest.hexdigest()
+    header["__metadata__"] = {**(metadata or {}), "format": FORMAT_VERSION, "version": version}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    header_bytes += b" " * (-(8 + len(header_bytes)) % ALIGNMENT)
+
+    path = Path(path)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(struct.pack("<Q", len(header_bytes)))
+            f.write(header_bytes)
+            for _, tensor in tensors:
+                data = _tensor_bytes(tensor)
+                f.write(data)
+                f.write(b"\0" * (-len(data) % ALIGNMENT))
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return version
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> memoryview:
+    return memoryview(tensor.reshape(-1).view(torch.uint8).numpy())
+
+
+def load_weights(path: Path) -> Tuple[Dict[str, torch.Tensor], Dict[str, str]]:
+    """
+    Map a flat weights file into memory.
+
+    The mapping is private copy-on-write: pages are read from the page
+    cache on first access and shared with every other process mapping the
+    file until a tensor is written to.
+
+    Args:
+        path: Path to the weights file
+
+    Returns:
+        Tuple of (tensors by name, header metadata)
+
+    Raises:
+        WeightCacheError: If the file is not a valid weights file
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    try:
+        (header_length,) = struct.unpack("<Q", mapped[:8])
+        header = json.loads(mapped[8:8 + header_length])
+    except (struct.error, ValueError) as e:
+        raise WeightCacheError(f"Invalid weights file header in {path}: {str(e)}")
+
+    metadata = header.pop("__metadata__", {})
+    data_start = 8 + header_length
+    state_dict = {}
+    for name, info in header.items():
+        dtype = DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if data_start + end > len(mapped):
+            raise WeightCacheError(f"Weights file {path} is truncated at tensor {name}")
+        # element_size() rather than dtype.itemsize, which needs torch 2.1
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        if count == 0:
+            state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        # The tensor keeps the mapping alive
+        tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin)
+        state_dict[name] = tensor.reshape(info["shape"])
+    return state_dict, metadata
+
+
+def load_or_convert_weights(checkpoint_path: Path,
+                            read_state_dict: Callable[[], Dict[str, torch.Tensor]]
+                            ) -> Tuple[Dict[str, torch.Tensor], str, str]:
+    """
+    Map the converted weights of a checkpoint, converting them first if needed.
+
+    Args:
+        checkpoint_path: Path to the pickled model checkpoint
+        read_state_dict: Loads the model state from the checkpoint; only
+            called when there is no up-to-date weights file
+
+    Returns:
+        Tuple of (tensors by name, version hash, source) where source is
+        "cache" or "converted", or "checkpoint" when the weights file could
+        not be written and the unpickled tensors are returned instead
+    """
+    cache_path = weight_cache_path(checkpoint_path)
+    source_key = checkpoint_key(checkpoint_path)
+
+    if cache_path.exists():
+        try:
+            state_dict, metadata = load_weights(cache_path)
+            if metadata.get("format") == FORMAT_VERSION and metadata.get("checkpoint") == source_key:
+                logger.info(f"✅ Mapped model weights from {cache_path}")
+                return state_dict, metadata["version"], "cache"
+            logger.info("Model weights file is stale, converting the checkpoint again")
+        except Exception as e:
+            logger.warning(f"Could not map model weights {cache_path}: {str(e)}")
+
+    state_dict = read_state_dict()
+    start_time = time.time()
+    try:
+        version = save_weights(state_dict, cache_path, {"checkpoint": source_key})
+        logger.info(f"✅ Converted checkpoint weights to {cache_path} in {time.time() - start_time:.2f}s")
+    except Exception as e:
+        # A read-only models dir only costs unpickling again on the next startup
+        logger.warning(f"Could not write model weights file {cache_path}: {str(e)}")
+        return state_dict, None, "checkpoint"
+
+    # Serve from the mapping too, so this process shares pages with later ones
+    try:
+        mapped_state, _ = load_weights(cache_path)
+    except Exception as e:
+        # The unpickled tensors are just as good for this process
+        logger.warning(f"Could not map converted model weights {cache_path}: {str(e)}")
+        return state_dict, version, "converted"
+    return mapped_state, version, "converted"
@@ -8,7 +8,6 @@ including persistent storage setup and model pre-loading.
 
 import os
 import sys
-import time
 from pathlib import Path
 
 # Add project root to Python path
@@ -46,20 +45,23 @@ def setup_persistent_storage():
         return False
 
 def preload_cubicasa_model():
-    """Preload the CubiCasa model to avoid cold starts."""
+    """Start loading and warming up the CubiCasa model in the background."""
     try:
-        print("🤖 Preloading CubiCasa model...")
-        from services.cubicasa_service import get_cubicasa_service
+        from services.model_warmup import get_model_warmup
         
-        start_time = time.time()
-        service = get_cubicasa_service()
-        load_time = time.time() - start_time
+        warmup = get_model_warmup()
+        if not warmup.enabled:
+            print("ℹ️ Model warm-up disabled; the model loads on the first job")
+            return False
         
-        print(f"✅ CubiCasa model preloaded successfully in {load_time:.2f}s")
+        # The server starts right away; /health/ready reports when the model is
+        # loaded and warmed up, in the inference workers when the pool is enabled
+        warmup.start()
+        print("🤖 CubiCasa model loading and warming up in the background...")
         return True
         
     except Exception as e:
-        print(f"❌ Failed to preload CubiCasa model: {e}")
+        print(f"❌ Failed to start CubiCasa model warm-up: {e}")
         return False
 
 def main():
@@ -71,12 +73,12 @@ def main():
     persistent_available = setup_persistent_storage()
     
     # Preload model
-    model_loaded = preload_cubicasa_model()
+    warmup_started = preload_cubicasa_model()
     
     print("=" * 50)
     print(f"📊 Startup Summary:")
     print(f"   Persistent Storage: {'✅ Available' if persistent_available else '❌ Not Available'}")
-    print(f"   Model Preloaded: {'✅ Success' if model_loaded else '❌ Failed'}")
+    print(f"   Model Warm-up: {'✅ Started in background' if warmup_started else '❌ Not started'}")
     print("=" * 50)
     
     # Start the main application
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for batched CubiCasa5K inference.
+
+Uses a stand-in model in place of the CubiCasa5K checkpoint so batching
+behaviour (process_images and the micro-batching queue) can be checked
+without the model weights.
+
+Run with: python3 test_batched_inference.py
+"""
+
+import os
+import sys
+import threading
+from io import BytesIO
+
+import torch
+import torch.nn.functional as F
+from PIL import Image
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.cubicasa_service import InferenceBatcher
+from test_post_processing import make_synthetic_prediction, make_service
+
+
+class StandInModel(torch.nn.Module):
+    """Returns the synthetic prediction, offset per image by its mean intensity."""
+
+    def __init__(self):
+        super().__init__()
+        prediction = F.interpolate(make_synthetic_prediction(), size=(512, 512), mode='bilinear')
+        self.register_buffer('prediction', prediction)
+        self.calls = []
+
+    def forward(self, x):
+        self.calls.append(x.shape[0])
+        return self.prediction + x.mean(dim=(1, 2, 3), keepdim=True) * 1e-3
+
+
+def make_image_bytes(shade, size=(400, 300)):
+    image = Image.new('RGB', size, (shade, shade, shade))
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_process_images_matches_process_image():
+    """Batched processing returns the same results as one-by-one processing."""
+    print("🧪 Testing process_images against process_image...")
+
+    model = StandInModel()
+    batch = [(make_image_bytes(shade), f"job_{shade}") for shade in (40, 120, 200)]
+
+    single = make_service(model, max_batch_size=1)
+    expected = [single.process_image(image_bytes, job_id) for image_bytes, job_id in batch]
+
+    model.calls.clear()
+    results = make_service(model, max_batch_size=2).process_images(batch)
+
+    assert model.calls == [2, 1]
+    assert len(results) == len(expected)
+    for result, reference in zip(results, expected):
+        assert result.room_bounding_boxes == reference.room_bounding_boxes
+        assert result.wall_coordinates == reference.wall_coordinates
+        assert result.image_dimensions == reference.image_dimensions
+    print("✅ Batched results match single-image results")
+
+
+def test_batcher_groups_concurrent_requests():
+    """Concurrent submissions share forward passes and get their own slice back."""
+    print("🧪 Testing micro-batching queue...")
+
+    model = StandInModel()
+    batcher = InferenceBatcher(model, max_batch_size=4, max_wait_ms=200)
+    tensors = [torch.full((1, 3, 512, 512), float(i)) for i in range(4)]
+    outputs = [None] * len(tensors)
+
+    def submit(index):
+        outputs[index] = batcher.submit(tensors[index]).result(timeout=10)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(tensors))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(model.calls) == 4
+    assert len(model.calls) < 4
+    for index, output in enumerate(outputs):
+        assert output.shape == (1, 44, 512, 512)
+        assert torch.allclose(output, model.prediction + index * 1e-3)
+    print(f"✅ 4 requests served in {len(model.calls)} forward pass(es)")
+
+
+def test_batcher_propagates_errors():
+    """A failing forward pass surfaces on every future in the batch."""
+    print("🧪 Testing micro-batching error propagation...")
+
+    def failing_forward(batch_tensor):
+        raise RuntimeError("boom")
+
+    batcher = InferenceBatcher(failing_forward, max_batch_size=2, max_wait_ms=1)
+    future = batcher.submit(torch.zeros((1, 3, 8, 8)))
+    try:
+        future.result(timeout=10)
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    print("✅ Errors propagated to callers")
+
+
+if __name__ == "__main__":
+    test_process_images_matches_process_image()
+    test_batcher_groups_concurrent_requests()
+    test_batcher_propagates_errors()
+    print("🎉 All batched inference tests passed!")
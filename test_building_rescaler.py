@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental building rescale path.
+
+Run with: python3 test_building_rescaler.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from models.data_structures import CubiCasaOutput, Building3D, Room3D, Vertex3D, Face, ProcessingStatus
+from services.coordinate_scaler import CoordinateScaler
+from services.room_generator import RoomMeshGenerator
+from services.wall_generator import WallMeshGenerator
+from services.building_rescaler import BuildingRescaler, transform_building, PIXEL_BUILDING_FILENAME
+from services.result_cache import ResultCache
+from services.test_pipeline import SimpleTestPipeline
+from core.floorplan_processor import FloorPlanProcessor
+
+
+def make_cubicasa_output():
+    return CubiCasaOutput(
+        wall_coordinates=[(40, 40), (200, 40), (200, 160), (40, 160), (120, 40), (120, 160)],
+        room_bounding_boxes={
+            "room_3_0": {"min_x": 40, "max_x": 120, "min_y": 40, "max_y": 160},
+            "room_4_1": {"min_x": 120, "max_x": 200, "min_y": 40, "max_y": 160}
+        },
+        image_dimensions=(256, 256),
+        processing_time=0.0
+    )
+
+
+def build(cubicasa_output, real_world_feet, wall_thickness_feet=0.5):
+    """Full generation path: scale, rooms, walls, assembly."""
+    scaled = CoordinateScaler().process_scaling_request(
+        cubicasa_output, "room_3_0", "width", real_world_feet, "test_job"
+    )
+    rooms = RoomMeshGenerator().generate_room_meshes(scaled)
+    walls = WallMeshGenerator().generate_wall_meshes(scaled, wall_thickness_feet=wall_thickness_feet)
+    processor = FloorPlanProcessor.__new__(FloorPlanProcessor)
+    return processor._assemble_building(rooms, walls, scaled), scaled
+
+
+def vertex_array(meshes):
+    return np.array([(v.x, v.y, v.z) for mesh in meshes for v in mesh.vertices])
+
+
+def test_rescale_matches_regeneration():
+    """Rescaling the pixel-space building equals regenerating at the new scale."""
+    print("🧪 Testing rescale against full regeneration...")
+
+    output = make_cubicasa_output()
+    building_a, scaled_a = build(output, 12.0)
+    # Wall thickness scales with the plan on the fast path
+    building_b, scaled_b = build(output, 15.0, wall_thickness_feet=0.5 * 15.0 / 12.0)
+
+    rescaler = BuildingRescaler()
+    pixel_building = rescaler.to_pixel_space(building_a, scaled_a.scale_reference.scale_factor)
+    rescaled = rescaler.apply_scale(pixel_building, scaled_b.scale_reference.scale_factor)
+
+    assert np.allclose(vertex_array(rescaled.rooms), vertex_array(building_b.rooms))
+    assert np.allclose(vertex_array(rescaled.walls), vertex_array(building_b.walls))
+    for key, value in building_b.bounding_box.items():
+        assert abs(rescaled.bounding_box[key] - value) < 1e-9, key
+    assert rescaled.total_faces == building_b.total_faces
+    assert all(wall.height_feet == 9.0 for wall in rescaled.walls)
+    print("✅ Rescaled geometry matches regeneration")
+
+
+def test_pixel_building_round_trip():
+    """Saved pixel-space buildings load back unchanged."""
+    print("🧪 Testing pixel-space building persistence...")
+
+    building, scaled = build(make_cubicasa_output(), 12.0)
+    rescaler = BuildingRescaler()
+    pixel_building = rescaler.to_pixel_space(building, scaled.scale_reference.scale_factor)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = rescaler.save_pixel_building(pixel_building, os.path.join(tmp, "job", "building_pixels.json"))
+        loaded = rescaler.load_pixel_building(path)
+
+    assert np.allclose(vertex_array(loaded.rooms), vertex_array(pixel_building.rooms))
+    assert np.allclose(vertex_array(loaded.walls), vertex_array(pixel_building.walls))
+    print("✅ Pixel-space building round trip correct")
+
+
+def test_large_plan_transform_is_fast():
+    """The transform stays well under a second for large plans."""
+    print("🧪 Testing rescale speed on a large plan...")
+
+    rng = np.random.default_rng(0)
+    rooms = []
+    for i in range(50):
+        coords = rng.uniform(0, 2000, size=(1000, 3))
+        rooms.append(Room3D(
+            name=f"room_{i}",
+            vertices=[Vertex3D(x=x, y=y, z=z) for x, y, z in coords],
+            faces=[Face(indices=[j, j + 1, j + 2]) for j in range(998)],
+            elevation_feet=0.0,
+            height_feet=9.0
+        ))
+    building = Building3D(rooms=rooms, walls=[], total_vertices=50000, total_faces=49900,
+                          bounding_box={}, export_ready=True)
+
+    start = time.time()
+    rescaled = transform_building(building, 1.0 / 25.0)
+    elapsed = time.time() - start
+
+    assert len(rescaled.rooms) == 50
+    assert elapsed < 1.0, elapsed
+    print(f"✅ 50k vertices rescaled in {elapsed * 1000:.0f}ms")
+
+
+def test_processor_rescale_skips_generators():
+    """FloorPlanProcessor.rescale_floorplan never touches the mesh generators."""
+    print("🧪 Testing processor rescale fast path...")
+
+    class Forbidden:
+        def __getattr__(self, name):
+            raise AssertionError(f"generator called: {name}")
+
+    output = make_cubicasa_output()
+    building, scaled = build(output, 12.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = FloorPlanProcessor.__new__(FloorPlanProcessor)
+        processor.coordinate_scaler = CoordinateScaler()
+        processor.building_rescaler = BuildingRescaler()
+        processor.room_generator = processor.wall_generator = processor.opening_cutout_generator = Forbidden()
+        processor._save_pixel_building(building, scaled, tmp, "job_1")
+
+        result = processor.rescale_floorplan(
+            "job_1", output,
+            {"room_type": "room_3_0", "dimension_type": "width", "real_world_feet": 20.0},
+            ["obj"], tmp
+        )
+
+        assert "obj" in result.files
+        assert os.path.dirname(result.files["obj"]) == os.path.join(tmp, "job_1")
+    print("✅ Rescale re-exported without regeneration")
+
+
+def test_simple_pipeline_persists_pixel_building():
+    """The pipeline the API runs leaves a pixel-space building next to its exports."""
+    print("🧪 Testing simple pipeline pixel-space building...")
+
+    class FakeService:
+        def cache_fingerprint(self):
+            return {"model_version": None}
+
+        def process_image(self, file_content, job_id):
+            return make_cubicasa_output()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = SimpleTestPipeline(output_dir=tmp, cubicasa_service=FakeService(),
+                                      result_cache=ResultCache(tmp, max_bytes=0, enabled=False))
+        job = pipeline.process_test_image(b"image", "plan.png", ["obj"], job_id="42")
+        assert job.status == ProcessingStatus.COMPLETED, job.error_message
+        assert os.path.dirname(job.exported_files["obj"]) == os.path.join(tmp, "42")
+        assert job.cubicasa_output.room_bounding_boxes == make_cubicasa_output().room_bounding_boxes
+
+        pixel_path = os.path.join(tmp, "42", PIXEL_BUILDING_FILENAME)
+        rescaler = BuildingRescaler()
+        pixel_building = rescaler.load_pixel_building(pixel_path)
+        assert np.allclose(vertex_array(pixel_building.rooms), vertex_array(job.building_3d.rooms))
+
+        rescaled, result = rescaler.rescale_and_export(pixel_building, 8.0, ["obj"], os.path.join(tmp, "42"))
+        assert np.allclose(vertex_array(rescaled.rooms)[:, :2], vertex_array(job.building_3d.rooms)[:, :2] / 8.0)
+        assert "obj" in result.files
+    print("✅ Simple pipeline jobs can take the rescale fast path")
+
+
+if __name__ == "__main__":
+    test_rescale_matches_regeneration()
+    test_pixel_building_round_trip()
+    test_large_plan_transform_is_fast()
+    test_processor_rescale_skips_generators()
+    test_simple_pipeline_persists_pixel_building()
+    print("🎉 All building rescaler tests passed!")
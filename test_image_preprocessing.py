@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for CubiCasa5K image preprocessing (letterboxing and the input
+size ladder).
+
+Run with: python3 test_image_preprocessing.py
+"""
+
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.image_preprocessing import (
+    NETWORK_STRIDE,
+    choose_input_size,
+    letterbox_image,
+    open_image,
+    load_rgb
+)
+from test_post_processing import make_synthetic_prediction, make_service
+
+
+def make_image_bytes(size, image_format='PNG', mode='RGB'):
+    """Gradient image, so resampling differences show up."""
+    width, height = size
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2).astype(np.uint8)
+    image = Image.fromarray(pixels).convert(mode)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=95)
+    return buffer.getvalue()
+
+
+def test_input_size_ladder():
+    """The smallest fitting size is picked, rounded up to the network stride."""
+    print("🧪 Testing input size ladder...")
+
+    ladder = [1024, 512, 768]
+    assert choose_input_size(300, 200, ladder) == 512
+    assert choose_input_size(600, 700, ladder) == 768
+    assert choose_input_size(4096, 3000, ladder) == 1024
+    assert choose_input_size(100, 100, [500]) == 512
+    assert all(choose_input_size(w, h, [300, 700]) % NETWORK_STRIDE == 0 for w, h in [(10, 10), (5000, 10)])
+    print("✅ Input size ladder picks the expected sizes")
+
+
+def test_letterbox_keeps_aspect_ratio():
+    """Images are resized with their aspect ratio kept and padded with white."""
+    print("🧪 Testing letterbox preprocessing...")
+
+    for size, mode in [((800, 400), 'RGB'), ((300, 900), 'L'), ((512, 512), 'RGB'), ((120, 90), 'P')]:
+        tensor, letterbox = letterbox_image(make_image_bytes(size, mode=mode), [512])
+        width, height = letterbox.content_size
+
+        assert tensor.shape == (1, 3, 512, 512) and tensor.dtype == torch.float32
+        assert letterbox.original_size == size and letterbox.input_size == (512, 512)
+        assert max(width, height) == 512
+        assert abs(width / height - size[0] / size[1]) < 0.01
+        assert torch.all(tensor[:, :, height:, :] == 1.0) and torch.all(tensor[:, :, :, width:] == 1.0)
+        assert 0.0 <= tensor.min() and tensor.max() <= 1.0
+
+        outputs = torch.zeros(2, 44, 512, 512)
+        assert letterbox.crop(outputs).shape == (2, 44, height, width)
+    print("✅ Letterbox keeps aspect ratio and pads with white")
+
+
+def test_reduced_jpeg_decode():
+    """Reduced JPEG decoding matches a full decode resized to the same size."""
+    print("🧪 Testing reduced JPEG decode...")
+
+    image_bytes = make_image_bytes((4000, 3000), 'JPEG')
+    image = open_image(image_bytes)
+    reduced = load_rgb(image, (512, 384))
+    assert image.size == (1000, 750)  # decoded at 1/4 scale
+
+    full = np.asarray(Image.open(BytesIO(image_bytes)).convert('RGB').resize((512, 384), Image.BILINEAR))
+    assert reduced.shape == full.shape == (384, 512, 3)
+    assert np.abs(reduced.astype(int) - full.astype(int)).mean() < 2.0
+    print("✅ Reduced JPEG decode matches the full decode")
+
+
+def test_letterboxed_outputs_map_back_to_image():
+    """Post-processing the cropped output of a letterboxed input yields image-space rooms."""
+    print("🧪 Testing letterboxed output mapping...")
+
+    # A 256x256 room prediction placed in the top half of a 256x512 input, as
+    # for a 2:1 upload letterboxed with padding below
+    prediction = make_synthetic_prediction()
+    letterboxed = torch.full((1, 44, 512, 512), -10.0)
+    letterboxed[:, :, :256, :] = torch.nn.functional.interpolate(prediction, size=(256, 512), mode='bilinear')
+    _, letterbox = letterbox_image(make_image_bytes((1024, 512)), [512])
+    assert letterbox.content_size == (512, 256)
+
+    direct = make_service(postprocess_max_size=0)._postprocess_outputs(
+        torch.nn.functional.interpolate(prediction, size=(512, 1024), mode='bilinear'), (1024, 512))
+    cropped = make_service(postprocess_max_size=0)._postprocess_outputs(letterbox.crop(letterboxed), letterbox.original_size)
+    assert direct.room_bounding_boxes and direct.room_bounding_boxes.keys() == cropped.room_bounding_boxes.keys()
+    for name, box in direct.room_bounding_boxes.items():
+        for key, value in box.items():
+            assert abs(cropped.room_bounding_boxes[name][key] - value) <= 4
+    print("✅ Letterboxed outputs map back to image coordinates")
+
+
+def test_preprocess_image_uses_ladder():
+    """CubiCasaService._preprocess_image returns the input and its letterbox."""
+    print("🧪 Testing CubiCasaService preprocessing...")
+
+    service = make_service(input_sizes=[512, 768])
+    tensor, letterbox = service._preprocess_image(make_image_bytes((700, 350)))
+    assert tensor.shape == (1, 3, 768, 768)
+    assert letterbox.content_size == (768, 384)
+    print("✅ CubiCasaService preprocessing follows the ladder")
+
+
+if __name__ == "__main__":
+    test_input_size_ladder()
+    test_letterbox_keeps_aspect_ratio()
+    test_reduced_jpeg_decode()
+    test_letterboxed_outputs_map_back_to_image()
+    test_preprocess_image_uses_ladder()
+    print("🎉 All image preprocessing tests passed!")
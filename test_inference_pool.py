@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Test script for the CubiCasa5K inference worker pool.
+
+Workers load stand-ins (a fake service reporting its process, and
+CubiCasaService with the stand-in model of test_batched_inference), so
+dispatch, thread pinning, memory-ceiling restarts, crash recovery and the
+forwarded inference timings can be checked without the model weights.
+
+Run with: python3 test_inference_pool.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.inference_pool import InferencePool, InferencePoolError, current_rss_bytes
+from services.inference_stats import InferenceStats
+from services.cubicasa_service import CubiCasaError
+from test_batched_inference import StandInModel, make_image_bytes
+from test_post_processing import make_service
+
+
+class FakeService:
+    """Reports the worker it ran in; job ids select slow, failing, crashing or growing jobs."""
+
+    def __init__(self):
+        self.batcher = None
+        self.retained = []
+
+    def process_image(self, image_bytes, job_id):
+        if job_id == "slow":
+            time.sleep(0.3)
+        elif job_id == "fail":
+            raise ValueError("bad image")
+        elif job_id == "crash":
+            os._exit(3)
+        elif job_id == "grow":
+            self.retained.append(np.ones(64 * 1024 * 1024, dtype=np.uint8))
+        return {"pid": os.getpid(), "threads": torch.get_num_threads(), "size": len(image_bytes),
+                "rss": current_rss_bytes()}
+
+
+def make_stand_in_service():
+    """Worker-side loader: CubiCasaService around the stand-in model."""
+    return make_service(StandInModel(), max_batch_size=1)
+
+
+def fail_to_load():
+    raise RuntimeError("model weights missing")
+
+
+def start_pool(load_service, **kwargs):
+    pool = InferencePool(load_service, **kwargs)
+    pool.start()
+    assert pool.wait_ready(60)
+    return pool
+
+
+def test_pool_matches_in_process():
+    """Worker processes return the same CubiCasaOutput as in-process inference."""
+    print("🧪 Testing pool results against in-process inference...")
+
+    service = make_stand_in_service()
+    batch = [(make_image_bytes(shade), f"job_{shade}") for shade in (40, 120, 200, 250)]
+    expected = [service.process_image(image_bytes, job_id) for image_bytes, job_id in batch]
+
+    stats = InferenceStats()
+    pool = start_pool(make_stand_in_service, num_workers=2, inference_stats=stats)
+    try:
+        futures = [pool.submit(image_bytes, job_id) for image_bytes, job_id in batch]
+        results = [future.result(timeout=60) for future in futures]
+    finally:
+        pool.close()
+
+    assert [r.model_dump() for r in results] == [e.model_dump() for e in expected]
+    assert pool.stats()["jobs_run"] == 4
+
+    # Forward passes in the workers are recorded in the parent's stats
+    summary = stats.summary()
+    assert summary["total"] == 4 and summary["failures"] == 0
+    assert summary["last"]["success"] and summary["p50_ms"] > 0
+    print("✅ Pool results match in-process inference")
+
+
+def test_workers_pin_threads_and_run_concurrently():
+    """Jobs run in separate worker processes with the configured torch threads."""
+    print("🧪 Testing worker processes and thread pinning...")
+
+    pool = start_pool(FakeService, num_workers=2, threads_per_worker=2)
+    try:
+        start_time = time.perf_counter()
+        results = [f.result(timeout=10) for f in [pool.submit(b"x" * n, "slow") for n in range(1, 5)]]
+        elapsed = time.perf_counter() - start_time
+    finally:
+        pool.close()
+
+    pids = {result["pid"] for result in results}
+    assert pids == set(pool.worker_pids().values()) and os.getpid() not in pids
+    assert all(result["threads"] == 2 for result in results)
+    assert [result["size"] for result in results] == [1, 2, 3, 4]
+    assert elapsed < 4 * 0.3  # two at a time, not one after another
+    print(f"✅ 4 jobs on {len(pids)} workers in {elapsed:.2f}s")
+
+
+def test_errors_and_crashes():
+    """Failing jobs raise, crashed workers fail their job and are replaced."""
+    print("🧪 Testing job errors and worker crashes...")
+
+    pool = start_pool(FakeService, num_workers=1)
+    try:
+        first_pid = pool.worker_pids()[0]
+        try:
+            pool.process_image(b"x", "fail")
+            raise AssertionError("expected InferencePoolError")
+        except InferencePoolError as e:
+            assert "bad image" in str(e)
+        assert pool.worker_pids()[0] == first_pid
+
+        crashed = pool.submit(b"x", "crash")
+        queued = pool.submit(b"xy", "ok")
+        try:
+            crashed.result(timeout=10)
+            raise AssertionError("expected InferencePoolError")
+        except CubiCasaError as e:
+            assert "exit code 3" in str(e)
+
+        # The job queued behind the crash runs on the replacement worker
+        assert queued.result(timeout=10)["pid"] != first_pid
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.close()
+    print("✅ Errors raise and crashed workers are replaced")
+
+
+def test_memory_ceiling_restarts_worker():
+    """A worker over the memory ceiling retires after its job and is replaced."""
+    print("🧪 Testing worker memory ceiling...")
+
+    # Workers start well below the parent's RSS, so measure one first
+    pool = start_pool(FakeService, num_workers=1)
+    try:
+        ceiling_mb = pool.process_image(b"x", "ok")["rss"] // (1024 * 1024) + 32
+    finally:
+        pool.close()
+
+    pool = start_pool(FakeService, num_workers=1, max_rss_mb=ceiling_mb)
+    try:
+        pids = [pool.process_image(b"x", "grow")["pid"] for _ in range(3)]
+        small = pool.process_image(b"x", "ok")["pid"]
+        after_small = pool.process_image(b"x", "ok")["pid"]
+    finally:
+        pool.close()
+
+    assert len(set(pids)) == 3
+    assert small == after_small  # jobs that stay under the ceiling keep their worker
+    assert pool.stats()["restarts"] == 3
+    print(f"✅ Worker replaced after each job over {ceiling_mb} MB")
+
+
+def test_close_fails_queued_jobs():
+    """Closing the pool fails jobs that never reached a worker."""
+    print("🧪 Testing pool shutdown...")
+
+    pool = start_pool(FakeService, num_workers=1)
+    futures = [pool.submit(b"x", "slow") for _ in range(3)]
+    time.sleep(0.1)
+    pool.close()
+
+    failed = 0
+    for future in futures:
+        try:
+            future.result(timeout=10)
+        except InferencePoolError:
+            failed += 1
+    assert failed >= 2
+    try:
+        pool.submit(b"x", "ok")
+        raise AssertionError("expected InferencePoolError")
+    except InferencePoolError:
+        pass
+    print("✅ Queued jobs fail on shutdown")
+
+
+def test_workers_warm_up_before_ready():
+    """Workers run the dummy inferences before reporting ready, outside the job latencies."""
+    print("🧪 Testing worker warm-up...")
+
+    stats = InferenceStats()
+    pool = start_pool(make_stand_in_service, num_workers=2, inference_stats=stats, warmup_runs=2)
+    try:
+        assert set(pool.warmup_ms) == {512} and pool.warmup_ms[512] > 0
+        assert stats.summary()["total"] == 0
+        pool.process_image(make_image_bytes(120), "job_1")
+        assert stats.summary()["total"] == 1
+    finally:
+        pool.close()
+    print("✅ Workers are warmed up when the pool is ready")
+
+
+def test_workers_failing_to_load():
+    """Workers that cannot load the model are not restarted, and their jobs fail."""
+    print("🧪 Testing workers failing to load...")
+
+    pool = InferencePool(fail_to_load, num_workers=2)
+    pool.start()
+    queued = pool.submit(b"x", "ok")
+    try:
+        pool.wait_ready(60)
+        raise AssertionError("expected InferencePoolError")
+    except InferencePoolError as e:
+        assert "model weights missing" in str(e)
+    try:
+        queued.result(timeout=10)
+        raise AssertionError("expected InferencePoolError")
+    except InferencePoolError as e:
+        assert "model weights missing" in str(e)
+    try:
+        pool.submit(b"x", "ok")
+        raise AssertionError("expected InferencePoolError")
+    except InferencePoolError:
+        pass
+    assert pool.stats()["restarts"] == 0
+    pool.close()
+    print("✅ Load failures fail queued jobs without restart loops")
+
+
+if __name__ == "__main__":
+    test_pool_matches_in_process()
+    test_workers_pin_threads_and_run_concurrently()
+    test_errors_and_crashes()
+    test_memory_ceiling_restarts_worker()
+    test_close_fails_queued_jobs()
+    test_workers_warm_up_before_ready()
+    test_workers_failing_to_load()
+    print("🎉 All inference pool tests passed!")
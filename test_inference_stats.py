@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for inference stats and the cached CubiCasa5K health check.
+
+Uses the stand-in model of test_batched_inference, so forward passes can be
+counted: health checks within the TTL must not run one.
+
+Run with: python3 test_inference_stats.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.inference_stats import InferenceStats
+from test_batched_inference import StandInModel, make_image_bytes
+from test_post_processing import make_service
+
+
+class FailingModel(torch.nn.Module):
+    def forward(self, x):
+        raise RuntimeError("out of memory")
+
+
+def make_health_service(model, models_dir, health_ttl=60.0):
+    """Service around a stand-in model with the attributes health_check reports."""
+    return make_service(model, model_path=Path(models_dir) / "model.pkl", model_loaded=True,
+                        weights_source="cache", health_ttl=health_ttl)
+
+
+def test_rolling_percentiles():
+    """p50/p95 cover the most recent successful passes only."""
+    print("🧪 Testing rolling latency percentiles...")
+
+    stats = InferenceStats(window=100)
+    assert stats.summary()["p50_ms"] is None and stats.age() is None
+
+    for latency in range(1, 201):
+        stats.record(float(latency), True)
+    stats.record(0.5, False, error="boom")
+
+    summary = stats.summary()
+    assert summary["window"] == 100 and summary["total"] == 201 and summary["failures"] == 1
+    assert summary["p50_ms"] == 150.5 and summary["p95_ms"] == 195.1
+    assert summary["last"]["success"] is False and summary["last"]["error"] == "boom"
+    assert stats.age() < 1.0
+    print("✅ Percentiles follow the latency window")
+
+
+def test_health_check_uses_recent_inference():
+    """A recent job inference is reported without running the model again."""
+    print("🧪 Testing cached health check...")
+
+    model = StandInModel()
+    with tempfile.TemporaryDirectory() as models_dir:
+        service = make_health_service(model, models_dir)
+        service.process_image(make_image_bytes(120), "job_1")
+        assert model.calls == [1]
+
+        for _ in range(5):
+            health = service.health_check()
+        assert model.calls == [1]
+        assert health["status"] == "healthy" and health["test_passed"]
+        assert health["health_probe_run"] is False
+        assert health["inference_latency"]["total"] == 1
+        assert health["inference_latency"]["p50_ms"] == health["inference_latency"]["last"]["latency_ms"]
+    print("✅ Health checks within the TTL do not run inference")
+
+
+def test_health_check_probes_when_stale():
+    """Without a pass within the TTL, one probe inference runs."""
+    print("🧪 Testing health probe after the TTL...")
+
+    model = StandInModel()
+    with tempfile.TemporaryDirectory() as models_dir:
+        service = make_health_service(model, models_dir, health_ttl=0.2)
+        health = service.health_check()
+        assert health["health_probe_run"] and model.calls == [1]
+
+        service.health_check()
+        assert model.calls == [1]
+        time.sleep(0.3)
+        health = service.health_check()
+        assert health["health_probe_run"] and model.calls == [1, 1]
+        assert health["status"] == "healthy"
+    print("✅ Stale results trigger a single probe inference")
+
+
+def test_health_check_reports_failures():
+    """A failed pass makes the service degraded until a pass succeeds."""
+    print("🧪 Testing health check after failed inference...")
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        service = make_health_service(FailingModel(), models_dir)
+        health = service.health_check()
+        assert health["status"] == "degraded" and not health["test_passed"]
+        assert "out of memory" in health["error"]
+        assert health["inference_latency"]["failures"] == 1
+
+        # The cached failure is reported without probing again
+        health = service.health_check()
+        assert not health["health_probe_run"] and health["inference_latency"]["total"] == 1
+    print("✅ Failed inferences are reported as degraded")
+
+
+if __name__ == "__main__":
+    test_rolling_percentiles()
+    test_health_check_uses_recent_inference()
+    test_health_check_probes_when_stale()
+    test_health_check_reports_failures()
+    print("🎉 All inference stats tests passed!")
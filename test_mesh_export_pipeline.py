@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the export pipeline of MeshExporter.export_building.
+
+Run with: python3 test_mesh_export_pipeline.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.mesh_exporter import MeshExporter
+from scripts.benchmark_geometry import make_scaled_coordinates, build_building
+
+FORMATS = ["glb", "obj", "stl", "skp"]
+
+
+def make_building():
+    return build_building(make_scaled_coordinates(20))
+
+
+def test_single_combine_pass():
+    """All formats of one job share a single combined mesh."""
+    print("🧪 Testing single combine pass per export job...")
+
+    exporter = MeshExporter()
+    calls = []
+    combine = exporter._combine_building_meshes
+    exporter._combine_building_meshes = lambda building: calls.append(1) or combine(building)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = exporter.export_building(make_building(), FORMATS, tmp)
+
+    assert len(calls) == 1, len(calls)
+    assert {"glb", "obj", "stl"} <= set(result.files)
+    print(f"✅ {len(result.files)} files from one combine pass")
+
+
+def test_shared_mesh_output_matches_standalone_writers():
+    """Files written from the shared meshes equal the standalone export_* output."""
+    print("🧪 Testing shared-mesh output against standalone writers...")
+
+    exporter = MeshExporter()
+    building = make_building()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # SKP is left out: its OBJ fallback reuses the .obj file name
+        result = exporter.export_building(building, ["glb", "obj", "stl"], os.path.join(tmp, "job"))
+        standalone = {
+            "glb": exporter.export_glb(building, os.path.join(tmp, "standalone.glb")),
+            "obj": exporter.export_obj(building, os.path.join(tmp, "standalone.obj")),
+            "stl": exporter.export_stl(building, os.path.join(tmp, "standalone.stl"))
+        }
+
+        # GLB is converted to Y-up; OBJ/STL written after it must still be Z-up
+        for format_name, path in standalone.items():
+            assert Path(result.files[format_name]).read_bytes() == Path(path).read_bytes(), format_name
+    print("✅ Shared-mesh output matches standalone writers")
+
+
+def test_parallel_output_matches_serial():
+    """Concurrent format writers produce the same files and result as a serial export."""
+    print("🧪 Testing parallel export against serial export...")
+
+    exporter = MeshExporter()
+    building = make_building()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = exporter.export_building(building, FORMATS, os.path.join(tmp, "serial"), max_workers=1)
+        parallel = exporter.export_building(building, FORMATS, os.path.join(tmp, "parallel"), max_workers=4)
+
+        assert list(parallel.files) == list(serial.files)
+        assert parallel.summary["file_sizes"] == serial.summary["file_sizes"]
+        for format_name, path in serial.files.items():
+            assert Path(parallel.files[format_name]).read_bytes() == Path(path).read_bytes(), format_name
+    print(f"✅ Parallel export matches serial: {list(parallel.files)}")
+
+
+def test_formats_reported_as_they_finish():
+    """Each written format is reported once, in the calling thread, while writers run in the pool."""
+    print("🧪 Testing streamed format results...")
+
+    exporter = MeshExporter()
+    reported = []
+    threads = set()
+    writer_threads = set()
+    export_stl = exporter.export_stl
+
+    def tracking_export_stl(*args, **kwargs):
+        writer_threads.add(threading.current_thread().name)
+        return export_stl(*args, **kwargs)
+
+    def on_format_exported(format_name, file_path, file_size):
+        threads.add(threading.current_thread())
+        assert os.path.getsize(file_path) == file_size
+        reported.append(format_name)
+
+    exporter.export_stl = tracking_export_stl
+    with tempfile.TemporaryDirectory() as tmp:
+        result = exporter.export_building(
+            make_building(), ["glb", "stl", "obj"], tmp, max_workers=2, on_format_exported=on_format_exported
+        )
+
+    assert sorted(reported) == sorted(result.files)
+    assert threads == {threading.current_thread()}
+    assert all(name.startswith("mesh-export_") for name in writer_threads)
+    print(f"✅ Formats reported in completion order: {reported}")
+
+
+def test_diagnostics_off_skips_mesh_properties():
+    """Without an audit, export never builds trimesh's volume or topology caches."""
+    print("🧪 Testing export without mesh diagnostics...")
+
+    exporter = MeshExporter(diagnostics="off")
+    combined = []
+    combine = exporter._combine_building_meshes
+    exporter._combine_building_meshes = lambda building: combined.append(combine(building)) or combined[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = exporter.export_building(make_building(), ["glb", "obj", "stl"], tmp, max_workers=1)
+
+    cached = set(combined[0]._cache.cache)
+    assert result.mesh_audit is None
+    assert not cached & {"mass_properties", "is_watertight", "is_winding_consistent"}, cached
+    print("✅ No mesh diagnostics computed")
+
+
+def test_mesh_audit():
+    """The audit reports the combined mesh checks as data."""
+    print("🧪 Testing mesh audit...")
+
+    exporter = MeshExporter(diagnostics="audit")
+    building = make_building()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = exporter.export_building(building, ["glb"], tmp)
+
+    audit = result.mesh_audit
+    combined = exporter._combine_building_meshes(building)
+    assert audit.face_count == len(combined.faces) == building.total_faces
+    assert audit.vertex_count == len(combined.vertices)
+    assert abs(audit.volume - combined.volume) < 1e-6
+    assert audit.is_watertight == combined.is_watertight
+    assert audit.is_winding_consistent == combined.is_winding_consistent
+    assert audit.bounds["max_z"] == building.bounding_box["max_z"]
+    assert len(audit.room_volumes) == len(building.rooms)
+    assert result.model_dump()["mesh_audit"]["face_count"] == audit.face_count
+    print(f"✅ Mesh audit: watertight={audit.is_watertight}, {len(audit.oversized_rooms)} oversized rooms")
+
+
+if __name__ == "__main__":
+    test_single_combine_pass()
+    test_shared_mesh_output_matches_standalone_writers()
+    test_parallel_output_matches_serial()
+    test_formats_reported_as_they_finish()
+    test_diagnostics_off_skips_mesh_properties()
+    test_mesh_audit()
+    print("🎉 All mesh export pipeline tests passed!")
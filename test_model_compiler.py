@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script for TorchScript model compilation.
+
+Checks the trace + freeze path, the on-disk compiled-model cache next to
+the checkpoint, the mapped constants file and the eager fallback, using a small conv/BatchNorm model
+in place of the CubiCasa5K checkpoint.
+
+Run with: python3 test_model_compiler.py
+"""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.model_compiler import (
+    compiled_constants_path, compiled_model_path, compile_model, load_or_compile_model, share_constants
+)
+from services.weight_cache import load_weights
+from services.cubicasa_service import CubiCasaService
+
+INPUT_SHAPE = (1, 3, 32, 32)
+
+
+class SmallConvNet(torch.nn.Module):
+    """Conv -> BatchNorm -> ReLU stack with non-trivial BatchNorm statistics."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv1 = torch.nn.Conv2d(3, 8, kernel_size=3, padding=1)
+        self.bn1 = torch.nn.BatchNorm2d(8)
+        self.conv2 = torch.nn.Conv2d(8, 4, kernel_size=1)
+        self.bn2 = torch.nn.BatchNorm2d(4)
+        for bn in (self.bn1, self.bn2):
+            bn.running_mean.uniform_(-0.5, 0.5)
+            bn.running_var.uniform_(0.5, 1.5)
+            bn.weight.data.uniform_(0.5, 1.5)
+        self.eval()
+
+    def forward(self, x):
+        out = torch.relu(self.bn1(self.conv1(x)))
+        return self.bn2(self.conv2(out))
+
+
+class UntraceableNet(torch.nn.Module):
+    def forward(self, x):
+        raise RuntimeError("cannot trace")
+
+
+def make_checkpoint(directory):
+    checkpoint_path = Path(directory) / CubiCasaService.MODEL_FILENAME
+    checkpoint_path.write_bytes(b"checkpoint")
+    return checkpoint_path
+
+
+def test_compile_folds_batchnorm():
+    """Frozen model matches eager output with the BatchNorm layers folded away."""
+    print("🧪 Testing trace + freeze...")
+
+    model = SmallConvNet()
+    compiled = compile_model(model, INPUT_SHAPE)
+
+    kinds = [node.kind() for node in compiled.graph.nodes()]
+    assert "aten::batch_norm" not in kinds
+
+    x = torch.rand(2, 3, 32, 32)
+    with torch.no_grad():
+        assert torch.allclose(model(x), compiled(x), atol=1e-5)
+    print("✅ Compiled model matches eager model")
+
+
+def test_compiled_model_cache():
+    """The artifact is cached next to the checkpoint and reused until it goes stale."""
+    print("🧪 Testing compiled model cache...")
+
+    model = SmallConvNet()
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = make_checkpoint(tmp)
+
+        _, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "compiled"
+        assert compiled_model_path(checkpoint_path) == Path(tmp) / "model_best_val_loss_var.torchscript.pt"
+        assert compiled_model_path(checkpoint_path).exists()
+
+        cached, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "cache"
+        x = torch.rand(1, 3, 32, 32)
+        with torch.no_grad():
+            assert torch.allclose(model(x), cached(x), atol=1e-5)
+
+        # Only the final artifact is left in the models dir
+        assert not list(Path(tmp).glob("*.tmp"))
+
+        # A truncated artifact is recompiled and replaced
+        cache_path = compiled_model_path(checkpoint_path)
+        cache_path.write_bytes(cache_path.read_bytes()[:100])
+        _, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "compiled"
+        _, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "cache"
+
+        # Replacing the checkpoint invalidates the cache
+        time.sleep(0.01)
+        checkpoint_path.write_bytes(b"new checkpoint")
+        _, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "compiled"
+    print("✅ Compiled model cache reused and invalidated correctly")
+
+
+def constant_offsets(constants_path):
+    """Data offsets of the constants in the file, by constant index."""
+    with open(constants_path, "rb") as f:
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+    return [header[f"c{i}"]["data_offsets"][0] for i in range(len(header) - 1)]
+
+
+def graph_constants(module):
+    return [node.output().toIValue() for node in module.graph.nodes()
+            if node.kind() == "prim::Constant" and node.output().type().kind() == "TensorType"]
+
+
+def test_compiled_constants_shared():
+    """Loaded constants are rebound to the mapped constants file next to the artifact."""
+    print("🧪 Testing mapped compiled constants...")
+
+    model = SmallConvNet()
+    x = torch.rand(1, 3, 32, 32)
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = make_checkpoint(tmp)
+        constants_path = compiled_constants_path(checkpoint_path)
+
+        compiled, _ = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert constants_path == Path(tmp) / "model_best_val_loss_var.torchscript.safetensors"
+        assert constants_path.exists()
+        cached, source = load_or_compile_model(model, checkpoint_path, INPUT_SHAPE)
+        assert source == "cache"
+
+        # Every constant sits at its offset in the one mapping of the file
+        offsets = constant_offsets(constants_path)
+        for module in (compiled, cached):
+            pointers = [tensor.data_ptr() for tensor in graph_constants(module)]
+            assert len(pointers) == len(offsets) == 4
+            assert [p - pointers[0] for p in pointers] == [o - offsets[0] for o in offsets]
+            with torch.no_grad():
+                assert torch.allclose(model(x), module(x), atol=1e-5)
+
+        # A file from another compile is rewritten rather than mapped
+        loaded = torch.jit.load(str(compiled_model_path(checkpoint_path)))
+        assert share_constants(loaded, constants_path, "other key")
+        _, metadata = load_weights(constants_path)
+        assert metadata["compiled"] == "other key"
+        with torch.no_grad():
+            assert torch.allclose(model(x), loaded(x), atol=1e-5)
+
+        # A corrupt file is rewritten too
+        constants_path.write_bytes(b"\xff" * 16)
+        loaded = torch.jit.load(str(compiled_model_path(checkpoint_path)))
+        assert share_constants(loaded, constants_path, "other key")
+
+        # An unwritable location leaves the private constants in place
+        loaded = torch.jit.load(str(compiled_model_path(checkpoint_path)))
+        assert not share_constants(loaded, Path(tmp) / "missing" / constants_path.name, "other key")
+        with torch.no_grad():
+            assert torch.allclose(model(x), loaded(x), atol=1e-5)
+    print("✅ Compiled constants mapped from the shared file")
+
+
+def test_service_falls_back_to_eager():
+    """The service keeps the eager model when compilation fails and reports it."""
+    print("🧪 Testing eager fallback...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_checkpoint(tmp)
+        service = CubiCasaService(models_dir=tmp, load_model=False)
+        service.model = UntraceableNet()
+
+        service._compile_model()
+
+        assert service.compiled_model is None
+        assert service.inference_path == "eager"
+        assert "cannot trace" in service.compile_error
+    print("✅ Compilation failure falls back to eager mode")
+
+
+if __name__ == "__main__":
+    test_compile_folds_batchnorm()
+    test_compiled_model_cache()
+    test_compiled_constants_shared()
+    test_service_falls_back_to_eager()
+    print("🎉 All model compiler tests passed!")
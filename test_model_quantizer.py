@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for int8 model quantization.
+
+Quantizes a randomly initialised hg_furukawa_original at a small input size
+and checks the fp32/int8 accuracy comparison, without the CubiCasa5K
+checkpoint.
+
+Run with: python3 test_model_quantizer.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from models.data_structures import CubiCasaOutput
+from services.floortrans.models.hg_furukawa_original import hg_furukawa_original
+from services.model_quantizer import (
+    load_calibration_images,
+    quantize_model,
+    compare_outputs,
+    ModelQuantizationError
+)
+from test_batched_inference import StandInModel
+from test_post_processing import make_service
+
+CALIBRATION_DIR = Path(project_root) / "assets" / "calibration"
+
+
+def make_model():
+    """hg_furukawa_original with the 44-class head, without pretrained weights."""
+    torch.manual_seed(0)
+    model = hg_furukawa_original(51)
+    model.conv4_ = torch.nn.Conv2d(256, 44, bias=True, kernel_size=1)
+    model.upsample = torch.nn.ConvTranspose2d(44, 44, kernel_size=4, stride=4)
+    return model.eval()
+
+
+def make_output(rooms, walls=8):
+    return CubiCasaOutput(
+        wall_coordinates=[(0, 0)] * walls,
+        room_bounding_boxes={
+            name: {"min_x": box[0], "min_y": box[1], "max_x": box[2], "max_y": box[3]}
+            for name, box in rooms.items()
+        },
+        image_dimensions=(256, 256),
+        processing_time=0.0
+    )
+
+
+def test_calibration_set_bundled():
+    """The bundled calibration images are found and decodable."""
+    print("🧪 Testing bundled calibration set...")
+
+    images = load_calibration_images(CALIBRATION_DIR)
+    assert len(images) >= 2
+    service = make_service()
+    for _, image_bytes in images:
+        tensor, _ = service._preprocess_image(image_bytes)
+        assert tensor.shape == (1, 3, 512, 512)
+
+    try:
+        load_calibration_images(Path(tempfile.gettempdir()) / "missing_calibration_dir")
+        assert False, "expected ModelQuantizationError"
+    except ModelQuantizationError:
+        pass
+    print(f"✅ {len(images)} calibration images available")
+
+
+def test_quantized_model_tracks_fp32():
+    """int8 output stays highly correlated with fp32 and keeps an fp32 head."""
+    print("🧪 Testing static int8 quantization...")
+
+    model = make_model()
+    calibration = [torch.rand(1, 3, 64, 64) for _ in range(4)]
+    quantized = quantize_model(model, calibration)
+
+    x = torch.rand(2, 3, 64, 64)
+    with torch.no_grad():
+        reference = model(x)
+        output = quantized(x)
+
+    assert output.dtype == torch.float32
+    assert output.shape == reference.shape
+    correlation = torch.corrcoef(torch.stack([reference.flatten(), output.flatten()]))[0, 1]
+    assert correlation > 0.95, correlation
+    # Heatmap channels still go through the sigmoid
+    assert output[:, :21].min() >= 0 and output[:, :21].max() <= 1
+    # Original model is left in fp32
+    assert isinstance(model.conv1_, torch.nn.Conv2d)
+    print(f"✅ int8 output correlation with fp32: {correlation:.4f}")
+
+
+def test_compare_outputs():
+    """Rooms are matched by class and overlap, independent of their index."""
+    print("🧪 Testing fp32/int8 output comparison...")
+
+    reference = make_output({"room_3_0": (0, 0, 100, 100), "room_4_1": (100, 0, 200, 100)})
+    same = make_output({"room_4_0": (100, 0, 200, 100), "room_3_1": (0, 0, 100, 100)})
+    shifted = make_output({"room_3_0": (0, 0, 100, 90), "room_5_1": (100, 0, 200, 100)}, walls=12)
+
+    result = compare_outputs(reference, same)
+    assert result["mean_room_iou"] == 1.0
+    assert result["missing_rooms"] == 0 and result["extra_rooms"] == 0
+
+    result = compare_outputs(reference, shifted)
+    assert result["min_room_iou"] == 0.0
+    assert result["missing_rooms"] == 1 and result["extra_rooms"] == 1
+    assert result["wall_point_delta"] == 4
+    print("✅ Output comparison correct")
+
+
+def test_accuracy_check_on_calibration_set():
+    """The service accuracy check runs over the calibration set."""
+    print("🧪 Testing quantized accuracy check...")
+
+    model = StandInModel()
+    report = make_service(model, quantized_model=model, calibration_dir=CALIBRATION_DIR).check_quantized_accuracy()
+
+    assert report["images"] == len(load_calibration_images(CALIBRATION_DIR))
+    assert report["passed"]
+    assert report["mean_room_iou"] == 1.0
+    print("✅ Accuracy check report produced")
+
+
+if __name__ == "__main__":
+    test_calibration_set_bundled()
+    test_quantized_model_tracks_fp32()
+    test_compare_outputs()
+    test_accuracy_check_on_calibration_set()
+    print("🎉 All model quantizer tests passed!")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for the background model warm-up and readiness gate.
+
+Uses a stand-in service whose load blocks until released, so the states
+before readiness, queued uploads and the release of waiting jobs can be
+checked without the model weights.
+
+Run with: python3 test_model_warmup.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.model_warmup import ModelWarmup, ModelNotReadyError, warmup_sizes
+
+
+class SlowService:
+    """Records the shape of every inference."""
+
+    def __init__(self, input_sizes=(512, 768), tiled_inference=False, tile_size=512):
+        self.input_sizes = list(input_sizes)
+        self.tiled_inference = tiled_inference
+        self.tile_size = tile_size
+        self.shapes = []
+
+    def _run_inference(self, image_tensor):
+        self.shapes.append(tuple(image_tensor.shape))
+        return image_tensor
+
+
+class ReadyPool:
+    """Inference pool stand-in whose workers report their own warm-up."""
+
+    def __init__(self):
+        self.warmup_ms = {512: 12.5}
+        self.waited = False
+
+    def wait_ready(self, timeout=None):
+        self.waited = True
+        return True
+
+
+def make_warmup(service, runs=2, fail=False):
+    """Warm-up whose model load waits for the returned event."""
+    release = threading.Event()
+    pools = []
+
+    def load_service():
+        release.wait(10)
+        if fail:
+            raise RuntimeError("model download failed")
+        return service
+
+    warmup = ModelWarmup(enabled=True, runs=runs, load_service=load_service, start_pool=lambda: pools.append(1))
+    return warmup, release, pools
+
+
+def test_warmup_runs_each_input_size():
+    """Dummy inferences run at every input size, then the pool starts and the state is ready."""
+    print("🧪 Testing warm-up inferences...")
+
+    service = SlowService(input_sizes=[768, 500, 512])
+    warmup, release, pools = make_warmup(service, runs=2)
+    assert warmup.state == "pending" and not warmup.ready
+    warmup.start()
+    deadline = time.time() + 5
+    while warmup.state == "pending" and time.time() < deadline:
+        time.sleep(0.01)
+    assert warmup.state == "loading" and not warmup.ready
+
+    release.set()
+    assert warmup.wait(10) == "ready" and warmup.ready
+    assert service.shapes == [(1, 3, 512, 512)] * 2 + [(1, 3, 768, 768)] * 2
+    assert pools == [1]
+    status = warmup.status()
+    assert status["ready"] and set(status["warmup_ms"]) == {"512", "768"}
+    assert status["load_time_seconds"] is not None and status["queued_jobs"] == 0
+
+    assert warmup_sizes(SlowService(tiled_inference=True, tile_size=500)) == [512]
+    print("✅ Warm-up runs each input size before reporting ready")
+
+
+def test_pool_workers_run_the_warmup():
+    """With the pool enabled, the warm-up waits for its workers instead of running in-process."""
+    print("🧪 Testing warm-up in pool workers...")
+
+    service = SlowService()
+    pool = ReadyPool()
+    warmup = ModelWarmup(enabled=True, runs=2, load_service=lambda: service, start_pool=lambda: pool)
+    warmup.start()
+    assert warmup.wait(10) == "ready"
+    assert pool.waited and service.shapes == []
+    assert warmup.status()["warmup_ms"] == {"512": 12.5}
+    print("✅ Pool workers warm up before the model is reported ready")
+
+
+def test_uploads_queue_until_ready():
+    """Jobs waiting in the event loop are released together once the warm-up ends."""
+    print("🧪 Testing readiness gate...")
+
+    warmup, release, _ = make_warmup(SlowService(), runs=1)
+    warmup.start()
+
+    async def scenario():
+        released = []
+
+        async def job(name):
+            await warmup.wait_ready(10)
+            released.append(name)
+
+        jobs = [asyncio.create_task(job(n)) for n in range(3)]
+        await asyncio.sleep(0.05)
+        assert released == [] and warmup.status()["queued_jobs"] == 3
+
+        release.set()
+        await asyncio.gather(*jobs)
+        return released
+
+    assert sorted(asyncio.run(scenario())) == [0, 1, 2]
+    assert warmup.status()["queued_jobs"] == 0
+    print("✅ Queued uploads are released once the model is ready")
+
+
+def test_timeout_failure_and_disabled():
+    """Waits time out, a failed warm-up releases jobs, and a disabled warm-up never gates."""
+    print("🧪 Testing warm-up timeout, failure and disabled states...")
+
+    warmup, release, pools = make_warmup(SlowService(), fail=True)
+    warmup.start()
+    try:
+        asyncio.run(warmup.wait_ready(0.05))
+        raise AssertionError("expected ModelNotReadyError")
+    except ModelNotReadyError as e:
+        assert "loading" in str(e)
+
+    release.set()
+    assert asyncio.run(warmup.wait_ready(10)) == "failed"
+    assert not warmup.ready and "download failed" in warmup.status()["error"]
+    assert pools == []
+
+    disabled = ModelWarmup(enabled=False, load_service=lambda: 1 / 0)
+    disabled.start()
+    assert disabled.ready and disabled.state == "disabled"
+    assert asyncio.run(disabled.wait_ready(1)) == "disabled"
+    print("✅ Timeouts, failures and disabled warm-up behave as expected")
+
+
+if __name__ == "__main__":
+    test_warmup_runs_each_input_size()
+    test_pool_workers_run_the_warmup()
+    test_uploads_queue_until_ready()
+    test_timeout_failure_and_disabled()
+    print("🎉 All model warm-up tests passed!")
@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+Test script for floortrans post-processing.
+
+Runs get_polygons on a synthetic CubiCasa5K prediction (two rooms sharing
+a wall) so the post-processing pipeline can be checked without the model
+checkpoint.
+
+Run with: python3 test_post_processing.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.floortrans.post_prosessing import (
+    split_prediction,
+    get_polygons,
+    get_working_shape,
+    rescale_polygons,
+    extract_local_max,
+    calc_point_info,
+    find_icons,
+    extract_wall_polygon,
+    get_pxl_class,
+    get_rectangle_polygons,
+    get_polygon_class,
+    get_rectangle_class,
+    merge_rectangles,
+    remove_overlapping_walls,
+    remove_overlapping_openings,
+    polygon_intersection,
+    calc_polygon_dim,
+    rectangles_overlap,
+    rectangle_size,
+    get_door_evidence
+)
+from services.floortrans import post_prosessing
+from services.floortrans.profiling import profile_postprocessing, profile_stage
+from services.cubicasa_service import CubiCasaService, InferenceBatcher
+
+SPLIT = [21, 12, 11]
+
+# (min_x, min_y, max_x, max_y, room_class) on a 256x256 prediction grid
+SYNTHETIC_ROOMS = ((40, 40, 120, 160, 3), (120, 40, 200, 160, 4))
+
+
+def make_synthetic_prediction(height=256, width=256, rooms=SYNTHETIC_ROOMS, wall_half_width=4):
+    """
+    Build a (1, 44, height, width) prediction tensor for a row of rectangular rooms.
+
+    Wall junction heatmaps get a gaussian blob at every corner, the room
+    channels get high logits inside each room and on the wall band.
+    """
+    prediction = np.zeros((44, height, width), np.float32)
+    prediction[SPLIT[0]] = 5.0  # background room logit
+    yy, xx = np.mgrid[0:height, 0:width]
+
+    def add_junction(channel, x, y, sigma=3.0):
+        blob = np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * sigma ** 2))
+        prediction[channel] = np.maximum(prediction[channel], blob)
+
+    for x0, y0, x1, y1, room_class in rooms:
+        prediction[SPLIT[0] + room_class, y0:y1, x0:x1] = 10.0
+
+    w = wall_half_width
+    for x0, y0, x1, y1, _ in rooms:
+        for x in (x0, x1):
+            prediction[SPLIT[0] + 2, y0 - w:y1 + w, x - w:x + w] = 20.0
+        for y in (y0, y1):
+            prediction[SPLIT[0] + 2, y - w:y + w, x0 - w:x1 + w] = 20.0
+
+    xs = sorted({r[0] for r in rooms} | {r[2] for r in rooms})
+    top = min(r[1] for r in rooms)
+    bottom = max(r[3] for r in rooms)
+    for x in xs:
+        for y in (top, bottom):
+            if x == xs[0]:
+                channel = 6 if y == top else 5    # L junctions: right+down / up+right
+            elif x == xs[-1]:
+                channel = 7 if y == top else 4    # L junctions: down+left / up+left
+            else:
+                channel = 8 if y == top else 10   # T junctions
+            add_junction(channel, x, y)
+
+    return torch.from_numpy(prediction)[None]
+
+
+def run_get_polygons(prediction, shape):
+    """Split a prediction at the given (height, width) and run get_polygons."""
+    heatmaps, rooms, icons = split_prediction(prediction, shape, SPLIT)
+    return get_polygons((heatmaps, rooms, icons), 0.2, [1, 2])
+
+
+def make_service(model=None, max_batch_size=1, wait_ms=20.0, **settings):
+    """
+    CubiCasaService around a stand-in model, constructed without loading the checkpoint.
+
+    Post-processing runs at 256 px on a single 512 px input size unless
+    overridden; other keyword arguments replace service attributes
+    (e.g. tiled_inference=True, postprocess_max_size=0).
+    """
+    service = CubiCasaService(load_model=False)
+    service.model = model
+    service.postprocess_max_size = 256
+    service.room_merge = "grid"
+    service.profile_postprocessing = False
+    service.tiled_inference = False
+    service.input_sizes = [512]
+    for name, value in settings.items():
+        assert hasattr(service, name), f"CubiCasaService has no attribute {name}"
+        setattr(service, name, value)
+    service.max_batch_size = max_batch_size
+    service.batcher = InferenceBatcher(service._forward, max_batch_size, wait_ms) if max_batch_size > 1 else None
+    return service
+
+
+def test_synthetic_prediction():
+    """The synthetic prediction yields both rooms and the seven wall segments."""
+    print("🧪 Testing get_polygons on synthetic prediction...")
+
+    polygons, types, room_polygons, room_types = run_get_polygons(make_synthetic_prediction(), (256, 256))
+
+    walls = [t for t in types if t['type'] == 'wall']
+    rooms = {t['class']: p.bounds for p, t in zip(room_polygons, room_types) if not p.is_empty}
+
+    assert len(walls) == 7
+    assert rooms[3] == (40.0, 40.0, 120.0, 160.0)
+    assert rooms[4] == (120.0, 40.0, 200.0, 160.0)
+    print("✅ Synthetic prediction produces expected rooms and walls")
+
+
+def test_working_shape():
+    """Working shape keeps aspect ratio and never upsamples."""
+    print("🧪 Testing working shape computation...")
+
+    assert get_working_shape((4000, 3000), 1024) == (1024, 768)
+    assert get_working_shape((3000, 4000), 512) == (384, 512)
+    assert get_working_shape((600, 800), 1024) == (600, 800)
+    assert get_working_shape((4000, 3000), 0) == (4000, 3000)
+    print("✅ Working shape computation correct")
+
+
+def test_rescale_polygons():
+    """Polygons and room outlines are mapped back with per-axis factors."""
+    print("🧪 Testing polygon rescaling...")
+
+    polygons, types, room_polygons, room_types = run_get_polygons(make_synthetic_prediction(), (256, 256))
+    scaled, scaled_rooms = rescale_polygons(polygons, room_polygons, 2.0, 3.0)
+
+    assert scaled.dtype.kind == 'i'
+    assert np.array_equal(scaled[..., 0], polygons[..., 0] * 2)
+    assert np.array_equal(scaled[..., 1], polygons[..., 1] * 3)
+    for before, after in zip(room_polygons, scaled_rooms):
+        if before.is_empty:
+            continue
+        assert after.bounds == (before.bounds[0] * 2, before.bounds[1] * 3,
+                                before.bounds[2] * 2, before.bounds[3] * 3)
+    print("✅ Polygon rescaling correct")
+
+
+def test_capped_postprocessing_matches_full_resolution():
+    """Capped post-processing stays within a pixel tolerance of full resolution."""
+    print("🧪 Testing resolution-capped post-processing...")
+
+    prediction = make_synthetic_prediction()
+    original_size = (1600, 1200)  # width, height
+    tolerance = 1600 / 512 + 1
+
+    full = make_service(postprocess_max_size=0)._postprocess_outputs(prediction, original_size)
+    capped = make_service(postprocess_max_size=512)._postprocess_outputs(prediction, original_size)
+
+    assert full.room_bounding_boxes.keys() == capped.room_bounding_boxes.keys()
+    for room_name, full_box in full.room_bounding_boxes.items():
+        capped_box = capped.room_bounding_boxes[room_name]
+        for key in ("min_x", "max_x", "min_y", "max_y"):
+            assert abs(full_box[key] - capped_box[key]) <= tolerance, (room_name, key)
+
+    assert len(full.wall_coordinates) == len(capped.wall_coordinates)
+    for full_point, capped_point in zip(full.wall_coordinates, capped.wall_coordinates):
+        assert abs(full_point[0] - capped_point[0]) <= tolerance
+        assert abs(full_point[1] - capped_point[1]) <= tolerance
+    print("✅ Capped post-processing within tolerance")
+
+
+def reference_extract_local_max(mask_img, num_points, info, heatmap_value_threshold=0.5,
+                                close_point_suppression=False, gap=10):
+    """Original peak extraction with the recursive flood fill, for comparison."""
+    mask = mask_img.copy()
+    height, width = mask.shape
+    points = []
+
+    def suppress(x, y):
+        value = mask[y][x]
+        mask[y][x] = -1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                if heatmap_value_threshold < mask[ny][nx] <= value:
+                    suppress(nx, ny)
+
+    for _ in range(num_points):
+        y, x = np.unravel_index(np.argmax(mask), mask.shape)
+        max_value = mask[y, x]
+        if max_value <= heatmap_value_threshold:
+            return points
+        points.append([int(x), int(y)] + info + [max_value, ])
+        suppress(x, y)
+        if close_point_suppression:
+            mask[max(y - gap, 0):min(y + gap, height - 1),
+                 max(x - gap, 0):min(x + gap, width - 1)] = 0
+
+    return points
+
+
+def make_peaky_heatmap(rng, size=48, num_blobs=12):
+    """Gaussian blobs plus noise, quantized so plateaus and ties occur."""
+    yy, xx = np.mgrid[0:size, 0:size]
+    heatmap = np.zeros((size, size), np.float32)
+    for _ in range(num_blobs):
+        x, y = rng.uniform(0, size, 2)
+        sigma = rng.uniform(1.0, 6.0)
+        heatmap = np.maximum(heatmap, rng.uniform(0.3, 1.0) * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * sigma ** 2)))
+    heatmap += rng.normal(0, 0.03, heatmap.shape)
+    return np.round(heatmap, 1).astype(np.float32)
+
+
+def test_peak_extraction_matches_recursive_suppression():
+    """Peaks, their order and values equal the recursive flood-fill version."""
+    print("🧪 Testing peak extraction against recursive suppression...")
+
+    rng = np.random.default_rng(0)
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(10000)
+    try:
+        for _ in range(40):
+            heatmap = make_peaky_heatmap(rng)
+            for close_point_suppression in (False, True):
+                expected = reference_extract_local_max(heatmap, 100, [1, 2], 0.2, close_point_suppression)
+                points = extract_local_max(heatmap, 100, [1, 2], 0.2, close_point_suppression)
+                assert points == expected
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+    print("✅ Peak extraction matches recursive suppression")
+
+
+def test_peak_extraction_on_large_plateau():
+    """A plateau far beyond the recursion limit is suppressed in one go."""
+    print("🧪 Testing peak extraction on a large plateau...")
+
+    heatmap = np.full((1024, 1024), 0.9, np.float32)
+    heatmap[700, 300] = 1.0
+    points = extract_local_max(heatmap, 100, [0, 0], 0.5)
+
+    assert [point[:2] for point in points] == [[300, 700]]
+    assert heatmap[700, 300] == 1.0  # input is not modified
+    print("✅ Large plateau handled without recursion")
+
+
+POINT_ORIENTATIONS = [[(2, ), (3, ), (0, ), (1, )],
+                      [(0, 3), (0, 1), (1, 2), (2, 3)],
+                      [(1, 2, 3), (0, 2, 3), (0, 1, 3), (0, 1, 2)],
+                      [(0, 1, 2, 3)]]
+
+
+def make_junction_cloud(rng, num_points, size=512, grid=16):
+    """Random junctions snapped near a coarse grid so many of them line up."""
+    points = []
+    for _ in range(num_points):
+        x, y = rng.integers(0, size // grid, 2) * grid + rng.integers(-3, 4, 2)
+        point_type = int(rng.integers(0, 4))
+        subtype = int(rng.integers(0, len(POINT_ORIENTATIONS[point_type])))
+        points.append([int(x), int(y), point_type, subtype, float(rng.uniform(0.2, 1.0))])
+    return points
+
+
+def all_points_with_orientation(index, orientation, c, min_value, max_value):
+    """Full scan over the points with the orientation, as before the strip index."""
+    return list(index[orientation][c][1])
+
+
+def test_point_pairing_matches_full_scan():
+    """Strip-indexed pairing returns the same lines, maps and icons as a full scan."""
+    print("🧪 Testing indexed junction pairing against a full scan...")
+
+    rng = np.random.default_rng(0)
+    size = 512
+    orientation_ranges = [[size, 0, 0, 0],
+                          [size, size, size, 0],
+                          [size, size, 0, size],
+                          [0, size, 0, 0]]
+    original_points_in_strip = post_prosessing.points_in_strip
+    for num_points in (0, 1, 30, 150, 400):
+        points = make_junction_cloud(rng, num_points, size)
+        calls = [
+            lambda: calc_point_info(points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size),
+            lambda: calc_point_info(points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size, True),
+            lambda: calc_point_info(points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size, True, True),
+            lambda: find_icons(points, 10, POINT_ORIENTATIONS, orientation_ranges, size, size, False),
+        ]
+        for call in calls:
+            indexed = call()
+            post_prosessing.points_in_strip = all_points_with_orientation
+            try:
+                expected = call()
+            finally:
+                post_prosessing.points_in_strip = original_points_in_strip
+            assert indexed == expected
+    print("✅ Indexed junction pairing matches full scan")
+
+
+def reference_extract_wall_polygon(wall, wall_points, segmentation, seg_class):
+    """Original wall polygon with a per-pixel walk across the line, for comparison."""
+    _, height, width = segmentation.shape
+    (x1, y1), (x2, y2) = wall_points[wall[0]][:2], wall_points[wall[1]][:2]
+    vertical = not x2 - x1 > y2 - y1
+    step = (0, 1) if vertical else (1, 0)
+    widths = []
+    for j0, i0 in post_prosessing.bresenham_line(x1, y1, x2, y2):
+        total = 1
+        for sign in (1, -1):
+            j, i = j0 + sign * step[0], i0 + sign * step[1]
+            while 0 <= j < height and 0 <= i < width and get_pxl_class(i, j, segmentation) in seg_class:
+                total += 1
+                j, i = j + sign * step[0], i + sign * step[1]
+        widths.append(total)
+
+    wall_width = post_prosessing.stats.mode(np.array(widths, float)).mode
+    wall_width = min(wall_width, y2 - y1 if vertical else x2 - x1)
+    w_delta = int(wall_width / 2.0)
+    if w_delta == 0:
+        return None
+    if vertical:
+        polygon = np.array([[x1 - w_delta, y1], [x1 + w_delta, y1], [x2 + w_delta, y2], [x2 - w_delta, y2]])
+    else:
+        polygon = np.array([[x1, y1 - w_delta], [x2, y2 - w_delta], [x2, y2 + w_delta], [x1, y1 + w_delta]])
+    polygon[:, 0] = np.clip(polygon[:, 0], 0, width)
+    polygon[:, 1] = np.clip(polygon[:, 1], 0, height)
+    return wall_width, polygon
+
+
+def test_wall_polygons_match_pixel_walk():
+    """Run-length wall widths give the same polygons as walking each pixel."""
+    print("🧪 Testing wall thickness from run-length maps...")
+
+    rng = np.random.default_rng(0)
+    seg_class = [2, 8]
+    for _ in range(20):
+        segmentation = rng.random((12, 64, 80)).astype(np.float32)
+        # Wall bands so the walks see long runs, plus random wall pixels
+        segmentation[2, :, 30:36] += 1.0
+        segmentation[8, 20:27, :] += 1.0
+        points = [[int(x), int(y), 0, 0] for x, y in rng.integers(0, 64, (8, 2))] + [[0, 0, 0, 0], [79, 63, 0, 0]]
+        for wall in [(a, b) for a in range(len(points)) for b in range(len(points)) if a != b]:
+            expected = reference_extract_wall_polygon(wall, points, segmentation, seg_class)
+            result = extract_wall_polygon(wall, points, segmentation, seg_class)
+            if expected is None:
+                assert result is None
+            else:
+                assert result[0] == expected[0]
+                assert np.array_equal(result[1], expected[1])
+    print("✅ Wall thickness matches pixel walk")
+
+
+def test_rectangle_class_matches_rasterized_polygon():
+    """Grid cells get the same class from the slice as from the rasterized polygon."""
+    print("🧪 Testing grid cell classification...")
+
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        # Blocky class map so cells have clear winners, noise so some tie
+        segmentation = np.kron(rng.integers(0, 12, (12, 15)), np.ones((8, 8), int))
+        segmentation = np.where(rng.random(segmentation.shape) < 0.2, rng.integers(0, 12, segmentation.shape), segmentation)
+        junction_points = np.stack([rng.integers(0, 120, 40), rng.integers(0, 96, 40)], axis=1)
+        for polygon in get_rectangle_polygons(junction_points, segmentation.shape):
+            assert get_rectangle_class(polygon, segmentation) == get_polygon_class(polygon, segmentation)
+    print("✅ Grid cell classification matches rasterized polygons")
+
+
+def test_grid_merge_matches_shapely_union():
+    """Grid-native room merge gives the same outlines as the shapely union."""
+    print("🧪 Testing grid room merge against shapely union...")
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        junction_points = np.stack([rng.integers(0, 200, 12), rng.integers(0, 150, 12)], axis=1)
+        rectangles = list(get_rectangle_polygons(junction_points, (150, 200)))
+        room_types = [{'type': 'room', 'class': int(room_class)}
+                      for room_class in rng.integers(0, 4, len(rectangles))]
+
+        expected, expected_types = merge_rectangles(rectangles, room_types, 'shapely')
+        merged, merged_types = merge_rectangles(rectangles, room_types, 'grid')
+
+        assert all(polygon.is_valid for polygon in merged)
+        # Zero-area cells on the image border only survive the shapely union
+        expected = [(p, t) for p, t in zip(expected, expected_types) if p.area > 0]
+        assert len(merged) == len(expected)
+        for polygon, room_type in expected:
+            assert sum(polygon.equals(other) and room_type == other_type
+                       for other, other_type in zip(merged, merged_types)) == 1
+    print("✅ Grid room merge matches shapely union")
+
+
+def reference_remove_overlapping_walls(walls, types, wall_lines):
+    """Original all-pairs wall overlap removal, for comparison."""
+    to_be_removed = set()
+    for i, wall1 in enumerate(walls):
+        x_min1, x_max1, y_min1, y_max1 = min(wall1[:, 0]), max(wall1[:, 0]), min(wall1[:, 1]), max(wall1[:, 1])
+        label_area = np.sqrt((x_max1 - x_min1)**2 + (y_max1 - y_min1)**2)
+        for j in range(i + 1, len(walls)):
+            wall2 = walls[j]
+            if calc_polygon_dim(wall1) == calc_polygon_dim(wall2):
+                x_min2, x_max2, y_min2, y_max2 = min(wall2[:, 0]), max(wall2[:, 0]), min(wall2[:, 1]), max(wall2[:, 1])
+                intersection = polygon_intersection(x_min1, x_max1, y_min1, y_max1, x_min2, x_max2, y_min2, y_max2)
+                pred_area = np.sqrt((x_max2 - x_min2)**2 + (y_max2 - y_min2)**2)
+                with np.errstate(invalid='ignore'):
+                    iou = intersection / (pred_area + label_area - intersection)
+                if iou > 0.4:
+                    to_be_removed.add(i if label_area > pred_area else j)
+    kept = [i for i in range(len(walls)) if i not in to_be_removed]
+    return walls[kept], [types[i] for i in kept], [wall_lines[i] for i in kept]
+
+
+def reference_remove_overlapping_openings(polygons, types, classes):
+    """Original all-pairs opening overlap removal, for comparison."""
+    opening_types = classes['window'] + classes['door']
+    good_openings = []
+    for i, t in enumerate(types):
+        keep = True
+        if t['type'] == 'icon' and int(t['class']) in opening_types:
+            for j, tt in enumerate(types):
+                if not (polygons[j] == polygons[i]).all() and tt['type'] == 'icon' and int(tt['class']) in opening_types:
+                    if rectangles_overlap(polygons[j], polygons[i]):
+                        size_i, size_j = rectangle_size(polygons[i]), rectangle_size(polygons[j])
+                        if (size_i == size_j and tt['prob'] > t['prob']) or size_i < size_j:
+                            keep = False
+                            break
+        good_openings.append(keep)
+    return polygons[np.array(good_openings)], [t for t, good in zip(types, good_openings) if good]
+
+
+def make_boxes(rng, count, size=200, max_length=60, max_width=8):
+    """Random thin axis-aligned boxes on a coarse grid, as (n, 4, 2) corner arrays."""
+    boxes = []
+    for _ in range(count):
+        x, y = rng.integers(0, size // 4, 2) * 4
+        length, width = rng.integers(0, max_length), rng.integers(0, max_width)
+        w, h = (length, width) if rng.random() < 0.5 else (width, length)
+        boxes.append([[x, y], [x + w, y], [x + w, y + h], [x, y + h]])
+    return np.array(boxes, dtype=int).reshape(-1, 4, 2)
+
+
+def test_overlap_removal_matches_all_pairs():
+    """Sweep-based wall and opening overlap removal equals the all-pairs version."""
+    print("🧪 Testing sweep overlap removal against all pairs...")
+
+    rng = np.random.default_rng(0)
+    classes = {'door': [2], 'window': [1]}
+    for count in (0, 1, 2, 30, 150):
+        for _ in range(5):
+            walls = make_boxes(rng, count)
+            types = [{'type': 'wall', 'class': 2} for _ in range(count)]
+            lines = [(i, i + 1, 2) for i in range(count)]
+            expected = reference_remove_overlapping_walls(walls, types, lines)
+            result = remove_overlapping_walls(walls, types, lines)
+            assert np.array_equal(result[0], expected[0]) and result[1:] == expected[1:]
+
+            polygons = make_boxes(rng, count, max_length=20, max_width=20)
+            if count > 3:
+                polygons[1] = polygons[0]  # identical openings are not compared
+            types = [{'type': ('icon', 'wall')[int(rng.integers(0, 4) == 0)],
+                      'class': int(rng.integers(0, 4)), 'prob': float(rng.integers(0, 3))}
+                     for _ in range(count)]
+            if count == 0:
+                continue
+            expected = reference_remove_overlapping_openings(polygons, types, classes)
+            result = remove_overlapping_openings(polygons, types, classes)
+            assert np.array_equal(result[0], expected[0]) and result[1] == expected[1]
+    print("✅ Sweep overlap removal matches all pairs")
+
+
+def reference_door_evidence(door_points, door_lines, icons_seg, door_offset=23, num_door_types=2):
+    """Original per-pixel door type voting on the 30 channel label map, for comparison."""
+    _, height, width = icons_seg.shape
+    label_map = np.zeros((30, height, width))
+    label_map[:len(icons_seg)] = icons_seg
+    evidence = []
+    for line in door_lines:
+        point, neighbor_point = door_points[line[0]], door_points[line[1]]
+        line_dim = post_prosessing.calc_line_dim(door_points, line)
+        fixed_value = int(round((neighbor_point[1 - line_dim] + point[1 - line_dim]) / 2))
+        sums = [0] * num_door_types
+        for delta in range(int(abs(neighbor_point[line_dim] - point[line_dim]) + 1)):
+            intermediate_point = [0, 0]
+            intermediate_point[line_dim] = int(min(neighbor_point[line_dim], point[line_dim]) + delta)
+            intermediate_point[1 - line_dim] = fixed_value
+            for type_index in range(num_door_types):
+                sums[type_index] += label_map[door_offset + type_index][min(max(intermediate_point[1], 0), height - 1)][
+                    min(max(intermediate_point[0], 0), width - 1)]
+        evidence.append(sums)
+    return np.array(evidence).reshape(-1, num_door_types)
+
+
+def test_door_evidence_matches_label_map_voting():
+    """Door type evidence gathered along each line equals the label map voting."""
+    print("🧪 Testing door type evidence...")
+
+    rng = np.random.default_rng(0)
+    door_points = [[int(x), int(y), 0, 0] for x, y in rng.integers(-2, 66, (20, 2))]
+    door_lines = [(a, b) for a in range(20) for b in range(a + 1, 20)]
+    for channels in (SPLIT[2], 25, 30):
+        icons_seg = rng.random((channels, 64, 64)).astype(np.float32)
+        evidence = get_door_evidence(door_points, door_lines, icons_seg, 23, 2)
+        assert np.allclose(evidence, reference_door_evidence(door_points, door_lines, icons_seg))
+        if channels == SPLIT[2]:
+            assert not evidence.any()  # the model's 11 icon channels have no door types
+    assert get_door_evidence(door_points, [], icons_seg, 23, 2).shape == (0, 2)
+    print("✅ Door type evidence matches label map voting")
+
+
+def test_stage_profile():
+    """Profiling reports every post-processing stage without changing the result."""
+    print("🧪 Testing post-processing stage profile...")
+    import tracemalloc
+
+    prediction = make_synthetic_prediction()
+    service = make_service(postprocess_max_size=0)
+    plain = service._postprocess_outputs(prediction, (256, 256))
+    assert plain.postprocess_profile is None
+
+    service.profile_postprocessing = True
+    profiled = service._postprocess_outputs(prediction, (256, 256))
+    assert not tracemalloc.is_tracing()
+    assert profiled.model_dump(exclude={"postprocess_profile"}) == plain.model_dump(exclude={"postprocess_profile"})
+
+    profile = profiled.postprocess_profile
+    stages = ["peak_extraction", "line_finding", "wall_polygons", "icons", "openings",
+              "grid_classification", "room_merge", "get_polygons"]
+    assert sorted(profile) == sorted(stages)
+    assert profile["get_polygons"].calls == 1
+    assert profile["peak_extraction"].calls == 13 + 4 + 4  # wall, opening and icon heatmaps
+    assert all(profile[stage].peak_alloc_bytes > 0 for stage in stages)
+    assert profile["get_polygons"].peak_alloc_bytes >= profile["grid_classification"].peak_alloc_bytes
+    nested = sum(profile[stage].wall_time_ms for stage in ["wall_polygons", "icons", "openings",
+                                                            "grid_classification", "room_merge"])
+    assert nested <= profile["get_polygons"].wall_time_ms
+
+    # Stages outside profile_postprocessing record nothing
+    with profile_postprocessing() as profiler:
+        with profile_stage("outer"):
+            with profile_stage("inner"):
+                block = np.ones(1 << 20, dtype=np.uint8)
+            del block
+    with profile_stage("outside"):
+        pass
+    report = profiler.report()
+    assert list(report) == ["inner", "outer"]
+    assert report["outer"]["peak_alloc_bytes"] >= report["inner"]["peak_alloc_bytes"] >= 1 << 20
+    print("✅ Stage profile covers every stage and leaves the result unchanged")
+
+
+def test_concurrent_stage_profiles():
+    """A job finishing its profile does not stop tracing for a job still being profiled."""
+    print("🧪 Testing concurrent stage profiles...")
+    import threading
+    import tracemalloc
+
+    long_started = threading.Event()
+    first_done = threading.Event()
+    reports = {}
+
+    def long_job():
+        with profile_postprocessing() as profiler:
+            with profile_stage("long"):
+                long_started.set()
+                first_done.wait(10)
+                assert tracemalloc.is_tracing()
+                block = np.ones(4 << 20, dtype=np.uint8)
+                del block
+        reports["long"] = profiler.report()
+
+    # The first job starts tracing and ends while the second is still profiling
+    with profile_postprocessing() as profiler:
+        thread = threading.Thread(target=long_job)
+        with profile_stage("short"):
+            thread.start()
+            long_started.wait(10)
+    first_done.set()
+    thread.join()
+
+    assert not tracemalloc.is_tracing()
+    assert profiler.report()["short"]["calls"] == 1
+    assert reports["long"]["long"]["peak_alloc_bytes"] >= 3 << 20
+    print("✅ Overlapping profiles keep tracing until the last one ends")
+
+
+if __name__ == "__main__":
+    test_synthetic_prediction()
+    test_working_shape()
+    test_rescale_polygons()
+    test_capped_postprocessing_matches_full_resolution()
+    test_peak_extraction_matches_recursive_suppression()
+    test_peak_extraction_on_large_plateau()
+    test_point_pairing_matches_full_scan()
+    test_wall_polygons_match_pixel_walk()
+    test_rectangle_class_matches_rasterized_polygon()
+    test_grid_merge_matches_shapely_union()
+    test_overlap_removal_matches_all_pairs()
+    test_door_evidence_matches_label_map_voting()
+    test_stage_profile()
+    test_concurrent_stage_profiles()
+    print("🎉 All post-processing tests passed!")
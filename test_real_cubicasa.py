@@ -57,15 +57,15 @@ def test_real_cubicasa():
     
     try:
         # Preprocess image
-        image_tensor, original_size = service._preprocess_image(image_bytes)
-        print(f"   Image preprocessed: {original_size} -> {image_tensor.shape}")
+        image_tensor, letterbox = service._preprocess_image(image_bytes)
+        print(f"   Image preprocessed: {letterbox.original_size} -> {image_tensor.shape}")
         
         # Run inference
         outputs = service._run_inference(image_tensor)
         print(f"   Model inference completed: {outputs.shape}")
         
         # Post-process outputs
-        result = service._postprocess_outputs(outputs, original_size)
+        result = service._postprocess_outputs(letterbox.crop(outputs), letterbox.original_size)
         processing_time = time.time() - start_time
         
         print(f"✅ Processing completed in {processing_time:.2f}s")
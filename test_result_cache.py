@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the CubiCasa5K result cache.
+
+Run with: python3 test_result_cache.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from models.data_structures import CubiCasaOutput
+from services.result_cache import ResultCache
+from core.floorplan_processor import FloorPlanProcessor
+from services.test_pipeline import SimpleTestPipeline
+
+FINGERPRINT = {"model_version": "model_best_val_loss_var.pkl:1:1", "heatmap_threshold": 0.2}
+
+
+def make_output(rooms=1):
+    return CubiCasaOutput(
+        wall_coordinates=[(10, 10), (100, 10)],
+        room_bounding_boxes={
+            f"room_3_{i}": {"min_x": 10, "max_x": 100, "min_y": 10, "max_y": 80} for i in range(rooms)
+        },
+        image_dimensions=(256, 256),
+        processing_time=1.5
+    )
+
+
+class CountingService:
+    """Stands in for CubiCasaService and counts inference calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def cache_fingerprint(self):
+        return FINGERPRINT
+
+    def process_image(self, image_bytes, job_id):
+        self.calls += 1
+        return make_output()
+
+
+def test_cache_hit_and_miss():
+    """Identical bytes and fingerprint hit; any change misses."""
+    print("🧪 Testing result cache hits and misses...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp, max_bytes=1024 * 1024)
+        key = cache.make_key(b"image", FINGERPRINT)
+
+        assert cache.get(key) is None
+        cache.put(key, make_output())
+        assert cache.get(key) == make_output()
+
+        assert cache.make_key(b"image2", FINGERPRINT) != key
+        assert cache.make_key(b"image", dict(FINGERPRINT, heatmap_threshold=0.3)) != key
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["entries"] == 1 and stats["size_bytes"] > 0
+    print("✅ Hits and misses counted correctly")
+
+
+def test_cache_lru_eviction_and_reload():
+    """Least recently used entries go first and the order survives a restart."""
+    print("🧪 Testing result cache LRU eviction...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entry_size = len(make_output().model_dump_json())
+        cache = ResultCache(tmp, max_bytes=entry_size * 2)
+
+        cache.put("a", make_output())
+        cache.put("b", make_output())
+        assert cache.get("a") is not None  # "b" is now least recently used
+        cache.put("c", make_output())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+        reloaded = ResultCache(tmp, max_bytes=entry_size * 2)
+        assert reloaded.get_stats()["entries"] == 2
+        assert reloaded.get("c") == make_output()
+    print("✅ LRU eviction and reload correct")
+
+
+def test_corrupt_entry_is_a_miss():
+    """A truncated entry is dropped instead of failing the job."""
+    print("🧪 Testing corrupt cache entry handling...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp, max_bytes=1024 * 1024)
+        cache.put("a", make_output())
+        (cache.cache_dir / "a.json").write_text("{")
+
+        assert cache.get("a") is None
+        assert cache.get_stats()["entries"] == 0
+    print("✅ Corrupt entry discarded")
+
+
+def test_processor_consults_cache():
+    """FloorPlanProcessor runs inference once for repeated uploads."""
+    print("🧪 Testing processor cache lookup...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = FloorPlanProcessor.__new__(FloorPlanProcessor)
+        processor.cubicasa_service = CountingService()
+        processor.inference_pool = None
+        processor.result_cache = ResultCache(tmp, max_bytes=1024 * 1024)
+
+        first = processor._analyze_image(b"floorplan", "job_1")
+        second = processor._analyze_image(b"floorplan", "job_2")
+        processor._analyze_image(b"other floorplan", "job_3")
+
+        assert first == second
+        assert processor.cubicasa_service.calls == 2
+        assert processor.result_cache.get_stats()["hits"] == 1
+    print("✅ Repeated upload served from cache")
+
+
+def test_test_pipeline_consults_cache():
+    """The API upload pipeline runs inference once for repeated uploads."""
+    print("🧪 Testing test pipeline cache lookup...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = CountingService()
+        cache = ResultCache(os.path.join(tmp, "cache"), max_bytes=1024 * 1024)
+        pipeline = SimpleTestPipeline(output_dir=tmp, cubicasa_service=service, result_cache=cache)
+
+        first = pipeline._analyze_image(b"floorplan", "1")
+        second = pipeline._analyze_image(b"floorplan", "2")
+
+        assert first == second
+        assert service.calls == 1
+        assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+    print("✅ Repeated API upload served from cache")
+
+
+if __name__ == "__main__":
+    test_cache_hit_and_miss()
+    test_cache_lru_eviction_and_reload()
+    test_corrupt_entry_is_a_miss()
+    test_processor_consults_cache()
+    test_test_pipeline_consults_cache()
+    print("🎉 All result cache tests passed!")
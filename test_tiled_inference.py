@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for tiled CubiCasa5K inference.
+
+Uses a per-pixel stand-in model in place of the CubiCasa5K checkpoint, so
+blending overlapping tile outputs can be compared against running the model
+on the whole canvas at once.
+
+Run with: python3 test_tiled_inference.py
+"""
+
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services.tiled_inference import align_tiling, plan_tiles, make_tiles, stitch_tiles, tile_count
+from test_post_processing import make_service
+
+
+class PixelModel(torch.nn.Module):
+    """1x1 convolution to the 44 CubiCasa5K channels, so every tile agrees on shared pixels."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.conv = torch.nn.Conv2d(3, 44, kernel_size=1)
+        self.calls = []
+
+    def forward(self, x):
+        self.calls.append(x.shape[0])
+        return self.conv(x)
+
+
+def make_tiled_service(model, tile_size=128, overlap=16, max_tiles=6, max_batch_size=4):
+    """CubiCasaService with tiled inference around a stand-in model."""
+    service = make_service(model, tiled_inference=True, tile_size=tile_size, tile_overlap=overlap, max_tiles=max_tiles)
+    # Tiles are chunked by max_batch_size; the batching queue stays off
+    service.max_batch_size = max_batch_size
+    return service
+
+
+def make_image_bytes(size, seed=0):
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_plan_tiles():
+    """Tile plans keep aspect ratio, stay within max_tiles and cover the canvas."""
+    print("🧪 Testing tile planning...")
+
+    for width, height, max_tiles in [(100, 80, 4), (4096, 1024, 9), (1024, 4096, 9),
+                                     (3000, 3000, 9), (700, 300, 16), (513, 512, 2)]:
+        (canvas_width, canvas_height), origins = plan_tiles(width, height, 512, 64, max_tiles)
+        assert 1 <= len(origins) <= max_tiles
+        assert canvas_width <= width and canvas_height <= height
+        assert abs(canvas_width / canvas_height - width / height) < 0.01
+
+        covered = np.zeros((max(canvas_height, 512), max(canvas_width, 512)), dtype=bool)
+        for x, y in origins:
+            covered[y:y + 512, x:x + 512] = True
+        assert covered[:canvas_height, :canvas_width].all()
+        assert covered.shape == (max(canvas_height, 512), max(canvas_width, 512))
+
+    # Small images are not upsampled, wide ones keep native scale when the tiles allow
+    assert plan_tiles(100, 80, 512, 64, 4) == ((100, 80), [(0, 0)])
+    (canvas_width, _), origins = plan_tiles(1800, 500, 512, 64, 4)
+    assert canvas_width == 1800 and len(origins) == tile_count(1800, 512, 64) == 4
+    print("✅ Tile plans stay within bounds and cover the image")
+
+
+def test_stitched_tiles_match_whole_canvas():
+    """Blending tile outputs of a per-pixel model equals running it on the whole canvas."""
+    print("🧪 Testing tile blending against a whole-canvas pass...")
+
+    model = PixelModel()
+    rng = np.random.default_rng(1)
+    for width, height in [(300, 200), (90, 60), (128, 400)]:
+        image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        canvas_size, origins = plan_tiles(width, height, 128, 16, 100)
+        assert canvas_size == (width, height)
+
+        tiles = make_tiles(image, origins, 128)
+        with torch.no_grad():
+            outputs = model(tiles)
+            stitched = stitch_tiles(zip(outputs, origins), canvas_size, 16)
+            padded = make_tiles(image, [(0, 0)], max(width, height, 128))
+            expected = model(padded)[:, :, :height, :width]
+
+        assert stitched.shape == (1, 44, height, width)
+        assert torch.allclose(stitched, expected, atol=1e-5)
+    print("✅ Stitched tiles match the whole-canvas prediction")
+
+
+def test_process_image_tiled():
+    """process_image runs the tiles in chunks and keeps the original image size."""
+    print("🧪 Testing tiled process_image...")
+
+    model = PixelModel()
+    service = make_tiled_service(model, max_batch_size=4)
+    result = service.process_image(make_image_bytes((700, 300)), "tiled_job")
+
+    _, origins = plan_tiles(700, 300, 128, 16, 6)
+    assert len(origins) == 6
+    assert model.calls == [4, 2]
+    assert tuple(result.image_dimensions) == (700, 300)
+
+    model.calls.clear()
+    results = service.process_images([(make_image_bytes((700, 300), seed), f"job_{seed}") for seed in (1, 2)])
+    assert len(results) == 2 and model.calls == [4, 2, 4, 2]
+    print("✅ Tiled process_image batches tiles and keeps image dimensions")
+
+
+def test_unaligned_tiling_is_rejected():
+    """Tile sizes off the network stride and overlaps of a whole tile never reach stitching."""
+    print("🧪 Testing tile alignment...")
+
+    for tile_size, overlap in [(500, 64), (512, 512), (512, -1)]:
+        try:
+            plan_tiles(2000, 1000, tile_size, overlap, 9)
+            raise AssertionError(f"expected ValueError for {tile_size}/{overlap}")
+        except ValueError:
+            pass
+
+    assert align_tiling(500, 30) == (512, 30)
+    assert align_tiling(512, 64) == (512, 64) and align_tiling(100, -5) == (128, 0)
+
+    # Aligned tile sizes give tile outputs at exactly the tile size, for any overlap
+    tile_size, overlap = align_tiling(120, 14)
+    model = PixelModel()
+    canvas_size, origins = plan_tiles(300, 200, tile_size, overlap, 9)
+    canvas = torch.rand(1, 3, canvas_size[1], canvas_size[0])
+    tiles = torch.stack([canvas[0, :, y:y + tile_size, x:x + tile_size] for x, y in origins])
+    with torch.no_grad():
+        stitched = stitch_tiles(zip(model(tiles), origins), canvas_size, overlap)
+        assert torch.allclose(stitched, model(canvas), atol=1e-5)
+    print("✅ Unaligned tile sizes rejected and rounded to the network stride")
+
+
+if __name__ == "__main__":
+    test_plan_tiles()
+    test_unaligned_tiling_is_rejected()
+    test_stitched_tiles_match_whole_canvas()
+    test_process_image_tiled()
+    print("🎉 All tiled inference tests passed!")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the array-backed mesh geometry.
+
+Run with: python3 test_triangle_mesh.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import trimesh
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from models.data_structures import Building3D, Room3D, Vertex3D, Face, TriangleMesh
+from services.mesh_exporter import MeshExporter
+from services.test_room_generator import SimpleRoomGenerator
+from scripts.benchmark_geometry import make_scaled_coordinates, build_building
+
+
+def make_legacy_room():
+    return Room3D(
+        name="kitchen",
+        vertices=[Vertex3D(x=0, y=0, z=0), Vertex3D(x=10, y=0, z=0), Vertex3D(x=10, y=8.5, z=0)],
+        faces=[Face(indices=[0, 1, 2])],
+        elevation_feet=0.0,
+        height_feet=9.0
+    )
+
+
+def test_legacy_construction_and_views():
+    """Vertex3D/Face lists are stored as contiguous float32/int32 arrays."""
+    print("🧪 Testing legacy construction and compatibility views...")
+
+    room = make_legacy_room()
+
+    assert room.mesh.vertices.dtype == np.float32 and room.mesh.vertices.shape == (3, 3)
+    assert room.mesh.faces.dtype == np.int32 and room.mesh.faces.shape == (1, 3)
+    assert room.mesh.vertices.flags.c_contiguous and room.mesh.faces.flags.c_contiguous
+    assert len(room.vertices) == 3 and len(room.faces) == 1
+    assert room.vertices[2] == Vertex3D(x=10, y=8.5, z=0)
+    assert [v.x for v in room.vertices] == [0.0, 10.0, 10.0]
+    assert list(room.faces) == [Face(indices=[0, 1, 2])]
+    print("✅ Legacy construction and views correct")
+
+
+def test_serialization_round_trip():
+    """Buildings serialize compactly and still load the old per-vertex JSON."""
+    print("🧪 Testing mesh serialization...")
+
+    room = make_legacy_room()
+    building = Building3D(rooms=[room], walls=[], total_vertices=3, total_faces=1, bounding_box={})
+
+    dumped = building.model_dump()["rooms"][0]
+    assert dumped["vertices"][1] == [10.0, 0.0, 0.0]
+    assert dumped["faces"] == [[0, 1, 2]]
+    assert Building3D.model_validate_json(building.model_dump_json()).rooms[0] == room
+
+    legacy_json = (
+        '{"name": "kitchen", "vertices": [{"x": 0, "y": 0, "z": 0}, {"x": 10, "y": 0, "z": 0}, '
+        '{"x": 10, "y": 8.5, "z": 0}], "faces": [{"indices": [0, 1, 2]}], '
+        '"elevation_feet": 0.0, "height_feet": 9.0}'
+    )
+    assert Room3D.model_validate_json(legacy_json) == room
+    print("✅ Serialization round trip correct")
+
+
+def test_generated_meshes_are_arrays():
+    """Generators, cutouts and assembly produce array meshes end to end."""
+    print("🧪 Testing generated building geometry...")
+
+    building = build_building(make_scaled_coordinates(40))
+
+    for item in building.rooms + building.walls:
+        assert item.mesh.vertices.dtype == np.float32
+        assert item.mesh.faces.dtype == np.int32
+        assert item.mesh.faces.max() < item.mesh.vertex_count
+
+    # L-shaped rooms: 6 floor + 6 ceiling vertices, 4 + 4 fan triangles + 12 side triangles
+    polygon_room = building.rooms[1]
+    assert polygon_room.mesh.vertex_count == 12 and polygon_room.mesh.face_count == 20
+    assert np.isclose(polygon_room.mesh.volume, polygon_room.mesh.to_trimesh().volume)
+
+    all_vertices = np.concatenate([item.mesh.vertices for item in building.rooms + building.walls])
+    assert building.total_vertices == len(all_vertices)
+    assert building.bounding_box["max_z"] == 9.0
+    assert building.bounding_box["min_x"] == float(all_vertices[:, 0].min())
+    print("✅ Generated geometry is array-backed")
+
+
+def test_combined_mesh_matches_per_mesh_trimesh():
+    """The single-pass combine equals concatenating individually processed trimeshes."""
+    print("🧪 Testing combined mesh against per-mesh trimesh processing...")
+
+    building = build_building(make_scaled_coordinates(40))
+    combined = MeshExporter()._combine_building_meshes(building)
+
+    reference = trimesh.util.concatenate([
+        trimesh.Trimesh(vertices=item.mesh.vertices.astype(np.float64), faces=item.mesh.faces)
+        for item in building.rooms + building.walls
+    ])
+
+    assert np.array_equal(combined.vertices, reference.vertices)
+    assert np.array_equal(combined.faces, reference.faces)
+    print(f"✅ Combined mesh matches: {len(combined.vertices)} vertices, {len(combined.faces)} faces")
+
+
+def test_quad_faces_are_triangulated():
+    """Quad faces (as the simple test generators emit) become two triangles each."""
+    print("🧪 Testing quad face triangulation...")
+
+    vertices, quads = SimpleRoomGenerator()._create_simple_floor_mesh(0.0, 0.0, 10.0, 8.0, 0.25)
+    room = Room3D(name="kitchen", vertices=vertices, faces=quads, elevation_feet=0.0, height_feet=9.0)
+
+    assert room.mesh.face_count == 12
+    triangles = room.mesh.faces
+    assert all(len(set(triangle)) == 3 for triangle in triangles.tolist())
+    reference = trimesh.Trimesh(vertices=room.mesh.vertices.astype(np.float64),
+                                faces=[face.indices for face in quads], process=False)
+    assert np.isclose(room.mesh.volume, reference.volume) and np.isclose(abs(room.mesh.volume), 20.0)
+
+    # Array input and mixed polygon sizes take the same path
+    mixed = TriangleMesh.from_any(room.mesh.vertices, [[0, 1, 2], [0, 1, 2, 3], [4, 5, 6, 7, 0]])
+    assert mixed.faces.tolist() == [[0, 1, 2], [0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7], [4, 7, 0]]
+    assert TriangleMesh.from_any(room.mesh.vertices, np.array([[0, 1, 2, 3]])).faces.tolist() == [[0, 1, 2], [0, 2, 3]]
+
+    for faces in ([[0, 1]], np.array([[0, 1, 2, 3]])):
+        try:
+            (TriangleMesh.from_any if isinstance(faces, list) else TriangleMesh)(room.mesh.vertices, faces)
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+    print("✅ Quad faces triangulated like trimesh")
+
+
+def test_transformed_shares_faces():
+    """Scaling builds new vertices and keeps the face array."""
+    print("🧪 Testing mesh transform...")
+
+    mesh = TriangleMesh([[1, 2, 3], [4, 5, 6], [7, 8, 9]], [[0, 1, 2]])
+    scaled = mesh.transformed((2.0, 2.0, 1.0))
+
+    assert scaled.faces is mesh.faces
+    assert np.array_equal(scaled.vertices, [[2, 4, 3], [8, 10, 6], [14, 16, 9]])
+    assert scaled.vertices.dtype == np.float32
+    print("✅ Mesh transform correct")
+
+
+if __name__ == "__main__":
+    test_legacy_construction_and_views()
+    test_serialization_round_trip()
+    test_generated_meshes_are_arrays()
+    test_combined_mesh_matches_per_mesh_trimesh()
+    test_quad_faces_are_triangulated()
+    test_transformed_shares_faces()
+    print("🎉 All triangle mesh tests passed!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped weight cache.
+
+Checks the flat weights file format, that loaded tensors live on the mapped
+file, conversion and staleness handling next to the checkpoint, and that
+CubiCasaService builds the CubiCasa5K model from the mapped weights.
+
+Run with: python3 test_weight_cache.py
+"""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from services import weight_cache
+from services.weight_cache import (
+    weight_cache_path,
+    save_weights,
+    load_weights,
+    load_or_convert_weights
+)
+from services.cubicasa_service import CubiCasaService
+from services.floortrans.models import hg_furukawa_original
+
+
+def make_state_dict():
+    """Mixed dtypes and shapes, including a 0-dim int64 buffer and an empty tensor."""
+    torch.manual_seed(0)
+    return {
+        "conv.weight": torch.randn(8, 3, 3, 3),
+        "conv.bias": torch.randn(8),
+        "bn.num_batches_tracked": torch.tensor(7),
+        "half": torch.randn(5).to(torch.float16),
+        "mask": torch.tensor([True, False, True]),
+        "empty": torch.zeros(0, 4)
+    }
+
+
+def test_weights_roundtrip():
+    """Saved weights load back identically, aligned, from the mapped file."""
+    print("🧪 Testing weights file roundtrip...")
+
+    state_dict = make_state_dict()
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "weights.safetensors"
+        version = save_weights(state_dict, path, {"checkpoint": "1:2"})
+        assert version == save_weights(state_dict, Path(directory) / "again.safetensors")
+
+        raw = path.read_bytes()
+        (header_length,) = struct.unpack("<Q", raw[:8])
+        header = json.loads(raw[8:8 + header_length])
+        assert (8 + header_length) % 64 == 0
+        assert all(info["data_offsets"][0] % 64 == 0 for name, info in header.items() if name != "__metadata__")
+        assert header["__metadata__"]["checkpoint"] == "1:2"
+        assert header["__metadata__"]["version"] == version
+
+        loaded, metadata = load_weights(path)
+        assert metadata["version"] == version
+        assert loaded.keys() == state_dict.keys()
+        for name, tensor in state_dict.items():
+            assert loaded[name].dtype == tensor.dtype and loaded[name].shape == tensor.shape
+            assert torch.equal(loaded[name], tensor)
+
+        # Tensors are views into one mapping, at their offsets in the file
+        data_start = loaded["conv.weight"].data_ptr() - header["conv.weight"]["data_offsets"][0]
+        assert loaded["conv.bias"].data_ptr() == data_start + header["conv.bias"]["data_offsets"][0]
+
+        state_dict["conv.bias"] += 1
+        assert save_weights(state_dict, Path(directory) / "changed.safetensors") != version
+    print("✅ Weights file roundtrip preserves every tensor")
+
+
+def test_convert_once_and_reconvert_when_stale():
+    """The checkpoint is read once; a changed checkpoint is converted again."""
+    print("🧪 Testing checkpoint conversion...")
+
+    state_dict = make_state_dict()
+    reads = []
+
+    def read_state_dict():
+        reads.append(1)
+        return {name: tensor.clone() for name, tensor in state_dict.items()}
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_path = Path(directory) / CubiCasaService.MODEL_FILENAME
+        checkpoint_path.write_bytes(b"checkpoint")
+
+        loaded, version, source = load_or_convert_weights(checkpoint_path, read_state_dict)
+        assert source == "converted" and len(reads) == 1
+        assert weight_cache_path(checkpoint_path).name == "model_best_val_loss_var.safetensors"
+
+        loaded, cached_version, source = load_or_convert_weights(checkpoint_path, read_state_dict)
+        assert source == "cache" and len(reads) == 1 and cached_version == version
+        assert torch.equal(loaded["conv.weight"], state_dict["conv.weight"])
+
+        time.sleep(0.01)
+        checkpoint_path.write_bytes(b"new checkpoint")
+        _, _, source = load_or_convert_weights(checkpoint_path, read_state_dict)
+        assert source == "converted" and len(reads) == 2
+
+        # A corrupt weights file is replaced rather than trusted
+        weight_cache_path(checkpoint_path).write_bytes(b"\xff" * 16)
+        _, _, source = load_or_convert_weights(checkpoint_path, read_state_dict)
+        assert source == "converted" and len(reads) == 3
+
+        # If the fresh file cannot be mapped, the unpickled tensors are served
+        time.sleep(0.01)
+        checkpoint_path.write_bytes(b"newer checkpoint")
+        original_load = weight_cache.load_weights
+        weight_cache.load_weights = lambda path: (_ for _ in ()).throw(OSError("mmap failed"))
+        try:
+            loaded, version, source = load_or_convert_weights(checkpoint_path, read_state_dict)
+        finally:
+            weight_cache.load_weights = original_load
+        assert source == "converted" and version is not None and len(reads) == 4
+        assert torch.equal(loaded["conv.weight"], state_dict["conv.weight"])
+    print("✅ Checkpoints are converted once and again when they change")
+
+
+def test_service_builds_model_from_mapped_weights():
+    """CubiCasaService loads the CubiCasa5K model from the weights file without unpickling."""
+    print("🧪 Testing CubiCasaService weight loading...")
+
+    torch.manual_seed(0)
+    reference = hg_furukawa_original(n_classes=51)
+    reference.conv4_ = torch.nn.Conv2d(256, 44, bias=True, kernel_size=1)
+    reference.upsample = torch.nn.ConvTranspose2d(44, 44, kernel_size=4, stride=4)
+    reference.eval()
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_path = Path(directory) / CubiCasaService.MODEL_FILENAME
+        torch.save({"model_state": reference.state_dict(), "epoch": 1}, checkpoint_path)
+
+        sources = []
+        for _ in range(2):
+            service = CubiCasaService(models_dir=directory, load_model=False)
+            service.weight_cache_enabled = True
+            service.precision = "fp32"
+            service.compile_enabled = False
+            service._load_model()
+            sources.append(service.weights_source)
+
+        assert sources == ["converted", "cache"]
+        assert not service.model.training
+        assert all(not p.is_meta for p in service.model.parameters())
+        x = torch.rand(1, 3, 64, 64)
+        with torch.no_grad():
+            assert torch.equal(service.model(x), reference(x))
+    print("✅ CubiCasaService builds the model from mapped weights")
+
+
+def test_prepare_weights_converts_without_loading():
+    """prepare_weights writes the weights file without building the model."""
+    print("🧪 Testing conversion-only weight preparation...")
+
+    torch.manual_seed(0)
+    model = torch.nn.Conv2d(3, 4, kernel_size=3)
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_path = Path(directory) / CubiCasaService.MODEL_FILENAME
+        torch.save({"model_state": model.state_dict(), "epoch": 1}, checkpoint_path)
+
+        service = CubiCasaService(models_dir=directory, load_model=False)
+        service.weight_cache_enabled = True
+        service.prepare_weights()
+
+        assert service.model is None and not service.model_loaded
+        state_dict, metadata = load_weights(weight_cache_path(checkpoint_path))
+        assert set(state_dict) == {"weight", "bias"}
+        assert torch.equal(state_dict["weight"], model.weight.detach())
+    print("✅ Weights converted without loading the model")
+
+
+if __name__ == "__main__":
+    test_weights_roundtrip()
+    test_convert_once_and_reconvert_when_stale()
+    test_service_builds_model_from_mapped_weights()
+    test_prepare_weights_converts_without_loading()
+    print("🎉 All weight cache tests passed!")
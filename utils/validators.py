@@ -15,6 +15,8 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 from urllib.parse import urlparse, unquote
 
+import numpy as np
+
 try:
     import magic
     MAGIC_AVAILABLE = True
@@ -25,7 +27,7 @@ except ImportError:
 from models.data_structures import (
     FileFormat, ProcessingStatus, ExportFormat,
     ScaleReference, ScaledCoordinates, Building3D,
-    CubiCasaOutput, Room3D, Wall3D, Vertex3D, Face
+    CubiCasaOutput, Room3D, Wall3D, TriangleMesh
 )
 from config.settings import (
     MAX_UPLOAD_SIZE, MAX_EXPORT_SIZE,
@@ -778,27 +780,7 @@ class PlanCastValidator:
         """Validate individual Room3D object."""
         validation_result = {"errors": [], "warnings": []}
         
-        # Validate vertices
-        if not room.vertices:
-            validation_result["errors"].append(f"{room_id}: No vertices")
-        else:
-            for i, vertex in enumerate(room.vertices):
-                if not self._is_finite_number(vertex.x) or not self._is_finite_number(vertex.y) or not self._is_finite_number(vertex.z):
-                    validation_result["errors"].append(f"{room_id} vertex {i}: Invalid coordinates")
-        
-        # Validate faces
-        if not room.faces:
-            validation_result["errors"].append(f"{room_id}: No faces")
-        else:
-            for i, face in enumerate(room.faces):
-                if not face.indices or len(face.indices) < 3:
-                    validation_result["errors"].append(f"{room_id} face {i}: Invalid face (need 3+ vertices)")
-                else:
-                    # Check vertex indices are within bounds
-                    max_vertex_index = len(room.vertices) - 1
-                    for vertex_index in face.indices:
-                        if vertex_index < 0 or vertex_index > max_vertex_index:
-                            validation_result["errors"].append(f"{room_id} face {i}: Invalid vertex index {vertex_index}")
+        self._validate_mesh(room.mesh, room_id, validation_result)
         
         # Validate dimensions
         if room.height_feet <= 0:
@@ -810,27 +792,7 @@ class PlanCastValidator:
         """Validate individual Wall3D object."""
         validation_result = {"errors": [], "warnings": []}
         
-        # Validate vertices
-        if not wall.vertices:
-            validation_result["errors"].append(f"{wall_id}: No vertices")
-        else:
-            for i, vertex in enumerate(wall.vertices):
-                if not self._is_finite_number(vertex.x) or not self._is_finite_number(vertex.y) or not self._is_finite_number(vertex.z):
-                    validation_result["errors"].append(f"{wall_id} vertex {i}: Invalid coordinates")
-        
-        # Validate faces
-        if not wall.faces:
-            validation_result["errors"].append(f"{wall_id}: No faces")
-        else:
-            for i, face in enumerate(wall.faces):
-                if not face.indices or len(face.indices) < 3:
-                    validation_result["errors"].append(f"{wall_id} face {i}: Invalid face (need 3+ vertices)")
-                else:
-                    # Check vertex indices are within bounds
-                    max_vertex_index = len(wall.vertices) - 1
-                    for vertex_index in face.indices:
-                        if vertex_index < 0 or vertex_index > max_vertex_index:
-                            validation_result["errors"].append(f"{wall_id} face {i}: Invalid vertex index {vertex_index}")
+        self._validate_mesh(wall.mesh, wall_id, validation_result)
         
         # Validate dimensions
         if wall.height_feet <= 0:
@@ -841,6 +803,24 @@ class PlanCastValidator:
         
         return validation_result
     
+    def _validate_mesh(self, mesh: TriangleMesh, mesh_id: str, validation_result: Dict[str, Any]) -> None:
+        """Validate vertex coordinates and face indices of a mesh."""
+        # Validate vertices
+        if not mesh.vertex_count:
+            validation_result["errors"].append(f"{mesh_id}: No vertices")
+        else:
+            for i in np.nonzero(~np.isfinite(mesh.vertices).all(axis=1))[0]:
+                validation_result["errors"].append(f"{mesh_id} vertex {i}: Invalid coordinates")
+        
+        # Validate faces (TriangleMesh faces always have 3 indices)
+        if not mesh.face_count:
+            validation_result["errors"].append(f"{mesh_id}: No faces")
+        else:
+            # Check vertex indices are within bounds
+            invalid = (mesh.faces < 0) | (mesh.faces >= mesh.vertex_count)
+            for i, j in zip(*np.nonzero(invalid)):
+                validation_result["errors"].append(f"{mesh_id} face {i}: Invalid vertex index {mesh.faces[i, j]}")
+    
     def _is_finite_number(self, value: Union[int, float]) -> bool:
         """Check if value is a finite number."""
         return isinstance(value, (int, float)) and math.isfinite(value)